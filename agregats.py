@@ -0,0 +1,108 @@
+# === CONTENU DU FICHIER agregats.py ===
+"""Cumuls pluviométriques pré-calculés par station (jour, semaine, mois).
+
+Le chargeur partagé tient à jour un cumul journalier par station : les
+relevés ajoutés y sont intégrés au fil de l'eau, une station corrigée est
+recalculée seule. Semaines et mois sont dérivés des jours (quelques
+milliers de lignes), jamais des relevés bruts.
+"""
+import threading
+
+import pandas as pd
+
+# Clés d'agrégation utilisées par les pages (mêmes fréquences qu'avant)
+FREQUENCES = {"Journalière": "D", "Hebdomadaire": "W", "Mensuelle": "ME"}
+
+_COLONNES = ["Ville", "Date_Heure", "Pluie (mm)", "Max (mm)", "Nb relevés", "Moyenne (mm)"]
+
+
+def cumul_journalier(df: pd.DataFrame) -> pd.DataFrame:
+    """Somme, maximum et nombre de relevés par jour pour les relevés d'une station."""
+    pluie = df["Pluie (mm)"].astype("float64")
+    g = pluie.groupby(df["Date_Heure"].dt.floor("D"))
+    jours = pd.DataFrame({"somme": g.sum(), "maxi": g.max(), "nb": g.size()})
+    jours.index.name = "Jour"
+    return jours
+
+
+class Agregats:
+    """Cumuls journaliers par station, mis à jour par le chargeur de relevés."""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._jours: dict[str, pd.DataFrame] = {}
+        self._tous: pd.DataFrame | None = None
+
+    # ---------- Mise à jour (appelée par le chargeur) ----------
+    def recalculer(self, ville: str, df: pd.DataFrame) -> None:
+        with self._verrou:
+            self._jours[ville] = cumul_journalier(df)
+            self._tous = None
+
+    def integrer(self, ville: str, nouveaux: pd.DataFrame) -> None:
+        """Ajoute des relevés au cumul existant sans relire la station."""
+        if nouveaux.empty:
+            return
+        with self._verrou:
+            ajout = cumul_journalier(nouveaux)
+            actuel = self._jours.get(ville)
+            if actuel is not None and not actuel.empty:
+                ajout = (pd.concat([actuel, ajout]).groupby(level=0)
+                         .agg({"somme": "sum", "maxi": "max", "nb": "sum"}))
+            self._jours[ville] = ajout
+            self._tous = None
+
+    def retirer(self, ville: str) -> None:
+        with self._verrou:
+            self._jours.pop(ville, None)
+            self._tous = None
+
+    # ---------- Lecture ----------
+    def journalier(self) -> pd.DataFrame:
+        """Cumuls journaliers de toutes les stations (jours sans relevé absents)."""
+        with self._verrou:
+            if self._tous is None:
+                morceaux = [j.reset_index().assign(Ville=v) for v, j in self._jours.items() if not j.empty]
+                self._tous = (pd.concat(morceaux, ignore_index=True) if morceaux
+                              else pd.DataFrame(columns=["Jour", "somme", "maxi", "nb", "Ville"]))
+            return self._tous
+
+    def tableau(self, freq: str, villes=None, debut=None, fin=None) -> pd.DataFrame:
+        """Cumuls par station à la fréquence `freq` ("D", "W", "ME") sur [debut, fin].
+
+        Même résultat que ``resample(freq).sum()`` sur les relevés bruts filtrés,
+        y compris les périodes sans relevé (cumul 0).
+        """
+        jours = self.journalier()
+        if villes is not None:
+            jours = jours[jours["Ville"].isin(villes)]
+        if debut is not None:
+            jours = jours[jours["Jour"] >= pd.Timestamp(debut)]
+        if fin is not None:
+            jours = jours[jours["Jour"] <= pd.Timestamp(fin)]
+        if jours.empty:
+            return pd.DataFrame(columns=_COLONNES)
+        g = jours.set_index("Jour").groupby("Ville")
+        res = pd.DataFrame({
+            "Pluie (mm)": g["somme"].resample(freq).sum(),
+            "Max (mm)":   g["maxi"].resample(freq).max(),
+            "Nb relevés": g["nb"].resample(freq).sum(),
+        })
+        res["Moyenne (mm)"] = res["Pluie (mm)"] / res["Nb relevés"].where(res["Nb relevés"] > 0)
+        return res.rename_axis(["Ville", "Date_Heure"]).reset_index()[_COLONNES]
+
+    def cumul_par_station(self, villes=None, debut=None, fin=None) -> pd.DataFrame:
+        """Cumul, maximum et nombre de relevés par station sur la période."""
+        jours = self.journalier()
+        if villes is not None:
+            jours = jours[jours["Ville"].isin(villes)]
+        if debut is not None:
+            jours = jours[jours["Jour"] >= pd.Timestamp(debut)]
+        if fin is not None:
+            jours = jours[jours["Jour"] <= pd.Timestamp(fin)]
+        g = jours.groupby("Ville")
+        return pd.DataFrame({
+            "Pluie (mm)": g["somme"].sum(),
+            "Max (mm)":   g["maxi"].max(),
+            "Nb relevés": g["nb"].sum(),
+        }).reset_index()
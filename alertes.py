@@ -0,0 +1,279 @@
+# === CONTENU DU FICHIER alertes.py ===
+"""Moteur d'alertes incrémental : règles ponctuelles et cumuls glissants par station.
+
+Le chargeur partagé passe chaque relevé ajouté au moteur, comme aux cumuls
+de ``agregats`` : pour chaque règle, la station garde une fenêtre glissante
+(file des relevés récents, somme courante, file monotone du maximum), donc
+évaluer un relevé coûte O(1) amorti par règle, quel que soit l'historique.
+Une station corrigée est reconstruite à partir de ses seuls relevés récents.
+
+La table des alertes actives (une ligne par station et règle dépassée) est
+tenue à jour à chaque évaluation ; tableau de bord, carte et page PDF la
+lisent directement au lieu de filtrer tous les relevés.
+
+Les fenêtres sont évaluées « à maintenant » : un relevé sort de la fenêtre
+quand il a plus de `duree`, et l'alerte tombe avec lui.
+"""
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from referentiel import SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM
+
+NIVEAUX = ("vigilance", "alerte")
+COLONNES_ACTIVES = ["Ville", "Règle", "Niveau", "Valeur (mm)", "Seuil (mm)", "Depuis", "Dernier relevé"]
+
+
+@dataclass(frozen=True)
+class Regle:
+    """Seuils d'alerte et de vigilance sur une fenêtre glissante.
+
+    `cumul` : somme des relevés de la fenêtre ; sinon, plus fort relevé
+    (règle ponctuelle, active `duree` après le relevé). `villes` restreint la
+    règle à quelques stations ; elle y remplace la règle générale de même nom.
+    """
+    nom: str
+    duree: pd.Timedelta
+    seuil_alerte: float
+    seuil_vigilance: float
+    cumul: bool = True
+    villes: frozenset | None = None
+
+    def niveau(self, valeur: float) -> str | None:
+        if valeur >= self.seuil_alerte:
+            return "alerte"
+        if valeur >= self.seuil_vigilance:
+            return "vigilance"
+        return None
+
+
+# Cumuls longs : seuils du référentiel proportionnés à la durée (x2 sur 72 h, x3 sur 7 jours)
+REGLES = (
+    Regle("Relevé ponctuel", pd.Timedelta(hours=24), SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM, cumul=False),
+    Regle("Cumul 24 h", pd.Timedelta(hours=24), SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM),
+    Regle("Cumul 72 h", pd.Timedelta(hours=72), 2 * SEUIL_ALERTE_MM, 2 * SEUIL_VIGILANCE_MM),
+    Regle("Cumul 7 jours", pd.Timedelta(days=7), 3 * SEUIL_ALERTE_MM, 3 * SEUIL_VIGILANCE_MM),
+)
+
+
+def charger_regles(chemin: str | None = None) -> tuple[Regle, ...]:
+    """Règles par défaut, complétées ou remplacées par le JSON `chemin` (SODEXAM_REGLES).
+
+    Format : [{"nom": "Cumul 24 h", "heures": 24, "alerte": 40, "vigilance": 15,
+    "cumul": true, "villes": ["Man"]}, ...]
+    """
+    chemin = chemin or os.environ.get("SODEXAM_REGLES")
+    if not chemin or not os.path.exists(chemin):
+        return REGLES
+    with open(chemin, encoding="utf-8") as f:
+        regles = [
+            Regle(r["nom"], pd.Timedelta(hours=float(r["heures"])), float(r["alerte"]), float(r["vigilance"]),
+                  cumul=bool(r.get("cumul", True)),
+                  villes=frozenset(r["villes"]) if r.get("villes") else None)
+            for r in json.load(f)
+        ]
+    generales = {r.nom for r in regles if r.villes is None}
+    return tuple(r for r in REGLES if r.nom not in generales) + tuple(regles)
+
+
+# ============================================================
+# FENÊTRE GLISSANTE
+# ============================================================
+class _Fenetre:
+    """Relevés (t, mm) des `duree` dernières nanosecondes : somme et maximum en O(1) amorti."""
+
+    __slots__ = ("duree", "releves", "somme", "maxima")
+
+    def __init__(self, duree: int):
+        self.duree = duree
+        self.releves: deque = deque()
+        self.somme = 0.0
+        self.maxima: deque = deque()     # valeurs décroissantes : le maximum est en tête
+
+    def ajouter(self, t: int, mm: float) -> None:
+        if self.releves and t < self.releves[-1][0]:
+            # Relevé saisi en retard : réinsertion triée (rare, O(k) sur la fenêtre)
+            tries = sorted([*self.releves, (t, mm)])
+            self.releves.clear()
+            self.maxima.clear()
+            self.somme = 0.0
+            for r in tries:
+                self._empiler(*r)
+            return
+        self._empiler(t, mm)
+
+    def _empiler(self, t: int, mm: float) -> None:
+        self.releves.append((t, mm))
+        self.somme += mm
+        while self.maxima and self.maxima[-1][1] <= mm:
+            self.maxima.pop()
+        self.maxima.append((t, mm))
+
+    def avancer(self, maintenant: int) -> None:
+        limite = maintenant - self.duree
+        while self.releves and self.releves[0][0] <= limite:
+            self.somme -= self.releves.popleft()[1]
+        while self.maxima and self.maxima[0][0] <= limite:
+            self.maxima.popleft()
+        if not self.releves:
+            self.somme = 0.0     # pas de dérive d'arrondi sur une fenêtre vidée
+
+    def valeur(self, cumul: bool) -> float:
+        if cumul:
+            return max(self.somme, 0.0)
+        return self.maxima[0][1] if self.maxima else 0.0
+
+
+# ============================================================
+# MOTEUR
+# ============================================================
+class MoteurAlertes:
+    """Fenêtres par station et table des alertes actives, mises à jour par le chargeur de relevés."""
+
+    def __init__(self, regles: tuple[Regle, ...] | None = None):
+        self.regles = charger_regles() if regles is None else regles
+        self._verrou = threading.Lock()
+        self._fenetres: dict[str, dict[str, _Fenetre]] = {}
+        self._regles_station: dict[str, tuple[Regle, ...]] = {}
+        # Table matérialisée : {(ville, règle): (niveau, valeur, depuis, dernier relevé)}
+        self._actives: dict[tuple[str, str], tuple] = {}
+        # Début du dépassement en cours de chaque seuil : {(ville, règle): {niveau: t}}
+        self._debuts: dict[tuple[str, str], dict[str, int]] = {}
+        self._derniers: dict[str, int] = {}
+        self.version = 0
+
+    def _regles(self, ville: str) -> tuple[Regle, ...]:
+        regles = self._regles_station.get(ville)
+        if regles is None:
+            propres = {r.nom for r in self.regles if r.villes and ville in r.villes}
+            regles = self._regles_station[ville] = tuple(
+                r for r in self.regles
+                if (r.villes is None and r.nom not in propres) or (r.villes and ville in r.villes))
+        return regles
+
+    def _station(self, ville: str) -> dict[str, _Fenetre]:
+        fenetres = self._fenetres.get(ville)
+        if fenetres is None:
+            fenetres = self._fenetres[ville] = {r.nom: _Fenetre(r.duree.value) for r in self._regles(ville)}
+        return fenetres
+
+    # ---------- Mise à jour (appelée par le chargeur) ----------
+    def recalculer(self, ville: str, df: pd.DataFrame) -> None:
+        """Repart des relevés récents de la station (station lue ou relue entièrement)."""
+        with self._verrou:
+            self._fenetres.pop(ville, None)
+            self._derniers.pop(ville, None)
+            self._oublier_debuts(ville)
+            self._ajouter(ville, df, pd.Timestamp.now().value)
+
+    def integrer(self, ville: str, nouveaux: pd.DataFrame) -> None:
+        """Évalue les relevés ajoutés : O(1) amorti par relevé et par règle."""
+        if nouveaux.empty:
+            return
+        with self._verrou:
+            self._ajouter(ville, nouveaux, pd.Timestamp.now().value)
+
+    def retirer(self, ville: str) -> None:
+        with self._verrou:
+            self._fenetres.pop(ville, None)
+            self._derniers.pop(ville, None)
+            self._oublier_debuts(ville)
+            for cle in [c for c in self._actives if c[0] == ville]:
+                del self._actives[cle]
+            self.version += 1
+
+    def _oublier_debuts(self, ville: str) -> None:
+        for cle in [c for c in self._debuts if c[0] == ville]:
+            del self._debuts[cle]
+
+    def _suivre(self, ville: str, regle: Regle, f: _Fenetre, t: int) -> None:
+        """Note l'instant `t` où la fenêtre franchit chaque seuil, l'oublie quand elle repasse dessous."""
+        valeur = f.valeur(regle.cumul)
+        debuts = self._debuts.setdefault((ville, regle.nom), {})
+        for niveau, seuil in (("vigilance", regle.seuil_vigilance), ("alerte", regle.seuil_alerte)):
+            if valeur >= seuil:
+                debuts.setdefault(niveau, t)
+            else:
+                debuts.pop(niveau, None)
+
+    def _ajouter(self, ville: str, df: pd.DataFrame, maintenant: int) -> None:
+        fenetres = self._station(ville)
+        regles = [(r, fenetres[r.nom]) for r in self._regles(ville) if r.nom in fenetres]
+        if not df.empty:
+            t = df["Date_Heure"].to_numpy("datetime64[ns]").view("int64")
+            mm = df["Pluie (mm)"].to_numpy(dtype="float64")
+            duree_max = max(f.duree for f in fenetres.values()) if fenetres else 0
+            garde = (t > maintenant - duree_max) & ~np.isnan(mm)
+            ordre = np.argsort(t[garde], kind="stable")
+            # Relevés de la plus longue fenêtre rejoués dans l'ordre par toutes les règles :
+            # « Depuis » est la date du relevé qui a fait franchir le seuil, y compris
+            # après une relecture ou un redémarrage (avancer() vide ce qui sort de la fenêtre)
+            for ti, mi in zip(t[garde][ordre].tolist(), mm[garde][ordre].tolist()):
+                for r, f in regles:
+                    f.avancer(ti)
+                    self._suivre(ville, r, f, ti)
+                    f.ajouter(ti, mi)
+                    self._suivre(ville, r, f, ti)
+            if len(t):
+                self._derniers[ville] = max(self._derniers.get(ville, t.min()), int(t.max()))
+        self._evaluer(ville, maintenant)
+
+    def _evaluer(self, ville: str, maintenant: int) -> None:
+        fenetres = self._fenetres.get(ville, {})
+        dernier = self._derniers.get(ville)
+        for regle in self._regles(ville):
+            f = fenetres.get(regle.nom)
+            if f is None:
+                continue
+            f.avancer(maintenant)
+            self._suivre(ville, regle, f, maintenant)
+            valeur = f.valeur(regle.cumul)
+            niveau = regle.niveau(valeur)
+            cle = (ville, regle.nom)
+            ancien = self._actives.get(cle)
+            if niveau is None:
+                if ancien is not None:
+                    del self._actives[cle]
+                    self.version += 1
+                continue
+            depuis = self._debuts[cle][niveau]
+            etat = (niveau, round(valeur, 1), depuis, dernier)
+            if etat != ancien:
+                self._actives[cle] = etat
+                self.version += 1
+
+    # ---------- Lecture ----------
+    def actives(self, ville: str | None = None) -> pd.DataFrame:
+        """Alertes en cours (alertes d'abord, puis valeur décroissante)."""
+        maintenant = pd.Timestamp.now().value
+        with self._verrou:
+            # Seules les stations en alerte peuvent voir une alerte tomber avec le temps
+            for v in {c[0] for c in self._actives} if ville is None else {ville}:
+                self._evaluer(v, maintenant)
+            lignes = [
+                (v, nom, niveau, valeur, self._seuil(v, nom, niveau), depuis, dernier)
+                for (v, nom), (niveau, valeur, depuis, dernier) in self._actives.items()
+                if ville is None or v == ville
+            ]
+        res = pd.DataFrame(lignes, columns=COLONNES_ACTIVES)
+        for col in ("Depuis", "Dernier relevé"):
+            res[col] = pd.to_datetime(res[col].astype("Int64"), unit="ns").dt.floor("min")
+        res["_rang"] = res["Niveau"].map({"alerte": 0, "vigilance": 1})
+        return (res.sort_values(["_rang", "Valeur (mm)"], ascending=[True, False])
+                .drop(columns="_rang").reset_index(drop=True))
+
+    def _seuil(self, ville: str, nom: str, niveau: str) -> float:
+        regle = next(r for r in self._regles(ville) if r.nom == nom)
+        return regle.seuil_alerte if niveau == "alerte" else regle.seuil_vigilance
+
+    def niveaux(self) -> pd.Series:
+        """Niveau le plus fort par station en alerte (index : Ville)."""
+        actives = self.actives()
+        if actives.empty:
+            return pd.Series(dtype="object", name="Niveau")
+        return actives.drop_duplicates("Ville").set_index("Ville")["Niveau"]
@@ -0,0 +1,339 @@
+# === CONTENU DU FICHIER api.py ===
+"""API HTTP JSON (ASGI) pour les systèmes partenaires, à côté de l'interface Streamlit.
+
+Lancement :
+    uvicorn api:app --host 0.0.0.0 --port 8502
+
+Points d'accès (GET, réponses JSON paginées : items, total, offset, limit, suivant ;
+                                                limit=0 : total seul) :
+    /stations                                   état courant de chaque station
+    /observations?ville=Man&from=2024-01-01&to=2024-01-31
+                                                relevés bruts (ville répétable) ;
+                                                format=ndjson : tous les relevés en flux
+    /alerts?ville=&niveau=alerte                alertes en cours (moteur d'alertes)
+    /rollups?freq=D|W|M&ville=&from=&to=        cumuls journaliers, hebdomadaires, mensuels
+    /metrics                                    métriques du processus (texte Prometheus, metriques.py)
+
+Même dépôt, même chargeur incrémental, mêmes index, agrégats et moteur
+d'alertes que l'interface : une requête ne relance ni script Streamlit ni
+lecture complète. Le chargeur est rafraîchi au plus toutes les
+SODEXAM_API_RAFRAICHIR secondes, par un seul thread ; les autres requêtes
+servent l'état courant. Chaque réponse porte un ETag (version des données
++ requête) : If-None-Match répond 304 sans rien calculer, et les corps déjà
+produits sont gardés en cache LRU.
+
+Si SODEXAM_API_CLES (clés séparées par des virgules) est définie, l'en-tête
+X-API-Key est exigé.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import anyio
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import metriques
+from agregats import FREQUENCES
+from registre import registre
+from requetes import IndexReleves
+from statuts import appliquer_alertes, statuts_stations
+from stockage import depot
+
+RAFRAICHIR_S = float(os.environ.get("SODEXAM_API_RAFRAICHIR", "2"))
+CLES_API = {c.strip() for c in os.environ.get("SODEXAM_API_CLES", "").split(",") if c.strip()}
+LIMITE_DEFAUT = 1_000
+LIMITE_MAX = 10_000
+LIGNES_PAR_MORCEAU = 5_000      # flux NDJSON
+NB_JOURS_STATUTS = 7
+FREQUENCES_API = {"D": FREQUENCES["Journalière"], "W": FREQUENCES["Hebdomadaire"],
+                  "M": FREQUENCES["Mensuelle"]}
+
+
+class ErreurRequete(ValueError):
+    """Paramètre de requête invalide (réponse 400)."""
+
+
+# ============================================================
+# ÉTAT PARTAGÉ
+# ============================================================
+class EtatApi:
+    """Chargeur partagé du dépôt et index de sa dernière version."""
+
+    def __init__(self, chargeur=None, intervalle: float = RAFRAICHIR_S):
+        self.chargeur = chargeur or depot().creer_chargeur()
+        self.intervalle = intervalle
+        self.index: IndexReleves | None = None
+        self.version = -1
+        self._dernier = 0.0
+        self._verrou = threading.Lock()
+
+    def perime(self) -> bool:
+        return self.index is None or time.monotonic() - self._dernier > self.intervalle
+
+    def actualiser(self) -> None:
+        # Un seul thread relit le dépôt ; les autres gardent l'état courant (sauf au premier appel)
+        if not self._verrou.acquire(blocking=self.index is None):
+            return
+        try:
+            if not self.perime():
+                return
+            with metriques.mesurer("api.actualiser", toujours=True):
+                df = self.chargeur.charger()
+            if self.index is None or self.chargeur.version != self.version:
+                self.index = IndexReleves(df)
+                self.version = self.chargeur.version
+            self._dernier = time.monotonic()
+        finally:
+            self._verrou.release()
+
+
+class CacheReponses:
+    """Corps JSON déjà produits, par ETag (LRU)."""
+
+    def __init__(self, taille: int = 256):
+        self.taille = taille
+        self._verrou = threading.Lock()
+        self._entrees: OrderedDict = OrderedDict()
+
+    def lire(self, etag: str) -> bytes | None:
+        with self._verrou:
+            corps = self._entrees.get(etag)
+            if corps is not None:
+                self._entrees.move_to_end(etag)
+            return corps
+
+    def ecrire(self, etag: str, corps: bytes) -> None:
+        with self._verrou:
+            self._entrees[etag] = corps
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+
+
+ETAT: EtatApi | None = None
+CACHE = CacheReponses()
+
+
+async def etat() -> EtatApi:
+    global ETAT
+    if ETAT is None:
+        ETAT = EtatApi()
+    if ETAT.perime():
+        await anyio.to_thread.run_sync(ETAT.actualiser)
+    return ETAT
+
+
+# ============================================================
+# PARAMÈTRES
+# ============================================================
+def _borne(valeur: str | None, nom: str):
+    """Date (jour entier) ou horodatage ISO ; un décalage (Z, +01:00) est ramené à l'heure
+    locale sans fuseau, celle des relevés."""
+    if not valeur:
+        return None
+    try:
+        borne = date.fromisoformat(valeur) if len(valeur) == 10 else pd.Timestamp(valeur)
+    except ValueError as e:
+        raise ErreurRequete(f"{nom} : date invalide « {valeur} »") from e
+    if isinstance(borne, pd.Timestamp) and borne.tzinfo is not None:
+        borne = pd.Timestamp(borne.to_pydatetime().astimezone().replace(tzinfo=None))
+    return borne
+
+
+def _entier(requete: Request, nom: str, defaut: int, maxi: int | None = None) -> int:
+    try:
+        v = int(requete.query_params.get(nom, defaut))
+    except ValueError as e:
+        raise ErreurRequete(f"{nom} : entier attendu") from e
+    if v < 0:
+        raise ErreurRequete(f"{nom} : valeur négative")
+    return min(v, maxi) if maxi is not None else v
+
+
+def _villes(requete: Request) -> list[str] | None:
+    """`ville` répété ou séparé par des virgules ; None : toutes."""
+    villes = [v.strip() for brut in requete.query_params.getlist("ville") for v in brut.split(",") if v.strip()]
+    return villes or None
+
+
+def _etag(requete: Request, *version) -> str:
+    cle = f"{requete.url.path}?{sorted(requete.query_params.multi_items())}|{version}"
+    return '"' + hashlib.sha1(cle.encode()).hexdigest()[:20] + '"'
+
+
+# ============================================================
+# RÉPONSES
+# ============================================================
+def _page(df: pd.DataFrame, total: int, offset: int, limite: int, requete: Request) -> bytes:
+    """Corps JSON d'une page (sérialisation pandas, sans passer par des dicts Python).
+
+    limit=0 ne renvoie que le total : pas de page suivante (elle bouclerait sur le même offset).
+    """
+    suivant = None
+    if limite and offset + limite < total:
+        suivant = str(requete.url.include_query_params(offset=offset + limite, limit=limite))
+    items = df.to_json(orient="records", date_format="iso", double_precision=4,
+                        force_ascii=False) if not df.empty else "[]"
+    entete = f'{{"total":{total},"offset":{offset},"limit":{limite},"suivant":' \
+             + ("null" if suivant is None else f'"{suivant}"') + ',"items":'
+    return (entete + items + "}").encode("utf-8")
+
+
+async def _repondre(requete: Request, version: tuple, fabrique) -> Response:
+    """304 si le client a déjà cette version ; sinon corps en cache ou produit par `fabrique`."""
+    etag = _etag(requete, *version)
+    entetes = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in {e.strip() for e in requete.headers.get("if-none-match", "").split(",")}:
+        return Response(status_code=304, headers=entetes)
+    metriques.collecte.appel_cache("api.reponses")
+    corps = CACHE.lire(etag)
+    if corps is None:
+        metriques.collecte.manque_cache("api.reponses")
+        corps = await anyio.to_thread.run_sync(_produire, requete.url.path, fabrique)
+        CACHE.ecrire(etag, corps)
+    return Response(corps, media_type="application/json", headers=entetes)
+
+
+def _produire(chemin: str, fabrique) -> bytes:
+    with metriques.mesurer(f"api{chemin}", "api", toujours=True):
+        return fabrique()
+
+
+def _minute() -> str:
+    # Fenêtres glissantes (24 h, alertes) : une réponse vaut au plus une minute
+    return pd.Timestamp.now().floor("min").isoformat()
+
+
+# ============================================================
+# POINTS D'ACCÈS
+# ============================================================
+async def stations(requete: Request) -> Response:
+    e = await etat()
+    offset, limite = _entier(requete, "offset", 0), _entier(requete, "limit", LIMITE_DEFAUT, LIMITE_MAX)
+    minute = _minute()
+
+    def fabrique() -> bytes:
+        statuts = statuts_stations(e.index.df, registre().noms, NB_JOURS_STATUTS, pd.Timestamp(minute))
+        statuts = appliquer_alertes(statuts, e.chargeur.alertes.niveaux())
+        coords = registre().stations.set_index("Ville")[["Lat", "Lon"]]
+        res = statuts.join(coords).reset_index().rename(columns={"Cumul (mm)": f"Cumul {NB_JOURS_STATUTS}j (mm)"})
+        return _page(res.iloc[offset:offset + limite], len(res), offset, limite, requete)
+
+    return await _repondre(requete, (e.version, minute), fabrique)
+
+
+async def observations(requete: Request) -> Response:
+    e = await etat()
+    villes = _villes(requete)
+    debut, fin = _borne(requete.query_params.get("from"), "from"), _borne(requete.query_params.get("to"), "to")
+
+    if requete.query_params.get("format") == "ndjson" \
+            or "application/x-ndjson" in requete.headers.get("accept", ""):
+        # Sélection (copie des lignes retenues) hors de la boucle d'événements
+        df = await anyio.to_thread.run_sync(e.index.requete, villes, debut, fin)
+
+        def morceaux():
+            for i in range(0, len(df), LIGNES_PAR_MORCEAU):
+                yield df.iloc[i:i + LIGNES_PAR_MORCEAU].to_json(
+                    orient="records", lines=True, date_format="iso", double_precision=4,
+                    force_ascii=False).rstrip("\n") + "\n"
+
+        return StreamingResponse(morceaux(), media_type="application/x-ndjson",
+                                 headers={"ETag": _etag(requete, e.version)})
+
+    offset, limite = _entier(requete, "offset", 0), _entier(requete, "limit", LIMITE_DEFAUT, LIMITE_MAX)
+
+    def fabrique() -> bytes:
+        if villes is None:
+            tranche = e.index.periode(debut, fin)
+            return _page(tranche.iloc[offset:offset + limite], len(tranche), offset, limite, requete)
+        pos = e.index.positions(villes, debut, fin)
+        return _page(e.index.df.take(pos[offset:offset + limite]), len(pos), offset, limite, requete)
+
+    return await _repondre(requete, (e.version,), fabrique)
+
+
+async def alerts(requete: Request) -> Response:
+    e = await etat()
+    villes = _villes(requete)
+    niveau = requete.query_params.get("niveau")
+    if niveau not in (None, "alerte", "vigilance"):
+        raise ErreurRequete("niveau : « alerte » ou « vigilance »")
+    offset, limite = _entier(requete, "offset", 0), _entier(requete, "limit", LIMITE_DEFAUT, LIMITE_MAX)
+    moteur = e.chargeur.alertes
+
+    def fabrique() -> bytes:
+        res = moteur.actives()
+        if villes is not None:
+            res = res[res["Ville"].isin(villes)]
+        if niveau is not None:
+            res = res[res["Niveau"] == niveau]
+        return _page(res.iloc[offset:offset + limite], len(res), offset, limite, requete)
+
+    return await _repondre(requete, (e.version, moteur.version, _minute()), fabrique)
+
+
+async def rollups(requete: Request) -> Response:
+    e = await etat()
+    freq = requete.query_params.get("freq", "D").upper()
+    if freq not in FREQUENCES_API:
+        raise ErreurRequete("freq : D, W ou M")
+    villes = _villes(requete)
+    debut, fin = _borne(requete.query_params.get("from"), "from"), _borne(requete.query_params.get("to"), "to")
+    offset, limite = _entier(requete, "offset", 0), _entier(requete, "limit", LIMITE_DEFAUT, LIMITE_MAX)
+
+    def fabrique() -> bytes:
+        res = e.chargeur.agregats.tableau(FREQUENCES_API[freq], villes, debut, fin)
+        return _page(res.iloc[offset:offset + limite], len(res), offset, limite, requete)
+
+    return await _repondre(requete, (e.version,), fabrique)
+
+
+# ============================================================
+# APPLICATION
+# ============================================================
+class CleApi:
+    """Middleware ASGI : X-API-Key exigée quand SODEXAM_API_CLES est définie."""
+
+    def __init__(self, app, cles: set[str]):
+        self.app = app
+        self.cles = cles
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.cles:
+            cle = dict(scope["headers"]).get(b"x-api-key", b"").decode()
+            if cle not in self.cles:
+                return await JSONResponse({"erreur": "clé API absente ou invalide"}, 401)(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+async def metriques_processus(requete: Request) -> Response:
+    return PlainTextResponse(metriques.collecte.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+async def _erreur_requete(requete: Request, exc: ErreurRequete) -> JSONResponse:
+    return JSONResponse({"erreur": str(exc)}, 400)
+
+
+app = Starlette(
+    routes=[
+        Route("/stations", stations),
+        Route("/observations", observations),
+        Route("/alerts", alerts),
+        Route("/rollups", rollups),
+        Route("/metrics", metriques_processus),
+    ],
+    exception_handlers={ErreurRequete: _erreur_requete},
+)
+app = CleApi(app, CLES_API)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("SODEXAM_API_PORT", "8502")))
@@ -0,0 +1,60 @@
+"""Alerte sur un relevé saisi : filtre de tout l'historique (ancien code) contre MoteurAlertes.
+
+Le coût du moteur par relevé ajouté ne dépend pas de la longueur de l'historique.
+
+Usage : python benchmarks/bench_alertes.py [nb_releves]   (défaut 1 000 000)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from alertes import MoteurAlertes  # noqa: E402
+from referentiel import SEUIL_ALERTE_MM  # noqa: E402
+
+NB_STATIONS = 100
+NB_AJOUTS = 500
+
+
+def releves(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    villes = pd.Categorical([f"Station {i:03d}" for i in rng.integers(0, NB_STATIONS, n)])
+    fin = pd.Timestamp.now().floor("h")
+    dates = fin - pd.to_timedelta(np.sort(rng.integers(0, 5 * 365 * 24, n))[::-1], unit="h")
+    return pd.DataFrame({"Date_Heure": dates, "Ville": villes,
+                         "Pluie (mm)": rng.gamma(0.6, 8, n).astype("float32")})
+
+
+def main(n: int) -> None:
+    df = releves(n)
+    moteur = MoteurAlertes()
+    t0 = time.perf_counter()
+    for ville, pos in df.groupby("Ville", observed=True).indices.items():
+        moteur.recalculer(ville, df.iloc[pos])
+    print(f"{n} relevés, {NB_STATIONS} stations – fenêtres construites en {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    maintenant = pd.Timestamp.now()
+    ajouts = [pd.DataFrame({"Date_Heure": [maintenant], "Pluie (mm)": [float(i % 80)]}) for i in range(NB_AJOUTS)]
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        df[df["Pluie (mm)"] >= SEUIL_ALERTE_MM]
+    ancien = (time.perf_counter() - t0) / 20 * 1000
+
+    t0 = time.perf_counter()
+    for i, a in enumerate(ajouts):
+        moteur.integrer(f"Station {i % NB_STATIONS:03d}", a)
+    nouveau = (time.perf_counter() - t0) / NB_AJOUTS * 1000
+
+    t0 = time.perf_counter()
+    actives = moteur.actives()
+    lecture = (time.perf_counter() - t0) * 1000
+    print(f"par relevé : filtre historique {ancien:7.2f} ms | moteur {nouveau:6.3f} ms"
+          f" | table des alertes actives lue en {lecture:.1f} ms ({len(actives)} lignes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,49 @@
+"""Débit de l'API JSON (api.py) lancée à part, par point d'accès.
+
+Usage :
+    uvicorn api:app --port 8502 --workers 1      # dans le dossier des données
+    python benchmarks/bench_api.py [url_de_base] [nb_requetes]   (défaut http://localhost:8502, 1000)
+
+Chaque point d'accès est appelé une fois (calcul), puis `nb_requetes` fois
+par 8 clients : corps servis depuis le cache, puis réponses 304 (If-None-Match).
+"""
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+CHEMINS = ["/stations", "/alerts", "/rollups?freq=D", "/observations?limit=1000"]
+NB_CLIENTS = 8
+
+
+def appeler(url: str, etag: str | None = None) -> tuple[int, str | None]:
+    requete = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(requete) as r:
+            r.read()
+            return r.status, r.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        return e.code, etag
+
+
+def debit(url: str, n: int, etag: str | None = None) -> float:
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(NB_CLIENTS) as ex:
+        list(ex.map(lambda _: appeler(url, etag), range(n)))
+    return n / (time.perf_counter() - debut)
+
+
+def main(base: str, n: int) -> None:
+    for chemin in CHEMINS:
+        url = base + chemin
+        t0 = time.perf_counter()
+        _, etag = appeler(url)
+        premier = (time.perf_counter() - t0) * 1000
+        print(f"{chemin:<28} 1er appel {premier:7.1f} ms | cache {debit(url, n):6.0f} req/s"
+              f" | 304 {debit(url, n, etag):6.0f} req/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8502",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
@@ -0,0 +1,88 @@
+"""Compare l'ancienne boucle par station de la Carte Interactive et statuts_stations(),
+puis mesure la construction de la couche des stations (vue entière et vue zoomée)
+pour un registre de 5 000 stations.
+
+Usage : python benchmarks/bench_carte.py [nb_lignes ...]
+(par défaut 100 000 et 1 000 000 relevés répartis sur les stations du registre)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from carte import couche_stations  # noqa: E402
+from registre import RegistreStations  # noqa: E402
+from statuts import statuts_stations  # noqa: E402
+
+TAILLES_DEFAUT = [100_000, 1_000_000]
+NB_STATIONS = 5_000
+
+
+def registre_synthetique(nb_stations: int = NB_STATIONS) -> RegistreStations:
+    """Pluviomètres répartis uniformément sur l'emprise de la Côte d'Ivoire."""
+    rng = np.random.default_rng(7)
+    return RegistreStations(pd.DataFrame({
+        "Ville": [f"PLUVIO-{i:05d}" for i in range(nb_stations)],
+        "Lat":   rng.uniform(4.3, 10.7, nb_stations),
+        "Lon":   rng.uniform(-8.6, -2.5, nb_stations),
+    }))
+
+
+def jeu(nb_lignes: int, maintenant: pd.Timestamp, stations) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    secondes = rng.integers(0, 3600 * 24 * 3650, nb_lignes)
+    return pd.DataFrame({
+        "Date_Heure": maintenant - pd.to_timedelta(secondes, unit="s"),
+        "Ville":      rng.choice(stations, nb_lignes),
+        "Pluie (mm)": rng.gamma(0.4, 8.0, nb_lignes).astype("float32"),
+        "Phenomenes": pd.Categorical(rng.choice(["", "Orage", "Brume"], nb_lignes)),
+    }).sort_values("Date_Heure", kind="stable", ignore_index=True)
+
+
+def boucle_par_station(df: pd.DataFrame, stations, nb_jours: int, maintenant: pd.Timestamp) -> None:
+    """Ancien calcul de la page : un masque sur tout l'historique par station."""
+    cutoff = maintenant - pd.Timedelta(days=nb_jours)
+    for v in stations:
+        dv = df[(df["Ville"] == v) & (df["Date_Heure"] >= cutoff)]
+        if not dv.empty:
+            dv.sort_values("Date_Heure").iloc[-1]
+            dv["Pluie (mm)"].sum()
+    cutoff24 = maintenant - pd.Timedelta(hours=24)
+    df[df["Date_Heure"] >= cutoff24].groupby("Ville")["Pluie (mm)"].sum()
+
+
+def chrono(fn, repetitions: int = 5) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repetitions):
+        fn()
+    return (time.perf_counter() - t0) / repetitions
+
+
+def main(tailles: list[int]) -> None:
+    maintenant = pd.Timestamp.now().floor("min")
+    reg = registre_synthetique()
+    echantillon = list(reg.noms[:15])
+    print(f"Statuts (15 stations)\n{'lignes':>12} | {'boucle':>9} | {'groupé':>9} | {'gain':>6}")
+    for n in tailles:
+        df = jeu(n, maintenant, echantillon)
+        t_boucle = chrono(lambda: boucle_par_station(df, echantillon, 7, maintenant))
+        t_groupe = chrono(lambda: statuts_stations(df, echantillon, 7, maintenant))
+        print(f"{n:>12,} | {t_boucle * 1000:>7.1f}ms | {t_groupe * 1000:>7.2f}ms | {t_boucle / t_groupe:>5.0f}x")
+
+    df = jeu(tailles[-1], maintenant, reg.noms)
+    t_statuts = chrono(lambda: statuts_stations(df, reg.noms, 7, maintenant), 3)
+    statuts = statuts_stations(df, reg.noms, 7, maintenant)
+    print(f"\nRegistre de {len(reg):,} stations, {tailles[-1]:,} relevés : statuts {t_statuts * 1000:.1f} ms")
+    for libelle, emprise, zoom in [("vue entière, zoom 7", None, 7),
+                                   ("vue zoomée, zoom 10", (6.5, -5.6, 7.0, -5.0), 10)]:
+        t = chrono(lambda: couche_stations(statuts, 7, True, True, reg, emprise, zoom), 3)
+        print(f"  couche {libelle:<22} {t * 1000:>7.1f} ms")
+    t = chrono(lambda: reg.plus_proche(7.0, -5.5), 1000)
+    print(f"  station la plus proche      {t * 1e6:>7.1f} µs")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAILLES_DEFAUT)
@@ -0,0 +1,107 @@
+"""Compare l'ancien rechargement complet des CSV et les chargeurs incrémentaux des dépôts.
+
+Usage : python benchmarks/bench_chargement.py [nb_lignes ...]
+(par défaut 1 000, 100 000 et 10 000 000 lignes réparties sur 15 stations)
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stockage import DepotParquet, DepotSQLite, typer_releves  # noqa: E402
+
+STATIONS = [
+    "Abidjan", "Bouaké", "Yamoussoukro", "Korhogo", "San-Pédro", "Man", "Odienné",
+    "Daloa", "Bondoukou", "Ferkessédougou", "Sassandra", "Tabou", "Abengourou",
+    "Divo", "Séguéla",
+]
+TAILLES_DEFAUT = [1_000, 100_000, 10_000_000]
+
+
+def charger_complet(dossier: str) -> pd.DataFrame:
+    """Ancien charger_toutes_donnees() : relecture de tous les CSV."""
+    all_dfs = []
+    for f in os.listdir(dossier):
+        if f.endswith(".csv"):
+            tmp = pd.read_csv(os.path.join(dossier, f))
+            tmp["Ville"] = f.replace(".csv", "")
+            all_dfs.append(tmp)
+    df = pd.concat(all_dfs, ignore_index=True)
+    df["Date_Heure"] = pd.to_datetime(df["Date_Heure"], errors="coerce")
+    df = df.dropna(subset=["Date_Heure"]).sort_values("Date_Heure")
+    df["Pluie (mm)"] = pd.to_numeric(df.get("Pluie (mm)", 0), errors="coerce").fillna(0)
+    return df
+
+
+def ecrire_jeu(dossier: str, nb_lignes: int) -> None:
+    rng = np.random.default_rng(42)
+    par_station = max(1, nb_lignes // len(STATIONS))
+    dates = pd.date_range("2000-01-01 06:00", periods=par_station, freq="4h48min")
+    for v in STATIONS:
+        pd.DataFrame({
+            "Date_Heure":      dates.strftime("%Y-%m-%d %H:%M"),
+            "Pluie (mm)":      rng.gamma(0.4, 8.0, par_station).round(1),
+            "Temperature (C)": rng.normal(28, 3, par_station).round(1),
+            "Humidite (%)":    rng.integers(40, 100, par_station),
+            "Vent (km/h)":     rng.gamma(2, 5, par_station).round(1),
+            "Phenomenes":      "",
+            "Obs":             "",
+            "Saisi_par":       "bench",
+        }).to_csv(os.path.join(dossier, f"{v}.csv"), index=False)
+
+
+def migrer(dossier: str, cible) -> None:
+    for v in STATIONS:
+        cible.importer_releves(v, typer_releves(pd.read_csv(os.path.join(dossier, f"{v}.csv"))))
+
+
+def ajouter_releve(cible) -> None:
+    cible.ajouter_releves("Abidjan", pd.DataFrame({
+        "Date_Heure": ["2099-01-01 06:00"], "Pluie (mm)": [12.5], "Temperature (C)": [27.0],
+        "Humidite (%)": [80], "Vent (km/h)": [3.0], "Phenomenes": ["Orage"],
+        "Obs": [""], "Saisi_par": ["bench"],
+    }))
+
+
+def memoire_mo(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def chrono(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main(tailles: list[int]) -> None:
+    print(f"{'lignes':>12} | {'dépôt':>8} | {'froid':>8} | {'Mo':>7} | {'+1 relevé':>10} | {'sans changement':>15}")
+    for n in tailles:
+        with tempfile.TemporaryDirectory() as dossier:
+            ecrire_jeu(dossier, n)
+            t0 = time.perf_counter()
+            df_csv = charger_complet(dossier)
+            t_complet = time.perf_counter() - t0
+            print(f"{n:>12,} | {'CSV':>8} | {t_complet:>7.3f}s | {memoire_mo(df_csv):>7.1f} | "
+                  f"{t_complet:>9.3f}s | {t_complet:>14.3f}s")
+            dossier_pq = os.path.join(dossier, "parquet")
+            os.makedirs(dossier_pq)
+            for nom, cible in [("Parquet", DepotParquet(dossier_pq)),
+                               ("SQLite", DepotSQLite(os.path.join(dossier, "bench.db")))]:
+                migrer(dossier, cible)
+                chargeur = cible.creer_chargeur()
+                t_froid = chrono(chargeur.charger)
+                mo = memoire_mo(chargeur.charger())
+                ajouter_releve(cible)
+                t_ajout = chrono(chargeur.charger)
+                t_rien = chrono(chargeur.charger)
+                assert len(chargeur.charger()) == len(df_csv) + 1
+                print(f"{'':>12} | {nom:>8} | {t_froid:>7.3f}s | {mo:>7.1f} | "
+                      f"{t_ajout:>9.4f}s | {t_rien:>14.5f}s")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or TAILLES_DEFAUT)
@@ -0,0 +1,75 @@
+"""Coût d'une sauvegarde de corrections (Historique & Corrections) selon la taille de la station.
+
+Pour chaque dépôt et chaque taille de station, on corrige `k` relevés
+(modification, suppression, ajout) et on mesure modifier_releves(), puis la
+relecture de la station (journal en attente rejoué) et le compactage.
+
+Usage : python benchmarks/bench_corrections.py [nb_lignes_corrigees]   (défaut 10)
+
+Sauvegarde de 10 corrections :
+                        avant journal   après
+  Parquet    10 000 relevés    97 ms     67 ms
+  Parquet   500 000 relevés  2260 ms    120 ms   (réécriture → ajout au journal)
+  SQLite    500 000 relevés    37 ms     55 ms   (journal inscrit dans la même transaction)
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stockage  # noqa: E402
+
+TAILLES = [10_000, 100_000, 500_000]
+
+
+def station(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Date_Heure": pd.date_range("2000-01-01", periods=n, freq="h"),
+        "Pluie (mm)": rng.gamma(.4, 20, n).round(1), "Temperature (C)": 28.0, "Humidite (%)": 70.0,
+        "Vent (km/h)": 3.0, "Phenomenes": "", "Obs": "", "Saisi_par": "agent",
+    })
+
+
+def corriger(depot: stockage.Depot, k: int) -> float:
+    jour = pd.Timestamp("2000-01-01").date()
+    avant = depot.lire_periode(["Man"], jour, jour).drop(columns=["Ville"]).head(k + 1)
+    apres = avant.astype({c: object for c in stockage.COLONNES_CATEGORIES})
+    apres["Pluie (mm)"] = apres["Pluie (mm)"] + 1
+    apres = apres.iloc[1:]                                        # une suppression
+    ajout = apres.tail(1).assign(id=None, Date_Heure=pd.Timestamp("1999-12-31"))
+    apres = pd.concat([apres, ajout], ignore_index=True)          # un ajout
+    t0 = time.perf_counter()
+    depot.modifier_releves("Man", avant, apres, "bench")
+    return time.perf_counter() - t0
+
+
+def mesurer(depot: stockage.Depot, n: int, k: int) -> str:
+    depot.importer_releves("Man", station(n))
+    sauvegarde = corriger(depot, k)
+    t0 = time.perf_counter()
+    depot.lire_station("Man")
+    lecture = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    depot.compacter("Man")
+    compactage = time.perf_counter() - t0
+    return (f"sauvegarde {sauvegarde * 1000:7.1f} ms | relecture {lecture * 1000:7.1f} ms"
+            f" | compactage {compactage * 1000:7.1f} ms")
+
+
+def main(k: int) -> None:
+    for n in TAILLES:
+        with tempfile.TemporaryDirectory() as dossier:
+            sqlite = stockage.DepotSQLite(os.path.join(dossier, "bench.db"))
+            print(f"SQLite  {n:>9,} relevés, {k} corrigés : {mesurer(sqlite, n, k)}")
+            parquet = stockage.DepotParquet(dossier)
+            print(f"Parquet {n:>9,} relevés, {k} corrigés : {mesurer(parquet, n, k)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
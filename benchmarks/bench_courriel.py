@@ -0,0 +1,78 @@
+"""Débit d'envoi : une connexion SMTP par message (ancien code) contre le pool + envoi par lot.
+
+Usage : python benchmarks/bench_courriel.py [nb_messages]   (défaut 200)
+Un serveur SMTP local (aiosmtpd) tient lieu de serveur réel ; chaque
+ouverture de connexion y est ralentie de LATENCE_CONNEXION_S pour simuler
+le coût d'une poignée de main STARTTLS + login sur un serveur distant.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import SMTP as ServeurSMTP  # noqa: E402
+
+import courriel  # noqa: E402
+
+PORT = 8026
+LATENCE_CONNEXION_S = 0.05
+
+
+class Boite:
+    def __init__(self):
+        self.recus = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recus += 1
+        return "250 OK"
+
+
+class ServeurLent(ServeurSMTP):
+    async def smtp_EHLO(self, hostname):
+        await asyncio.sleep(LATENCE_CONNEXION_S)
+        return await super().smtp_EHLO(hostname)
+
+
+class ControleurLent(Controller):
+    def factory(self):
+        return ServeurLent(self.handler)
+
+
+def destinataires(n: int) -> list[dict]:
+    return [{"email": f"agent{i}@sodexam.ci", "identifiant": f"agent{i}", "ville": "Abidjan",
+             "nb_alertes": i % 4} for i in range(n)]
+
+
+def main(n: int) -> None:
+    os.environ.update(SMTP_HOST="127.0.0.1", SMTP_PORT=str(PORT), SMTP_PASS="", SODEXAM_SMTP_TLS="0")
+    boite = Boite()
+    serveur = ControleurLent(boite, hostname="127.0.0.1", port=PORT)
+    serveur.start()
+    piece = os.urandom(64 * 1024)
+    modele = "Bonjour {identifiant},\nStation {ville} : {nb_alertes} alerte(s)."
+    try:
+        t0 = time.perf_counter()
+        for msg in courriel.personnaliser(destinataires(n), "Rapport", modele, piece, "r.pdf", "pdf"):
+            with courriel.ouvrir_connexion() as s:
+                s.send_message(msg)
+        t_simple = time.perf_counter() - t0
+        print(f"connexion par message : {n} messages en {t_simple:.2f} s ({n / t_simple:.1f} msg/s)")
+
+        pool = courriel.PoolSMTP(taille=3)
+        messages = courriel.personnaliser(destinataires(n), "Rapport", modele, piece, "r.pdf", "pdf")
+        bilan = courriel.envoyer_lot(messages, pool, debit_max=None)
+        print(f"pool + lot            : {bilan.resume()}, {pool.ouvertures} connexion(s) ouverte(s)")
+        bilan = courriel.envoyer_lot(
+            courriel.personnaliser(destinataires(n), "Rapport", modele, piece, "r.pdf", "pdf"),
+            pool, debit_max=50.0)
+        print(f"pool + lot, 50 msg/s  : {bilan.resume()}")
+        pool.fermer()
+    finally:
+        serveur.stop()
+    print(f"reçus par le serveur  : {boite.recus}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
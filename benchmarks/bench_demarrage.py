@@ -0,0 +1,89 @@
+"""Démarrage à froid et temps de rerun de l'application (page de connexion, puis chaque page).
+
+Chaque mesure tourne dans un processus neuf (imports à froid), sur un
+dossier de travail temporaire alimenté par quelques relevés de démonstration.
+
+Usage : python benchmarks/bench_demarrage.py [nb_reruns]   (défaut 5)
+
+Mesures (AppTest, 3 stations x 300 relevés) :
+                                  avant vues/   après
+  connexion, démarrage à froid       2250 ms    940 ms
+  connexion, rerun                    240 ms     15 ms
+  modules lourds à la connexion     folium, streamlit_folium, fpdf, smtplib | aucun
+(plotly et zipfile sont déjà importés par streamlit lui-même.)
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MESURE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_streamlit = time.perf_counter() - t0
+LOURDS = ("folium", "plotly", "streamlit_folium", "smtplib", "zipfile", "matplotlib", "fpdf")
+streamlit_seul = [m for m in LOURDS if m in sys.modules]   # déjà importés par streamlit lui-même
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+t0 = time.perf_counter(); at.run(); froid = time.perf_counter() - t0
+n = int(sys.argv[2])
+t0 = time.perf_counter()
+for _ in range(n):
+    at.run()
+rerun = (time.perf_counter() - t0) / n
+connexion = sorted(m for m in LOURDS if m in sys.modules and m not in streamlit_seul)
+at.text_input[0].input("admin"); at.text_input[1].input("admin123"); at.button[0].click(); at.run()
+pages = {}
+for page in at.sidebar.radio[0].options:
+    at.sidebar.radio[0].set_value(page)
+    t0 = time.perf_counter(); at.run(); premier = time.perf_counter() - t0
+    t0 = time.perf_counter(); at.run(); second = time.perf_counter() - t0
+    pages[page] = (premier, second, bool(at.exception))
+print(json.dumps({"streamlit": t_streamlit, "froid": froid, "rerun": rerun, "pages": pages, "connexion": connexion,
+                  "streamlit_seul": streamlit_seul,
+                  "modules": sorted(m for m in LOURDS if m in sys.modules and m not in streamlit_seul)}))
+"""
+
+
+def preparer(dossier: str) -> None:
+    import numpy as np
+    import pandas as pd
+    for f in ("utilisateurs.csv", "villes_ci.csv"):
+        shutil.copy(os.path.join(RACINE, f), dossier)
+    os.makedirs(os.path.join(dossier, "Donnees_Villes"))
+    rng = np.random.default_rng(0)
+    dates = pd.date_range(pd.Timestamp.now().normalize() - pd.Timedelta(days=60), periods=300, freq="4h48min")
+    for v in ("Abidjan", "Bouaké", "Man"):
+        pd.DataFrame({"Date_Heure": dates.strftime("%Y-%m-%d %H:%M"), "Pluie (mm)": rng.gamma(.4, 20, 300).round(1),
+                      "Temperature (C)": 28.0, "Humidite (%)": 70, "Vent (km/h)": 3.0, "Phenomenes": "",
+                      "Obs": "", "Saisi_par": "admin"}).to_csv(os.path.join(dossier, "Donnees_Villes", f"{v}.csv"),
+                                                              index=False)
+    subprocess.run([sys.executable, os.path.join(RACINE, "migrer_donnees.py")], cwd=dossier,
+                   capture_output=True, check=True)
+
+
+def main(nb_reruns: int) -> None:
+    with tempfile.TemporaryDirectory() as dossier:
+        preparer(dossier)
+        sortie = subprocess.run([sys.executable, "-c", MESURE, os.path.join(RACINE, "mon_code.py"), str(nb_reruns)],
+                                cwd=dossier, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": RACINE})
+        if sortie.returncode:
+            sys.exit(sortie.stderr[-2000:])
+        r = json.loads(sortie.stdout.strip().splitlines()[-1])
+    print(f"Import de streamlit (banc d'essai)   : {r['streamlit'] * 1000:7.0f} ms")
+    print(f"Page de connexion, démarrage à froid : {r['froid'] * 1000:7.0f} ms")
+    print(f"Page de connexion, rerun             : {r['rerun'] * 1000:7.1f} ms")
+    print(f"Déjà importés par streamlit          : {', '.join(r['streamlit_seul']) or '—'}")
+    print(f"Modules lourds après la connexion    : {', '.join(r['connexion']) or '—'}")
+    print(f"Modules lourds après toutes les pages: {', '.join(r['modules']) or '—'}")
+    for page, (premier, second, erreur) in r["pages"].items():
+        print(f"  {page:<28} 1re visite {premier * 1000:7.0f} ms | rerun {second * 1000:6.0f} ms"
+              + ("  (exception)" if erreur else ""))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
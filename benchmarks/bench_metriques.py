@@ -0,0 +1,52 @@
+"""Surcoût de l'instrumentation (metriques.mesurer) par appel, selon le mode.
+
+Chaque mode tourne dans un processus neuf (SODEXAM_METRIQUES lu à l'import).
+
+Usage : python benchmarks/bench_metriques.py [nb_appels]   (défaut 200 000)
+
+Mesures (fonction vide décorée par chronometre, compter_lignes compris) :
+  off            ~1 µs   (compter_lignes seul : le décorateur rend la fonction telle quelle)
+  echantillon    ~5 µs
+  complet        ~6 µs
+à comparer aux fonctions instrumentées, qui prennent de quelques ms à quelques s.
+"""
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MESURE = r"""
+import sys, time
+import metriques
+n = int(sys.argv[1])
+
+@metriques.chronometre()
+def fonction():
+    metriques.compter_lignes(1)
+
+def nue():
+    pass
+
+t0 = time.perf_counter()
+for _ in range(n):
+    nue()
+t_nue = time.perf_counter() - t0
+t0 = time.perf_counter()
+for _ in range(n):
+    fonction()
+t_instr = time.perf_counter() - t0
+print((t_instr - t_nue) / n * 1e6)
+"""
+
+
+def main(n: int) -> None:
+    for mode in ("off", "echantillon", "complet"):
+        sortie = subprocess.run([sys.executable, "-c", MESURE, str(n)], capture_output=True, text=True,
+                                env={**os.environ, "PYTHONPATH": RACINE, "SODEXAM_METRIQUES": mode,
+                                     "SODEXAM_METRIQUES_PORT": "0"}, check=True)
+        print(f"{mode:<12} {float(sortie.stdout.strip()):6.2f} µs par appel instrumenté")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
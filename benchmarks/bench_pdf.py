@@ -0,0 +1,47 @@
+"""Temps et mémoire de generer_rapport_alertes_pdf selon le nombre de lignes d'alerte.
+
+Usage : python benchmarks/bench_pdf.py [nb_lignes ...]   (défaut 1000 10000 100000)
+Chaque relevé dépasse le seuil : toutes les lignes finissent dans le tableau.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_alertes import generer_rapport_alertes_pdf  # noqa: E402
+
+VILLES = ["Abidjan", "Bouaké", "Daloa", "Korhogo", "San-Pédro", "Yamoussoukro", "Man", "Odienné"]
+
+
+def releves(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Date_Heure": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit="h"),
+        "Ville": rng.choice(VILLES, n),
+        "Pluie (mm)": rng.uniform(20, 180, n).round(1).astype("float32"),
+        "Phenomenes": rng.choice(["Orage, Vent fort", "Inondation", "", "Brouillard – Brume"], n),
+        "Saisi_par": rng.choice(["agent1", "agent2", "admin"], n),
+    })
+
+
+def main(tailles: list[int]) -> None:
+    print(f"{'lignes':>8} {'durée (s)':>10} {'lignes/s':>10} {'pic mém. (Mo)':>14} {'PDF (Ko)':>9}")
+    for n in tailles:
+        df = releves(n)
+        t0 = time.perf_counter()
+        pdf = generer_rapport_alertes_pdf(df, seuil_mm=50, titre_rapport="Banc d'essai")
+        duree = time.perf_counter() - t0
+        # Mémoire mesurée à part : tracemalloc ralentit fortement la génération
+        tracemalloc.start()
+        generer_rapport_alertes_pdf(df, seuil_mm=50, titre_rapport="Banc d'essai")
+        _, pic = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{n:>8} {duree:>10.2f} {n / duree:>10.0f} {pic / 1024**2:>14.1f} {len(pdf) / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000])
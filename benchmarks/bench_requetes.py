@@ -0,0 +1,52 @@
+"""Filtre (stations, début, fin) : masque `.dt.date` (ancien code) contre IndexReleves.
+
+Usage : python benchmarks/bench_requetes.py [nb_releves]   (défaut 2 000 000)
+"""
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from requetes import IndexReleves  # noqa: E402
+
+NB_STATIONS = 200
+
+
+def releves(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    villes = pd.Categorical([f"Station {i:03d}" for i in rng.integers(0, NB_STATIONS, n)])
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 5 * 365 * 24, n)), unit="h")
+    return pd.DataFrame({"Date_Heure": dates, "Ville": villes,
+                         "Pluie (mm)": rng.gamma(0.6, 8, n).astype("float32")})
+
+
+def chrono(f, repetitions: int = 5) -> float:
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        res = f()
+    return (time.perf_counter() - debut) / repetitions * 1000, len(res)
+
+
+def main(n: int) -> None:
+    df = releves(n)
+    t0 = time.perf_counter()
+    index = IndexReleves(df)
+    print(f"{n} relevés, {NB_STATIONS} stations – index construit en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    villes = ["Station 001", "Station 002", "Station 003"]
+    for libelle, d0, d1 in [("1 mois", date(2023, 6, 1), date(2023, 6, 30)),
+                            ("1 an", date(2023, 1, 1), date(2023, 12, 31))]:
+        ancien, k = chrono(lambda: df[df["Ville"].isin(villes)
+                                      & (df["Date_Heure"].dt.date >= d0) & (df["Date_Heure"].dt.date <= d1)], 2)
+        nouveau, k2 = chrono(lambda: index.requete(villes, d0, d1))
+        toutes, k3 = chrono(lambda: index.periode(d0, d1))
+        assert k == k2
+        print(f"{libelle:>7} : .dt.date {ancien:8.1f} ms | index 3 stations {nouveau:6.2f} ms ({k2} lignes)"
+              f" | toutes stations {toutes:6.2f} ms ({k3} lignes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,483 @@
+"""Test de charge : sessions agents et administrateurs simultanées sur un vrai serveur Streamlit.
+
+Usage :
+    python benchmarks/charge.py [--agents 16] [--admins 3] [--iterations 5] [--lignes 100000]
+                                [--scenarios saisie curseur pdf pointe] [--stockage sqlite|parquet]
+                                [--sortie charge.json]
+
+Le banc lance ``streamlit run mon_code.py`` dans un dossier temporaire (jeu
+synthétique de generateur.py jusqu'à la veille, un compte par session) puis
+ouvre une connexion websocket par session, comme un navigateur : même
+processus serveur, mêmes caches et même file de tâches qu'en production.
+Chaque session envoie ses demandes de rerun (BackMsg) avec l'état de ses
+widgets et lit les éléments renvoyés avec l'arbre de streamlit.testing.
+(AppTest seul ne convient pas : ses exécutions partagent un état global et
+ne peuvent pas tourner en parallèle dans un même processus.)
+
+Les agents sont répartis sur les stations à tour de rôle : au-delà d'un
+agent par station, deux agents saisissent le même créneau et le second est
+refusé (conflit d'écriture).
+
+Scénarios (connexion par le vrai formulaire, puis départ simultané) :
+  saisie    les agents soumettent form_saisie aux créneaux du jour
+  curseur   agents et administrateurs font glisser la période des Analyses
+  pdf       les administrateurs génèrent le rapport PDF (clic, puis attente)
+  pointe    07 h / 18 h : saisie des agents pendant que les administrateurs
+            rafraîchissent le tableau de bord, le curseur et le PDF
+
+Pour chaque scénario et chaque action : nombre, latence p50 / p95 / p99 et
+maximale du rerun (demande envoyée -> fin du script), taux d'erreurs
+(exception affichée, délai dépassé, connexion perdue) et conflits
+d'écriture (relevé déjà saisi, base verrouillée).
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+APPLICATION = os.path.join(RACINE, "mon_code.py")
+MOT_DE_PASSE_AGENT = "agent123"
+MOT_DE_PASSE_ADMIN = "admin123"   # compte admin de utilisateurs.csv
+HEURES = ["06:00", "08:00", "12:00", "18:00", "21:00"]
+DELAI_DEMARRAGE = 120      # secondes pour que le serveur réponde
+DELAI_RERUN = 300          # secondes avant d'abandonner un rerun
+DELAI_PDF = 300            # secondes avant d'abandonner l'attente d'un PDF
+PAUSE_SONDAGE = 0.5        # intervalle des reruns en attendant le PDF
+SCENARIOS = ["saisie", "curseur", "pdf", "pointe"]
+MOTIFS_CONFLIT = ("existe déjà", "database is locked", "database is busy", "DoublonReleve")
+
+
+# ============================================================
+# MESURES
+# ============================================================
+@dataclass
+class Mesure:
+    scenario: str
+    session: str
+    action: str
+    duree: float
+    erreur: str | None = None
+    conflit: bool = False
+
+
+class Journal:
+    """Mesures de toutes les sessions (ajouts depuis plusieurs threads)."""
+
+    def __init__(self):
+        self.mesures: list[Mesure] = []
+        self._verrou = threading.Lock()
+
+    def ajouter(self, mesure: Mesure) -> None:
+        with self._verrou:
+            self.mesures.append(mesure)
+
+    def synthese(self, scenario: str) -> dict:
+        """Latences (ms), erreurs et conflits par action du scénario."""
+        par_action: dict[str, list[Mesure]] = {}
+        for m in self.mesures:
+            if m.scenario == scenario:
+                par_action.setdefault(m.action, []).append(m)
+        res = {}
+        for action, mesures in par_action.items():
+            durees = np.array([m.duree for m in mesures]) * 1000
+            p50, p95, p99 = np.percentile(durees, [50, 95, 99])
+            erreurs = [m.erreur for m in mesures if m.erreur]
+            res[action] = {"nb": len(mesures), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+                           "max_ms": float(durees.max()), "erreurs": len(erreurs),
+                           "taux_erreur": len(erreurs) / len(mesures),
+                           "conflits": sum(m.conflit for m in mesures),
+                           "exemples_erreurs": sorted(set(erreurs))[:3]}
+        return res
+
+
+# ============================================================
+# NAVIGATEUR (protocole websocket de Streamlit)
+# ============================================================
+class Navigateur:
+    """Une session du serveur, vue comme le ferait le navigateur.
+
+    ``poser()`` et ``cliquer()`` préparent les valeurs des widgets du dernier
+    arbre, sérialisées comme par le navigateur ; ``executer()`` les envoie
+    avec la demande de rerun et attend la fin du script. ``arbre`` contient
+    alors les éléments affichés (``arbre.button``, ``arbre.error``… de
+    streamlit.testing). Les widgets non modifiés gardent côté serveur la
+    valeur du rerun précédent.
+    """
+
+    def __init__(self, url: str):
+        from websockets.sync.client import connect
+        self._pile = ExitStack()
+        self.ws = self._pile.enter_context(connect(url, subprotocols=["streamlit"], max_size=None,
+                                                   open_timeout=30))
+        self.page = ""
+        self.arbre = None
+        self._etats = {}
+
+    def fermer(self) -> None:
+        self._pile.close()
+
+    def poser(self, widget, valeur) -> None:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        etat = WidgetState(id=widget.id)
+        if widget.type == "number_input":
+            etat.double_value = float(valeur)
+        elif widget.type == "date_input":
+            etat.string_array_value.data[:] = [valeur.isoformat()]
+        elif widget.type == "slider":   # curseur de dates : microsecondes depuis 1970
+            epoque = datetime(1970, 1, 1)
+            etat.double_array_value.data[:] = [
+                (datetime.combine(d, datetime.min.time()) - epoque) / timedelta(microseconds=1) for d in valeur]
+        else:                           # text_input, radio, selectbox : libellé
+            etat.string_value = str(valeur)
+        self._etats[widget.id] = etat
+
+    def cliquer(self, bouton) -> None:
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        self._etats[bouton.id] = WidgetState(id=bouton.id, trigger_value=True)
+
+    def executer(self, delai: float = DELAI_RERUN) -> float:
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+        demande = BackMsg()
+        demande.rerun_script.page_script_hash = self.page
+        demande.rerun_script.widget_states.widgets.extend(self._etats.values())
+        self._etats = {}
+        t0 = time.perf_counter()
+        self.ws.send(demande.SerializeToString())
+        messages = []
+        while True:
+            reste = delai - (time.perf_counter() - t0)
+            if reste <= 0:
+                raise TimeoutError(f"rerun de plus de {delai:.0f} s")
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv(timeout=reste))
+            genre = msg.WhichOneof("type")
+            if genre == "new_session":           # début d'une exécution (y compris après st.rerun())
+                messages = []
+                self.page = msg.new_session.page_script_hash
+            elif genre == "delta":
+                messages.append(msg)
+            elif genre == "script_finished" and msg.script_finished in (
+                    ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR):
+                break
+        duree = time.perf_counter() - t0
+        self.arbre = parse_tree_from_messages(messages)
+        return duree
+
+
+# ============================================================
+# SESSION SIMULÉE
+# ============================================================
+class Session:
+    """Un utilisateur : ses actions sur les pages, chronométrées dans le journal."""
+
+    def __init__(self, url: str, identifiant: str, mot_de_passe: str, scenario: str, journal: Journal):
+        self.identifiant = identifiant
+        self.mot_de_passe = mot_de_passe
+        self.scenario = scenario
+        self.journal = journal
+        self.nav = Navigateur(url)
+
+    def _rerun(self, action: str) -> None:
+        """Un rerun chronométré ; erreurs et conflits relevés sur la page affichée."""
+        erreur, duree = None, 0.0
+        t0 = time.perf_counter()
+        try:
+            duree = self.nav.executer()
+        except Exception as e:   # délai dépassé, connexion perdue
+            erreur, duree = f"{type(e).__name__}: {e}", time.perf_counter() - t0
+        arbre = self.nav.arbre
+        if erreur is None and arbre.exception:
+            erreur = str(arbre.exception[0].value).splitlines()[0]
+        messages = [erreur or ""] + ([str(e.value) for e in arbre.error] if arbre is not None else [])
+        conflit = any(motif in texte for texte in messages for motif in MOTIFS_CONFLIT)
+        self.journal.ajouter(Mesure(self.scenario, self.identifiant, action, duree, erreur, conflit))
+
+    def _bouton(self, debut_libelle: str):
+        return next(b for b in self.nav.arbre.button if (b.label or "").startswith(debut_libelle))
+
+    def connecter(self) -> None:
+        self._rerun("ouverture")
+        self.nav.poser(self.nav.arbre.text_input[0], self.identifiant)
+        self.nav.poser(self.nav.arbre.text_input[1], self.mot_de_passe)
+        self.nav.cliquer(self._bouton("Se connecter"))
+        self._rerun("connexion")
+
+    def ouvrir(self, page: str) -> None:
+        self.nav.poser(self.nav.arbre.sidebar.radio[0], page)
+        self._rerun("navigation")
+
+    def fermer(self) -> None:
+        self.nav.fermer()
+
+    def saisir(self, jour: date, heure: str, pluie: float) -> None:
+        arbre = self.nav.arbre
+        self.nav.poser(arbre.date_input[0], jour)
+        self.nav.poser(next(s for s in arbre.selectbox if s.label.startswith("🕐")), heure)
+        self.nav.poser(arbre.number_input[0], pluie)
+        self.nav.cliquer(self._bouton("💾 Enregistrer"))
+        self._rerun("saisie")
+
+    def faire_glisser(self, rang: int, largeur_jours: int = 90) -> None:
+        """Fenêtre de `largeur_jours` reculée de 30 jours à chaque rang."""
+        curseur = next(s for s in self.nav.arbre.slider if s.label.startswith("🗓️"))
+        epoque = datetime(1970, 1, 1)
+        d_min = (epoque + timedelta(microseconds=curseur.proto.min)).date()
+        d_max = (epoque + timedelta(microseconds=curseur.proto.max)).date()
+        fin = max(d_min + timedelta(days=1), d_max - timedelta(days=30 * rang))
+        self.nav.poser(curseur, (max(d_min, fin - timedelta(days=largeur_jours)), fin))
+        self._rerun("curseur")
+
+    def tableau_de_bord(self) -> None:
+        self._rerun("tableau_de_bord")
+
+    def generer_pdf(self, rang: int) -> None:
+        """Clic sur « Générer le PDF » puis reruns jusqu'au PDF prêt, comme le fragment de la page."""
+        debut = self.nav.arbre.date_input(key="pdf_deb")
+        self.nav.poser(debut, max(debut.min, debut.max - timedelta(days=30 + rang)))
+        self.nav.cliquer(self.nav.arbre.button(key="btn_gen_pdf"))
+        t0 = time.perf_counter()
+        self._rerun("pdf_clic")
+        erreur = None
+        while not any("PDF prêt" in str(s.value) for s in self.nav.arbre.success):
+            if self.nav.arbre.exception or any("génération" in str(e.value) for e in self.nav.arbre.error):
+                erreur = "échec de la génération"
+                break
+            if time.perf_counter() - t0 > DELAI_PDF:
+                erreur = "délai dépassé"
+                break
+            time.sleep(PAUSE_SONDAGE)
+            self.nav.executer()
+        self.journal.ajouter(Mesure(self.scenario, self.identifiant, "pdf_pret",
+                                    time.perf_counter() - t0, erreur))
+
+
+# ============================================================
+# SCÉNARIOS
+# ============================================================
+def _creneau(rang: int) -> tuple[date, str]:
+    """Créneau d'observation n° `rang` à partir d'aujourd'hui 06:00."""
+    return date.today() + timedelta(days=rang // len(HEURES)), HEURES[rang % len(HEURES)]
+
+
+def _saisies(session: Session, iterations: int, rng: np.random.Generator, premier: int) -> None:
+    for k in range(premier, premier + iterations):
+        jour, heure = _creneau(k)
+        session.saisir(jour, heure, round(float(rng.gamma(0.6, 14.0)), 1))
+
+
+def _curseur(session: Session, iterations: int, rng, premier: int) -> None:
+    for k in range(iterations):
+        session.faire_glisser(k)
+
+
+def _pdf(session: Session, iterations: int, rng, premier: int) -> None:
+    for k in range(iterations):
+        session.generer_pdf(k)
+
+
+def _admin_pointe(session: Session, iterations: int, rng, premier: int) -> None:
+    for k in range(iterations):
+        session.ouvrir("📊 Dashboard Admin")
+        session.tableau_de_bord()
+        session.ouvrir("📈 Analyses Graphiques")
+        session.faire_glisser(k)
+        session.ouvrir("🔴 Rapport PDF Alertes")
+        session.generer_pdf(k)
+
+
+# Scénario -> (page et travail des agents, page et travail des administrateurs) ;
+# un travail reçoit (session, itérations, générateur aléatoire, premier créneau de saisie)
+PLANS = {
+    "saisie":  (("📝 Saisie Relevé", _saisies), None),
+    "curseur": (("📈 Analyses Graphiques", _curseur), ("📈 Analyses Graphiques", _curseur)),
+    "pdf":     (None, ("🔴 Rapport PDF Alertes", _pdf)),
+    "pointe":  (("📝 Saisie Relevé", _saisies), ("📊 Dashboard Admin", _admin_pointe)),
+}
+
+
+def executer_scenario(url: str, scenario: str, comptes: list[tuple[str, str, str]], iterations: int,
+                      journal: Journal, graine: int, premier_creneau: int = 0) -> tuple[int, float]:
+    """Connecte les sessions du scénario puis les lance ensemble ; renvoie (sessions, durée en s).
+
+    Les saisies commencent au créneau `premier_creneau` : un scénario ne
+    ressaisit pas les créneaux d'un scénario précédent.
+    """
+    plan_agents, plan_admins = PLANS[scenario]
+    taches = [(identifiant, mot_de_passe, plan_admins if role == "admin" else plan_agents)
+              for identifiant, mot_de_passe, role in comptes]
+    taches = [t for t in taches if t[2]]
+    depart = threading.Barrier(len(taches) + 1)
+
+    def jouer(rang: int, identifiant: str, mot_de_passe: str, plan) -> None:
+        page, travail = plan
+        session = None
+        try:
+            session = Session(url, identifiant, mot_de_passe, scenario, journal)
+            session.connecter()
+            session.ouvrir(page)
+        except Exception as e:
+            journal.ajouter(Mesure(scenario, identifiant, "preparation", 0.0, f"{type(e).__name__}: {e}"))
+            session = None
+        depart.wait()
+        if session is None:
+            return
+        try:
+            travail(session, iterations, np.random.default_rng([graine, rang]), premier_creneau)
+        except Exception as e:   # widget absent : la page n'est pas celle attendue
+            journal.ajouter(Mesure(scenario, identifiant, "scenario", 0.0, f"{type(e).__name__}: {e}"))
+        finally:
+            session.fermer()
+
+    fils = [threading.Thread(target=jouer, args=(rang, *tache), daemon=True) for rang, tache in enumerate(taches)]
+    for fil in fils:
+        fil.start()
+    depart.wait()
+    t0 = time.perf_counter()
+    for fil in fils:
+        fil.join()
+    return len(taches), time.perf_counter() - t0
+
+
+# ============================================================
+# DOSSIER DE TRAVAIL ET SERVEUR
+# ============================================================
+def preparer(dossier: str, nb_lignes: int, nb_agents: int, nb_admins: int, graine: int) -> list[tuple]:
+    """Relevés synthétiques jusqu'à la veille et comptes des sessions ; renvoie (id, mot de passe, rôle).
+
+    Le premier administrateur est le compte admin de utilisateurs.csv.
+    """
+    from generateur import generer, reseau
+    from stockage import DOSSIER_DONNEES, depot, hash_password
+
+    shutil.copy(os.path.join(RACINE, "utilisateurs.csv"), dossier)
+    net = reseau(nb_lignes, graine)
+    net.to_csv(os.path.join(dossier, "villes_ci.csv"), index=False)
+    os.makedirs(os.path.join(dossier, DOSSIER_DONNEES), exist_ok=True)
+    d = depot()
+    for ville, releves in generer(nb_lignes, graine, date.today() - timedelta(days=1), net):
+        d.importer_releves(ville, releves)
+
+    comptes = []
+    for i in range(nb_agents):
+        identifiant = f"agent{i + 1:03d}"
+        d.enregistrer_utilisateur(identifiant, hash_password(MOT_DE_PASSE_AGENT),
+                                  net["Ville"].iloc[i % len(net)], "agent", "")
+        comptes.append((identifiant, MOT_DE_PASSE_AGENT, "agent"))
+    for i in range(nb_admins):
+        identifiant = "admin" if i == 0 else f"direction{i:02d}"
+        if i:
+            d.enregistrer_utilisateur(identifiant, hash_password(MOT_DE_PASSE_ADMIN), "Abidjan", "admin", "")
+        comptes.append((identifiant, MOT_DE_PASSE_ADMIN, "admin"))
+    return comptes
+
+
+def _port_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def demarrer_serveur(dossier: str, journal_serveur) -> tuple[subprocess.Popen, str]:
+    """Lance streamlit run dans `dossier` ; renvoie le processus et l'URL du websocket."""
+    port = _port_libre()
+    serveur = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APPLICATION, "--server.headless=true",
+         f"--server.port={port}", "--server.address=127.0.0.1", "--server.fileWatcherType=none",
+         "--browser.gatherUsageStats=false", "--logger.level=error"],
+        cwd=dossier, stdout=journal_serveur, stderr=subprocess.STDOUT,
+        env={**os.environ, "SODEXAM_METRIQUES_PORT": "0"})
+    limite = time.monotonic() + DELAI_DEMARRAGE
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return serveur, f"ws://127.0.0.1:{port}/_stcore/stream"
+        except OSError:
+            pass
+        if serveur.poll() is not None or time.monotonic() > limite:
+            serveur.kill()
+            raise RuntimeError("le serveur Streamlit n'a pas démarré")
+        time.sleep(0.3)
+
+
+def afficher(rapport: dict) -> None:
+    for scenario, res in rapport["scenarios"].items():
+        print(f"\n{scenario} — {res['sessions']} sessions, {res['duree_s']:.1f} s, "
+              f"{res['actions_par_s']:.1f} actions/s")
+        print(f"  {'action':<16}{'nb':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+              f"{'erreurs':>9}{'conflits':>10}")
+        for action, s in res["actions"].items():
+            print(f"  {action:<16}{s['nb']:>6}{s['p50_ms']:>10.0f}{s['p95_ms']:>10.0f}{s['p99_ms']:>10.0f}"
+                  f"{s['max_ms']:>10.0f}{s['taux_erreur']:>8.0%} {s['conflits']:>9}")
+            for exemple in s["exemples_erreurs"]:
+                print(f"      ! {exemple[:110]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=16)
+    parser.add_argument("--admins", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=5, help="actions par session et par scénario")
+    parser.add_argument("--lignes", type=int, default=100_000, help="relevés synthétiques du dépôt")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--stockage", choices=["sqlite", "parquet"], default=os.environ.get("SODEXAM_STOCKAGE", "sqlite"))
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--sortie", help="fichier JSON des résultats")
+    args = parser.parse_args()
+
+    # Avant l'import de stockage : le banc et le serveur utilisent le même dépôt
+    os.environ["SODEXAM_STOCKAGE"] = args.stockage
+    sys.path.insert(0, os.path.join(RACINE, "benchmarks"))
+
+    journal = Journal()
+    rapport = {"agents": args.agents, "admins": args.admins, "iterations": args.iterations,
+               "lignes": args.lignes, "stockage": args.stockage, "scenarios": {}}
+    initial = os.getcwd()
+    with tempfile.TemporaryDirectory() as dossier:
+        os.chdir(dossier)
+        try:
+            comptes = preparer(dossier, args.lignes, args.agents, args.admins, args.graine)
+            with open(os.path.join(dossier, "serveur.log"), "w") as journal_serveur:
+                serveur, url = demarrer_serveur(dossier, journal_serveur)
+                try:
+                    for i, scenario in enumerate(args.scenarios):
+                        sessions, duree = executer_scenario(url, scenario, comptes, args.iterations,
+                                                            journal, args.graine, i * args.iterations)
+                        actions = journal.synthese(scenario)
+                        nb = sum(a["nb"] for a in actions.values())
+                        rapport["scenarios"][scenario] = {"sessions": sessions, "duree_s": duree,
+                                                          "actions_par_s": nb / duree if duree else 0.0,
+                                                          "actions": actions}
+                finally:
+                    serveur.terminate()
+                    serveur.wait(30)
+        finally:
+            os.chdir(initial)
+    afficher(rapport)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump({**rapport, "mesures": [asdict(m) for m in journal.mesures]}, f, indent=2,
+                      ensure_ascii=False, default=str)
+        print(f"\nRésultats : {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""Générateur de relevés synthétiques reproductibles (graine fixe), de 1 000 à 50 millions de lignes.
+
+Usage :
+    python benchmarks/generateur.py 1000000 [--dossier jeu_1M] [--graine 42] [--fin 2026-06-30]
+
+Écrit ``Donnees_Villes/<station>.csv`` (format des anciens CSV, lisible par
+migrer_donnees.py et ingestion.py) et le ``villes_ci.csv`` du réseau généré.
+
+Le réseau part des stations réelles de villes_ci.csv. Chaque station reçoit
+au plus ANNEES_MAX années de relevés aux heures synoptiques (06, 08, 12, 18
+et 21 h) ; au-delà, des stations satellites (« Man 2 », « Man 3 »…) sont
+placées autour des stations réelles. Les relevés les plus récents tombent
+à la date de fin : la carte et les alertes ont toujours des données fraîches.
+
+Le tirage suit le climat ivoirien sans prétendre le modéliser :
+  - pluie : probabilité saisonnière (deux saisons des pluies au sud, une au
+    nord), plus forte en fin de journée, hauteurs en loi gamma avec une
+    queue d'épisodes intenses au-delà du seuil d'alerte ;
+  - température, humidité et vent : moyenne selon la latitude, cycle
+    saisonnier et diurne, bruit gaussien, bornés par BORNES_MESURES ;
+  - phénomènes (PHENOMENES_OPTIONS) liés aux mesures : orages et vent fort
+    sous les fortes pluies, brume et rosée au matin sec, sécheresse au nord
+    en saison sèche.
+Chaque station a son propre générateur (graine, rang de la station) : un
+jeu plus grand contient les mêmes stations réelles, tirées à l'identique.
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import phenomenes  # noqa: E402
+from referentiel import BORNES_MESURES, SEUIL_ALERTE_MM  # noqa: E402
+from registre import charger_registre  # noqa: E402
+from stockage import DOSSIER_DONNEES  # noqa: E402
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEURES_OBSERVATION = (6, 8, 12, 18, 21)
+ANNEES_MAX = 50          # profondeur maximale d'historique par station
+TAUX_LACUNES = 0.03      # relevés manquants (panne, absence de l'observateur)
+ECART_SATELLITES = 0.15  # dispersion (degrés) des satellites autour de leur station
+LATITUDE_NORD = 8.0      # au-delà : une seule saison des pluies
+SAISI_PAR = "generateur"
+
+# Facteurs par heure d'observation (06, 08, 12, 18, 21 h)
+_PLUIE_HEURE = np.array([0.8, 0.6, 0.7, 1.4, 1.5])
+_TEMP_HEURE = np.array([-4.0, -2.0, 3.0, 1.0, -1.0])
+_HUMIDITE_HEURE = np.array([10.0, 6.0, -12.0, -4.0, 5.0])
+
+
+def _cloche(jour: np.ndarray, centre: float, largeur: float) -> np.ndarray:
+    """Courbe en cloche sur le jour de l'année (périodique)."""
+    ecart = (jour - centre + 182.5) % 365.25 - 182.5
+    return np.exp(-0.5 * (ecart / largeur) ** 2)
+
+
+def probabilite_pluie(jour: np.ndarray, lat: float) -> np.ndarray:
+    """Probabilité qu'un relevé soit pluvieux selon le jour de l'année et la latitude."""
+    if lat < LATITUDE_NORD:
+        saison = 0.32 * _cloche(jour, 165, 35) + 0.18 * _cloche(jour, 295, 25)   # juin, octobre
+    else:
+        saison = 0.30 * _cloche(jour, 225, 45)                                   # août
+    return 0.04 + saison
+
+
+def reseau(nb_lignes: int, graine: int = 42, stations: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Stations (Ville, Lat, Lon) nécessaires pour `nb_lignes` relevés.
+
+    Les stations réelles d'abord, puis autant de satellites que nécessaire,
+    répartis à tour de rôle autour d'elles.
+    """
+    if stations is None:
+        stations = charger_registre(os.path.join(RACINE, "villes_ci.csv")).stations
+    capacite = ANNEES_MAX * 365.25 * len(HEURES_OBSERVATION) * (1 - TAUX_LACUNES)
+    nb_stations = max(len(stations), math.ceil(nb_lignes / capacite))
+    if nb_stations == len(stations):
+        return stations.reset_index(drop=True)
+    rng = np.random.default_rng([graine, 0])
+    rangs = np.arange(len(stations), nb_stations)
+    base = stations.iloc[rangs % len(stations)].reset_index(drop=True)
+    satellites = pd.DataFrame({
+        "Ville": [f"{v} {r // len(stations) + 1}" for v, r in zip(base["Ville"], rangs)],
+        "Lat":   (base["Lat"] + rng.normal(0, ECART_SATELLITES, len(base))).round(4),
+        "Lon":   (base["Lon"] + rng.normal(0, ECART_SATELLITES, len(base))).round(4),
+    })
+    return pd.concat([stations, satellites], ignore_index=True)
+
+
+def _dates(nb: int, fin: pd.Timestamp, rng: np.random.Generator) -> pd.DatetimeIndex:
+    """`nb` créneaux d'observation parmi les plus récents avant `fin`, avec lacunes."""
+    nb_creneaux = math.ceil(nb / (1 - TAUX_LACUNES)) if nb > 100 else nb
+    nb_jours = math.ceil(nb_creneaux / len(HEURES_OBSERVATION))
+    jours = pd.date_range(end=fin.normalize(), periods=nb_jours, freq="D").to_numpy()
+    heures = (np.array(HEURES_OBSERVATION) * 3600).astype("timedelta64[s]")
+    creneaux = (jours[:, None] + heures[None, :]).ravel()[-nb_creneaux:]
+    garder = np.sort(rng.choice(len(creneaux), nb, replace=False)) if nb_creneaux > nb else slice(None)
+    return pd.DatetimeIndex(creneaux[garder])
+
+
+def generer_station(lat: float, nb: int, fin: pd.Timestamp, rng: np.random.Generator) -> pd.DataFrame:
+    """`nb` relevés d'une station à la latitude `lat`, se terminant à `fin`."""
+    dates = _dates(nb, fin, rng)
+    jour = dates.dayofyear.to_numpy().astype(np.float64)
+    h = np.searchsorted(HEURES_OBSERVATION, dates.hour.to_numpy())
+    nord = lat >= LATITUDE_NORD
+    bornes = {c: BORNES_MESURES[c] for c in BORNES_MESURES}
+
+    # Pluie : occurrence saisonnière x heure, hauteur gamma + épisodes intenses
+    p = probabilite_pluie(jour, lat) * _PLUIE_HEURE[h] / _PLUIE_HEURE.mean()
+    pleut = rng.random(nb) < p
+    pluie = rng.gamma(0.6, 14.0, nb)
+    intense = rng.random(nb) < 0.03
+    pluie[intense] = rng.gamma(3.0, 25.0, int(intense.sum()))
+    pluie = np.where(pleut, np.clip(pluie, 0.1, bornes["Pluie (mm)"][1]), 0.0).round(1)
+
+    # Saison sèche : décembre-février (harmattan, plus marqué au nord)
+    seche = _cloche(jour, 15, 30)
+    temp = ((26.0 + 0.4 * (lat - 5)) + 1.5 * _cloche(jour, 75, 40) - (3.0 if nord else 1.0) * seche
+            + _TEMP_HEURE[h] * (1.4 if nord else 1.0) - 2.0 * pleut + rng.normal(0, 1.2, nb))
+    humidite = ((85.0 - 5.0 * (lat - 5)) - (30.0 if nord else 10.0) * seche
+                + _HUMIDITE_HEURE[h] + 10.0 * pleut + rng.normal(0, 5, nb))
+    vent = rng.gamma(2.0, 4.0, nb)
+
+    # Phénomènes, conditionnés par les mesures
+    u = rng.random((6, nb))
+    b = phenomenes.BITS
+    orage = (pleut & (pluie >= 10) & (u[0] < 0.5)) | (pleut & (u[0] < 0.08))
+    vent_fort = orage & (u[1] < 0.25)
+    vent[vent_fort] += rng.gamma(6.0, 8.0, int(vent_fort.sum()))
+    matin_sec = ~pleut & (h <= 1)
+    m = np.zeros(nb, dtype=np.uint16)
+    m[orage] |= b["Orage"]
+    m[vent_fort] |= b["Vent Fort"]
+    m[orage & (u[2] < 0.01)] |= b["Grêle"]
+    m[orage & (u[2] > 0.9995)] |= b["Tornade"]
+    m[(pluie >= SEUIL_ALERTE_MM) & (u[3] < 0.4)] |= b["Inondation"]
+    m[matin_sec & (u[4] < 0.12)] |= b["Brume"]
+    m[matin_sec & (h == 0) & (humidite > 90) & (u[5] < 0.15)] |= b["Brouillard"]
+    m[matin_sec & (h == 0) & (u[5] > 0.8)] |= b["Rosée"]
+    if nord:
+        m[~pleut & (seche > 0.5) & (h == 2) & (u[4] > 0.98)] |= b["Sécheresse"]
+
+    return pd.DataFrame({
+        "Date_Heure":      dates,
+        "Pluie (mm)":      pluie,
+        "Temperature (C)": np.clip(temp, *bornes["Temperature (C)"]).round(1),
+        "Humidite (%)":    np.clip(humidite, *bornes["Humidite (%)"]).round(0),
+        "Vent (km/h)":     np.clip(vent, *bornes["Vent (km/h)"]).round(1),
+        "Phenomenes":      m,
+        "Obs":             "",
+        "Saisi_par":       SAISI_PAR,
+    })
+
+
+def generer(nb_lignes: int, graine: int = 42, fin: pd.Timestamp | None = None,
+            stations: pd.DataFrame | None = None):
+    """Itère sur (ville, relevés) ; le total fait exactement `nb_lignes`.
+
+    Phenomenes est le masque de bits (entier) : typer_releves() le convertit,
+    phenomenes.LIBELLES donne le texte.
+    """
+    fin = (pd.Timestamp.now() if fin is None else pd.Timestamp(fin)).normalize() + pd.Timedelta(hours=23)
+    net = reseau(nb_lignes, graine, stations)
+    parts = np.full(len(net), nb_lignes // len(net))
+    parts[:nb_lignes % len(net)] += 1
+    for i, (ville, lat, nb) in enumerate(zip(net["Ville"], net["Lat"], parts)):
+        if nb:
+            yield ville, generer_station(float(lat), int(nb), fin, np.random.default_rng([graine, i + 1]))
+
+
+def ecrire(dossier: str, nb_lignes: int, graine: int = 42, fin=None) -> pd.DataFrame:
+    """Écrit le jeu dans `dossier` (villes_ci.csv et Donnees_Villes/) ; renvoie le réseau."""
+    net = reseau(nb_lignes, graine)
+    os.makedirs(os.path.join(dossier, DOSSIER_DONNEES), exist_ok=True)
+    net.to_csv(os.path.join(dossier, "villes_ci.csv"), index=False)
+    libelles = np.array(phenomenes.LIBELLES, dtype=object)
+    for ville, df in generer(nb_lignes, graine, fin, net):
+        df["Date_Heure"] = df["Date_Heure"].dt.strftime("%Y-%m-%d %H:%M")
+        df["Phenomenes"] = libelles[df["Phenomenes"].to_numpy()]
+        df.to_csv(os.path.join(dossier, DOSSIER_DONNEES, f"{ville}.csv"), index=False)
+    return net
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("nb_lignes", type=int)
+    parser.add_argument("--dossier", default=".", help="dossier de travail de l'application (défaut : courant)")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--fin", help="date du dernier relevé (AAAA-MM-JJ, défaut : aujourd'hui)")
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    net = ecrire(args.dossier, args.nb_lignes, args.graine, args.fin)
+    print(f"{args.nb_lignes:,} relevés sur {len(net)} stations écrits dans {args.dossier} "
+          f"en {time.perf_counter() - t0:.1f} s".replace(",", " "))
+
+
+if __name__ == "__main__":
+    main()
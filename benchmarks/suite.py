@@ -0,0 +1,248 @@
+"""Suite de mesures reproductible des chemins de données, résultats en JSON.
+
+Usage :
+    python benchmarks/suite.py [--tailles 1000 100000 1000000] [--stockage sqlite|parquet]
+                               [--repetitions 3] [--sortie suite.json] [--reference ancienne.json]
+
+Pour chaque taille, un processus neuf, dans un dossier temporaire, importe
+le jeu synthétique de generateur.py (graine et date de fin fixes : deux
+exécutions mesurent les mêmes relevés) puis chronomètre :
+  import                 relevés générés écrits dans le dépôt, station par station
+  chargement             premier charger() du chargeur de l'application
+  chargement_rerun       charger() sans changement (chaque rerun de page)
+  statuts_carte          statuts_stations() sur 7 jours (carte interactive)
+  agregation_dashboard   cumuls journaliers, cumul par station, comptes de phénomènes
+  reechantillonnage      cumuls D / W / ME et série brute réduite (analyses, 3 stations)
+  export_excel           df_to_excel_bytes() d'une station (historique)
+  rapport_pdf            rapport des 30 derniers jours, graphiques compris
+  export_zip             archive ZIP de toutes les stations
+
+Chaque étape donne la durée du premier appel et, sauf import et
+chargement, la médiane des suivants (caches chauds). Le JSON (commit, machine, versions, durées en secondes)
+sert de référence : avec --reference, toute étape plus lente de plus de
+--tolerance est signalée et le code de sortie vaut 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+TAILLES_DEFAUT = [1_000, 100_000, 1_000_000]
+FIN_DEFAUT = "2026-06-30"        # date du dernier relevé généré
+STATIONS_ANALYSE = 3             # stations tracées par défaut sur la page Analyses
+JOURS_CARTE = 7
+JOURS_RAPPORT = 30
+TOLERANCE_DEFAUT = 0.25
+ECART_MIN_S = 0.005              # écarts plus petits ignorés (bruit de mesure)
+
+
+# ============================================================
+# MESURES (processus enfant, dans le dossier de travail)
+# ============================================================
+def _chrono(fonction, repetitions: int) -> dict:
+    """Durée du premier appel et médiane des `repetitions` suivants."""
+    durees = []
+    for i in range(repetitions + 1):
+        t0 = time.perf_counter()
+        fonction(i)
+        durees.append(time.perf_counter() - t0)
+    return {"premier": durees[0], "median": statistics.median(durees[1:]) if repetitions else durees[0]}
+
+
+def mesurer(nb_lignes: int, graine: int, fin: str, repetitions: int) -> dict:
+    import pandas as pd
+
+    import phenomenes
+    from agregats import FREQUENCES
+    from coeur import df_to_excel_bytes
+    from echantillonnage import points_cibles, reduire
+    from exports import archive_en_memoire
+    from generateur import generer, reseau
+    from graphiques import cache_graphiques
+    from metriques import memoire
+    from pdf_alertes import generer_rapport_alertes_pdf
+    from referentiel import SEUIL_ALERTE_MM
+    from requetes import IndexReleves
+    from statuts import statuts_stations
+    from stockage import DOSSIER_DONNEES, depot
+
+    noms = list(reseau(nb_lignes, graine)["Ville"])
+    maintenant = pd.Timestamp(fin) + pd.Timedelta(hours=23)
+    etapes = {}
+
+    os.makedirs(DOSSIER_DONNEES, exist_ok=True)
+    d = depot()
+    generation = ecriture = 0.0
+    t0 = time.perf_counter()
+    for ville, releves in generer(nb_lignes, graine, fin):
+        t1 = time.perf_counter()
+        generation += t1 - t0
+        d.importer_releves(ville, releves)
+        t0 = time.perf_counter()
+        ecriture += t0 - t1
+    etapes["import"] = {"premier": ecriture}
+
+    chargeur = d.creer_chargeur()
+    t0 = time.perf_counter()
+    df = chargeur.charger()
+    duree = time.perf_counter() - t0
+    etapes["chargement"] = {"premier": duree}
+    etapes["chargement_rerun"] = _chrono(lambda _: chargeur.charger(), repetitions)
+
+    etapes["statuts_carte"] = _chrono(lambda _: statuts_stations(df, noms, JOURS_CARTE, maintenant), repetitions)
+
+    def dashboard(_):
+        chargeur.agregats.journalier()
+        chargeur.agregats.cumul_par_station()
+        phenomenes.compter(df["Phenomenes"])
+    etapes["agregation_dashboard"] = _chrono(dashboard, repetitions)
+
+    villes = noms[:STATIONS_ANALYSE]
+    debut_analyse, fin_analyse = df["Date_Heure"].min().date(), df["Date_Heure"].max().date()
+
+    def analyses(_):
+        for freq in FREQUENCES.values():
+            chargeur.agregats.tableau(freq, villes, debut_analyse, fin_analyse)
+        brut = IndexReleves(df).requete(villes, debut_analyse, fin_analyse)
+        reduire(brut, points_cibles(nb_series=len(villes)))
+    etapes["reechantillonnage"] = _chrono(analyses, repetitions)
+
+    station = d.lire_station(noms[0]).drop(columns=["id"], errors="ignore")
+    etapes["export_excel"] = _chrono(lambda _: df_to_excel_bytes(station), repetitions)
+
+    fin_rapport = maintenant.date()
+    debut_rapport = fin_rapport - pd.Timedelta(days=JOURS_RAPPORT)
+
+    def rapport(i):
+        # Version distincte à chaque appel : les graphiques sont recalculés
+        generer_rapport_alertes_pdf(df, SEUIL_ALERTE_MM, debut_rapport, fin_rapport,
+                                    version_donnees=(chargeur.version, i))
+    etapes["rapport_pdf"] = _chrono(rapport, repetitions)
+    cache_graphiques().vider()
+
+    def archive(_):
+        archive_en_memoire(noms).close()
+    etapes["export_zip"] = _chrono(archive, repetitions)
+
+    return {"lignes": len(df), "stations": len(noms), "generation": generation,
+            "memoire_pic": memoire()["pic"], "etapes": etapes}
+
+
+# ============================================================
+# ORCHESTRATION
+# ============================================================
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versions() -> dict:
+    import numpy
+    import pandas
+    return {"python": platform.python_version(), "pandas": pandas.__version__, "numpy": numpy.__version__}
+
+
+def executer_taille(nb_lignes: int, args) -> dict:
+    """Mesures d'une taille dans un processus neuf et un dossier vide."""
+    with tempfile.TemporaryDirectory() as dossier:
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([RACINE, os.path.join(RACINE, "benchmarks")]),
+               "SODEXAM_STOCKAGE": args.stockage, "SODEXAM_METRIQUES": "off", "SODEXAM_METRIQUES_PORT": "0"}
+        sortie = subprocess.run([sys.executable, os.path.abspath(__file__), "--enfant", str(nb_lignes),
+                                 "--graine", str(args.graine), "--fin", args.fin,
+                                 "--repetitions", str(args.repetitions)],
+                                cwd=dossier, env=env, capture_output=True, text=True)
+    if sortie.returncode:
+        sys.exit(sortie.stderr[-3000:])
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def comparer(resultats: dict, reference: dict, tolerance: float) -> list[str]:
+    """Étapes plus lentes que la référence de plus de `tolerance` (même taille)."""
+    regressions = []
+    for taille, mesure in resultats["tailles"].items():
+        ancienne = reference.get("tailles", {}).get(taille)
+        if not ancienne:
+            continue
+        for etape, durees in mesure["etapes"].items():
+            avant = ancienne["etapes"].get(etape)
+            if not avant:
+                continue
+            for cle in [c for c in ("premier", "median") if c in durees and c in avant]:
+                if (avant[cle] > 0 and durees[cle] > avant[cle] * (1 + tolerance)
+                        and durees[cle] - avant[cle] > ECART_MIN_S):
+                    regressions.append(f"{taille:>10} {etape:<22} {cle:<8} "
+                                       f"{avant[cle] * 1000:9.1f} -> {durees[cle] * 1000:9.1f} ms "
+                                       f"(x{durees[cle] / avant[cle]:.2f})")
+    return regressions
+
+
+def afficher(resultats: dict) -> None:
+    for taille, mesure in resultats["tailles"].items():
+        print(f"\n{int(taille):_} relevés, {mesure['stations']} stations ".replace("_", " ")
+              + f"(génération {mesure['generation']:.1f} s, pic mémoire {(mesure['memoire_pic'] or 0) / 2**20:.0f} Mo)")
+        for etape, durees in mesure["etapes"].items():
+            print(f"  {etape:<22} 1er {durees['premier'] * 1000:10.1f} ms"
+                  + (f" | médiane {durees['median'] * 1000:10.1f} ms" if "median" in durees else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--stockage", choices=["sqlite", "parquet"], default=os.environ.get("SODEXAM_STOCKAGE", "sqlite"))
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--fin", default=FIN_DEFAUT, help=f"date du dernier relevé (défaut {FIN_DEFAUT})")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--sortie", help="fichier JSON des résultats (défaut : suite-<commit>-<stockage>.json)")
+    parser.add_argument("--reference", metavar="JSON", help="résultats précédents à comparer")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE_DEFAUT,
+                        help=f"ralentissement admis avant signalement (défaut {TOLERANCE_DEFAUT:.0%})")
+    parser.add_argument("--enfant", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.enfant is not None:
+        print(json.dumps(mesurer(args.enfant, args.graine, args.fin, args.repetitions)))
+        return
+
+    commit = _commit()
+    resultats = {"commit": commit, "date": datetime.now().isoformat(timespec="seconds"),
+                 "machine": {"systeme": platform.platform(), "processeur": platform.machine(),
+                             "coeurs": os.cpu_count(), **_versions()},
+                 "stockage": args.stockage, "graine": args.graine, "fin": args.fin,
+                 "repetitions": args.repetitions, "tailles": {}}
+    for taille in args.tailles:
+        resultats["tailles"][str(taille)] = executer_taille(taille, args)
+    afficher(resultats)
+
+    sortie = args.sortie or f"suite-{commit or 'local'}-{args.stockage}.json"
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats : {sortie}")
+
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = json.load(f)
+        regressions = comparer(resultats, reference, args.tolerance)
+        if reference.get("stockage") != args.stockage:
+            print(f"\nAttention : la référence a été mesurée sur le dépôt {reference.get('stockage')}.")
+        print(f"\nComparaison avec {reference.get('commit')} (tolérance {args.tolerance:.0%}) : "
+              + ("aucune régression" if not regressions else f"{len(regressions)} régression(s)"))
+        for ligne in regressions:
+            print("  " + ligne)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# === CONTENU DU FICHIER carte.py ===
+"""Construction de la carte Folium des stations et cache du rendu HTML.
+
+- ``construire_carte`` : carte complète (fond, marqueurs, grappes, carte de
+  chaleur, légende), rendue une fois puis mise en cache ;
+- ``carte_de_base`` + ``couche_stations`` : mode léger, le fond de carte reste
+  identique d'un rerun à l'autre et seule la couche des stations visibles
+  (emprise et zoom renvoyés par st_folium) est envoyée au navigateur.
+Les grappes sont calculées côté serveur à partir de l'index du registre.
+"""
+import threading
+from collections import OrderedDict
+
+import folium
+import numpy as np
+import pandas as pd
+from folium.plugins import HeatMap
+
+import metriques
+from registre import RegistreStations
+
+CENTRE_CARTE = [7.5, -5.5]
+ZOOM_CARTE = 7
+MAX_MARQUEURS = 500   # au-delà, les stations visibles sont toujours regroupées
+
+# Ordre de gravité des couleurs d'alerte et teintes des grappes
+GRAVITE = ["gray", "green", "blue", "orange", "red"]
+TEINTES = {"gray": "#7f8c8d", "green": "#00b894", "blue": "#0066cc", "orange": "#e17055", "red": "#d63031"}
+
+LEGENDE_HTML = """
+        <div style="position:fixed;bottom:30px;left:30px;z-index:1000;background:white;
+                    padding:12px 16px;border-radius:10px;box-shadow:0 2px 8px rgba(0,0,0,.2);font-size:.85rem;">
+            <b>Légende</b><br>
+            🔴 Alerte (&ge;50 mm) &nbsp; 🟠 Vigilance (&ge;20 mm)<br>
+            🔵 Pluie légère &nbsp; 🟢 Sec &nbsp; ⚫ Aucune donnée
+        </div>"""
+
+
+def carte_de_base() -> folium.Map:
+    """Fond de carte et légende, sans marqueurs."""
+    m = folium.Map(location=CENTRE_CARTE, zoom_start=ZOOM_CARTE, tiles="CartoDB positron")
+    m.get_root().html.add_child(folium.Element(LEGENDE_HTML))
+    return m
+
+
+def _popup_station(v: str, s_v: pd.Series, nb_jours: int) -> tuple[str, float]:
+    if s_v["Couleur"] == "gray":
+        return f"<b>{v}</b><br>Aucune donnée.", 0
+    pluie_val = s_v["Pluie (mm)"]
+    info = (
+        f"<b style='font-size:1.05em'>{v}</b><br>"
+        f"📅 Dernier relevé : {s_v['Derniere_Date'].strftime('%d/%m %H:%M')}<br>"
+        f"🌧️ Pluie : <b>{pluie_val} mm</b><br>"
+        f"📦 Cumul {nb_jours}j : <b>{s_v['Cumul (mm)']:.1f} mm</b><br>"
+        f"🌪️ Phénomène : {s_v['Phenomene']}"
+    )
+    alerte = s_v.get("Alerte")
+    if isinstance(alerte, str) and alerte:
+        info += f"<br>{alerte} en cours"
+    return info, pluie_val
+
+
+def _marqueur_grappe(lat: float, lon: float, nb: int, couleur: str, pluie_max: float) -> folium.Marker:
+    teinte = TEINTES[couleur]
+    return folium.Marker(
+        location=[lat, lon],
+        tooltip=f"{nb} stations – max {pluie_max:.1f} mm",
+        icon=folium.DivIcon(
+            icon_size=(36, 36), icon_anchor=(18, 18),
+            html=(f'<div style="width:36px;height:36px;border-radius:18px;background:{teinte};'
+                  f'opacity:.85;color:white;font-weight:700;text-align:center;line-height:36px;">{nb}</div>'),
+        ),
+    )
+
+
+def stations_visibles(statuts: pd.DataFrame, reg: RegistreStations, emprise=None) -> tuple[np.ndarray, pd.DataFrame]:
+    """Stations du registre dans `emprise` (sud, ouest, nord, est), jointes à leur statut."""
+    idx = reg.dans_emprise(*emprise) if emprise else np.arange(len(reg))
+    vis = reg.stations.iloc[idx].set_index("Ville").join(statuts, how="left")
+    vis["Couleur"] = vis["Couleur"].fillna("gray")
+    return idx, vis
+
+
+@metriques.chronometre()
+def ajouter_stations(cible, statuts: pd.DataFrame, nb_jours: int, heatmap: bool, clusters: bool,
+                     reg: RegistreStations, emprise=None, zoom: int = ZOOM_CARTE) -> None:
+    """Ajoute marqueurs et carte de chaleur à `cible` (carte ou couche).
+
+    Seules les stations de `emprise` sont envoyées. Le regroupement est calculé
+    ici pour le niveau de zoom courant (et imposé au-delà de MAX_MARQUEURS).
+    """
+    idx, vis = stations_visibles(statuts, reg, emprise)
+    metriques.compter_lignes(len(vis))
+    seules = vis
+    if clusters or len(vis) > MAX_MARQUEURS:
+        vis = vis.assign(Grappe=reg.grappes(idx, zoom),
+                         Gravite=vis["Couleur"].map(GRAVITE.index))
+        nb = vis.groupby("Grappe")["Lat"].transform("size")
+        seules = vis[nb == 1]
+        grappes = vis[nb > 1].groupby("Grappe").agg(
+            Lat=("Lat", "mean"), Lon=("Lon", "mean"), Nb=("Lat", "size"),
+            Gravite=("Gravite", "max"), Pluie=("Pluie (mm)", "max"),
+        )
+        for g in grappes.itertuples():
+            pluie_max = 0.0 if pd.isna(g.Pluie) else g.Pluie
+            _marqueur_grappe(g.Lat, g.Lon, g.Nb, GRAVITE[g.Gravite], pluie_max).add_to(cible)
+
+    for v, s_v in seules.iterrows():
+        info, pluie_val = _popup_station(v, s_v, nb_jours)
+        folium.Marker(
+            location=[s_v["Lat"], s_v["Lon"]],
+            popup=folium.Popup(info, max_width=300),
+            tooltip=f"{v} – {pluie_val} mm",
+            icon=folium.Icon(color=s_v["Couleur"], icon="tint", prefix="fa"),
+        ).add_to(cible)
+
+    if heatmap:
+        actives = vis[vis["Couleur"] != "gray"]
+        heat_data = actives[["Lat", "Lon", "Pluie (mm)"]].to_numpy().tolist()
+        if heat_data:
+            HeatMap(heat_data, radius=35, blur=20, min_opacity=0.3).add_to(cible)
+
+
+def construire_carte(statuts: pd.DataFrame, nb_jours: int, heatmap: bool, clusters: bool,
+                     reg: RegistreStations) -> folium.Map:
+    """Carte complète à la vue initiale (toutes les stations du registre)."""
+    m = carte_de_base()
+    ajouter_stations(m, statuts, nb_jours, heatmap, clusters, reg)
+    return m
+
+
+def couche_stations(statuts: pd.DataFrame, nb_jours: int, heatmap: bool, clusters: bool,
+                    reg: RegistreStations, emprise=None, zoom: int = ZOOM_CARTE) -> folium.FeatureGroup:
+    """Couche des stations visibles pour le mode léger (``st_folium(feature_group_to_add=...)``)."""
+    couche = folium.FeatureGroup(name="Stations")
+    ajouter_stations(couche, statuts, nb_jours, heatmap, clusters, reg, emprise, zoom)
+    return couche
+
+
+def emprise_vue(etat_carte: dict | None) -> tuple[tuple[float, float, float, float] | None, int]:
+    """(emprise, zoom) renvoyés par st_folium au dernier déplacement de la carte."""
+    if not etat_carte or not etat_carte.get("bounds"):
+        return None, ZOOM_CARTE
+    b = etat_carte["bounds"]
+    try:
+        emprise = (b["_southWest"]["lat"], b["_southWest"]["lng"],
+                   b["_northEast"]["lat"], b["_northEast"]["lng"])
+    except (KeyError, TypeError):
+        return None, ZOOM_CARTE
+    if any(c is None for c in emprise):
+        return None, ZOOM_CARTE
+    return emprise, int(etat_carte.get("zoom") or ZOOM_CARTE)
+
+
+def empreinte_statuts(statuts: pd.DataFrame) -> int:
+    """Empreinte du tableau des statuts : deux cartes identiques ont la même."""
+    return int(pd.util.hash_pandas_object(statuts, index=True).sum())
+
+
+class CacheCartes:
+    """Cache LRU du HTML des cartes rendues, partagé entre sessions."""
+
+    def __init__(self, taille: int = 32):
+        self.taille = taille
+        self._verrou = threading.Lock()
+        self._entrees: OrderedDict = OrderedDict()
+        self.succes = 0
+        self.echecs = 0
+
+    def obtenir(self, cle, fabrique) -> str:
+        """HTML associé à `cle` ; `fabrique()` n'est appelée qu'en cas d'absence."""
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return self._entrees[cle]
+        html = fabrique()
+        with self._verrou:
+            self.echecs += 1
+            self._entrees[cle] = html
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+        return html
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
@@ -0,0 +1,242 @@
+# === CONTENU DU FICHIER coeur.py ===
+"""Socle commun des pages : thème, accès partagés aux relevés, petits utilitaires.
+
+Importé par mon_code.py à chaque rerun, il ne charge que des modules légers
+(stockage, index, agrégats). Les dépendances lourdes (folium, plotly, envoi
+d'e-mails, archives) sont importées par les pages de vues/ à leur première
+ouverture.
+"""
+import os
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+import metriques
+from agregats import Agregats
+from alertes import MoteurAlertes
+from referentiel import SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM
+from requetes import IndexReleves
+from stockage import depot
+
+# ============================================================
+# THÈME SODEXAM
+# ============================================================
+CSS = """
+<style>
+/* === Palette === */
+:root {
+    --bleu:    #003f8a;
+    --bleu2:   #0066cc;
+    --cyan:    #00aaff;
+    --vert:    #00b894;
+    --orange:  #e17055;
+    --rouge:   #d63031;
+    --gris:    #f0f4f8;
+    --texte:   #2d3436;
+}
+
+/* Fond général */
+[data-testid="stAppViewContainer"] {background: #f5f7fa;}
+[data-testid="stSidebar"]          {background: linear-gradient(180deg, #003f8a 0%, #001f5a 100%);}
+
+/* Textes sidebar */
+[data-testid="stSidebar"] * {color: #e8f4ff !important;}
+[data-testid="stSidebar"] hr {border-color: rgba(255,255,255,0.2) !important;}
+
+/* Radio sidebar */
+[data-testid="stSidebar"] .stRadio label {
+    background: rgba(255,255,255,0.08);
+    border-radius: 8px;
+    padding: 6px 12px;
+    margin: 3px 0;
+    display: block;
+    transition: background .2s;
+}
+[data-testid="stSidebar"] .stRadio label:hover {background: rgba(255,255,255,0.18);}
+
+/* Cartes KPI */
+.kpi-card {
+    background: white;
+    border-radius: 14px;
+    padding: 18px 22px;
+    box-shadow: 0 2px 12px rgba(0,63,138,.10);
+    border-left: 5px solid var(--bleu2);
+    margin-bottom: 10px;
+}
+.kpi-card h3 {margin: 0; font-size: 2.1rem; color: var(--bleu);}
+.kpi-card p  {margin: 0; color: #636e72; font-size: .85rem; text-transform: uppercase; letter-spacing: .05em;}
+.kpi-card.alerte {border-left-color: var(--rouge);}
+.kpi-card.vert   {border-left-color: var(--vert);}
+.kpi-card.orange {border-left-color: var(--orange);}
+
+/* Badges alerte */
+.badge-alerte    {background:#ffeaa7;color:#d35400;padding:4px 10px;border-radius:20px;font-weight:700;font-size:.8rem;}
+.badge-vigilance {background:#dfe6e9;color:#2d3436;padding:4px 10px;border-radius:20px;font-weight:600;font-size:.8rem;}
+.badge-ok        {background:#d4edda;color:#155724;padding:4px 10px;border-radius:20px;font-weight:600;font-size:.8rem;}
+
+/* Entêtes de sections */
+.section-header {
+    background: linear-gradient(90deg, #003f8a, #0066cc);
+    color: white !important;
+    padding: 10px 18px;
+    border-radius: 10px;
+    margin-bottom: 20px;
+    font-size: 1.2rem;
+}
+
+/* Bouton principal */
+.stButton > button[kind="primary"] {
+    background: linear-gradient(90deg, #003f8a, #0066cc);
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-weight: 600;
+}
+</style>
+"""
+
+def appliquer_theme():
+    # Renvoyé à chaque rerun : Streamlit retire tout élément qui n'est pas réémis
+    st.markdown(CSS, unsafe_allow_html=True)
+
+def afficher_logo():
+    for ext in ["logo.png", "logo.jpg", "logo.jpeg", "LOGO.PNG", "LOGO.JPG"]:
+        if os.path.exists(ext):
+            st.sidebar.image(ext, use_container_width=True)
+            return
+    st.sidebar.markdown(
+        "<h2 style='text-align:center;color:#7ecfff;letter-spacing:.1em;'>🌧️ SODEXAM</h2>",
+        unsafe_allow_html=True,
+    )
+
+# ============================================================
+# RELEVÉS PARTAGÉS
+# ============================================================
+@st.cache_resource
+def _chargeur_donnees():
+    # Une seule instance par processus : le DataFrame est partagé entre sessions
+    return depot().creer_chargeur()
+
+def charger_toutes_donnees() -> pd.DataFrame:
+    with metriques.mesurer("charger_toutes_donnees"):
+        df = _chargeur_donnees().charger()
+        metriques.compter_lignes(len(df))
+    return df
+
+def version_donnees() -> int:
+    # Change à chaque modification des relevés : clé des caches des pages
+    return _chargeur_donnees().version
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _index_releves(_df: pd.DataFrame, version: int) -> IndexReleves:
+    return IndexReleves(_df)
+
+def index_releves() -> IndexReleves:
+    # Index par station des relevés partagés, reconstruit à chaque nouvelle version
+    chargeur = _chargeur_donnees()
+    return _index_releves(chargeur.charger(), chargeur.version)
+
+def charger_agregats() -> Agregats:
+    # Cumuls jour/semaine/mois tenus à jour avec les relevés partagés
+    chargeur = _chargeur_donnees()
+    chargeur.charger()
+    return chargeur.agregats
+
+def moteur_alertes() -> MoteurAlertes:
+    # Alertes actives évaluées par le chargeur à chaque relevé ajouté
+    chargeur = _chargeur_donnees()
+    chargeur.charger()
+    return chargeur.alertes
+
+# ============================================================
+# MÉTRIQUES
+# ============================================================
+@st.cache_resource
+def demarrer_metriques():
+    # Un serveur /metrics par processus (voir metriques.py)
+    return metriques.demarrer_serveur()
+
+def cache_donnees(**options):
+    """st.cache_data dont les appels et les manques sont comptés (et les calculs chronométrés)."""
+    def decorer(f):
+        @wraps(f)   # nom et source de `f` : la clé du cache Streamlit reste propre à `f`
+        def calcul(*args, **kwargs):
+            metriques.collecte.manque_cache(f.__name__)
+            with metriques.mesurer(f.__name__):
+                return f(*args, **kwargs)
+        en_cache = st.cache_data(**options)(calcul)
+
+        @wraps(f)
+        def appel(*args, **kwargs):
+            metriques.collecte.appel_cache(f.__name__)
+            return en_cache(*args, **kwargs)
+        appel.clear = en_cache.clear
+        return appel
+    return decorer
+
+# ============================================================
+# UTILITAIRES
+# ============================================================
+def badge_niveau(val_mm: float) -> str:
+    if val_mm >= SEUIL_ALERTE_MM:
+        return f'<span class="badge-alerte">🚨 ALERTE {val_mm} mm</span>'
+    elif val_mm >= SEUIL_VIGILANCE_MM:
+        return f'<span class="badge-vigilance">⚠️ VIGILANCE {val_mm} mm</span>'
+    return f'<span class="badge-ok">✅ Normal {val_mm} mm</span>'
+
+def df_to_excel_bytes(df: pd.DataFrame) -> bytes:
+    from exports import exporter_tableau
+    return exporter_tableau(df, "xlsx")
+
+# ============================================================
+# EXPORTS À LA DEMANDE
+# ============================================================
+SEUIL_COMPRESSION = 100_000   # lignes au-delà desquelles la compression du CSV est proposée
+
+@st.cache_resource
+def cache_exports():
+    # Fichiers d'export partagés par les sessions (voir exports.CacheExports)
+    from exports import CacheExports
+    return CacheExports()
+
+@st.cache_resource
+def file_taches():
+    # Pool de threads partagé : PDF, archives et e-mails ne bloquent plus les sessions
+    from taches import FileTaches
+    return FileTaches()
+
+def export_a_la_demande(cle: tuple, fmt: str, libelle: str, base: str, lire, nb_lignes: int) -> None:
+    """Bouton « Préparer » puis bouton de téléchargement de l'export.
+
+    Rien n'est sérialisé tant que l'utilisateur ne le demande pas. `cle`
+    (version des données et filtres) identifie l'export dans le cache avec
+    le format et la compression ; `lire()` renvoie le DataFrame à exporter.
+    """
+    from exports import exporter_tableau, nom_export
+
+    ident = f"export_{base}_{fmt}"
+    compression = None
+    if fmt == "csv" and nb_lignes > SEUIL_COMPRESSION:
+        choix = st.selectbox("🗜️ Compression", ["aucune", "gzip", "zip"], key=f"{ident}_compression")
+        compression = None if choix == "aucune" else choix
+    cle = (*cle, fmt, compression)
+    contenu = cache_exports().lire(cle)
+    if contenu is None:
+        if not st.button(f"⚙️ Préparer {libelle}", key=f"{ident}_preparer"):
+            return
+        barre = st.progress(0.0, text="📄 Préparation…")
+
+        def avancer(fait: int, total: int) -> None:
+            barre.progress(fait / max(total, 1), text=f"📄 {fait:,} / {total:,} lignes écrites".replace(",", " "))
+        try:
+            contenu = exporter_tableau(lire(), fmt, base, compression, avancer)
+        except ValueError as e:
+            barre.empty()
+            st.error(f"❌ {e}")
+            return
+        barre.empty()
+        cache_exports().ecrire(cle, contenu)
+    fichier, mime = nom_export(base, fmt, compression)
+    st.download_button(f"📥 Télécharger {libelle}", data=contenu, file_name=fichier,
+                       mime=mime, key=f"{ident}_telecharger")
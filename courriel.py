@@ -0,0 +1,263 @@
+# === CONTENU DU FICHIER courriel.py ===
+"""Envoi des e-mails SODEXAM (rapports PDF, archives, diffusion des alertes).
+
+Serveur et identifiants lus dans l'environnement :
+SMTP_HOST (smtp.gmail.com), SMTP_PORT (587), SMTP_USER, SMTP_PASS.
+STARTTLS est obligatoire : un serveur qui ne le propose pas est refusé
+avant tout envoi d'identifiants. SODEXAM_SMTP_TLS=0 le désactive, pour le
+seul serveur local de test (aiosmtpd) ; l'authentification reste utilisée
+si le serveur la propose.
+
+Les connexions authentifiées sont réutilisées (``PoolSMTP``) ; ``envoyer_lot``
+diffuse des messages personnalisés à de nombreux destinataires avec un débit
+plafonné et renvoie un bilan (envoyés, échecs, messages par seconde).
+"""
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email import encoders
+
+import metriques
+
+
+def config_smtp() -> dict:
+    return {
+        "hote":         os.environ.get("SMTP_HOST", "smtp.gmail.com"),
+        "port":         int(os.environ.get("SMTP_PORT", "587")),
+        "utilisateur":  os.environ.get("SMTP_USER", "votre_mail@gmail.com"),
+        "mot_de_passe": os.environ.get("SMTP_PASS", "votre_code_16_lettres"),
+        "tls":          os.environ.get("SODEXAM_SMTP_TLS", "1") != "0",
+    }
+
+
+def construire_message(destinataire: str, sujet: str, corps: str,
+                       piece: bytes | None = None, nom_piece: str = "", type_piece: str = "octet-stream",
+                       expediteur: str | None = None) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg["From"]    = expediteur or config_smtp()["utilisateur"]
+    msg["To"]      = destinataire
+    msg["Subject"] = f"SODEXAM – {sujet}"
+    msg.attach(MIMEText(corps, "plain"))
+    if piece is not None:
+        part = MIMEBase("application", type_piece)
+        part.set_payload(piece)
+        encoders.encode_base64(part)
+        part.add_header("Content-Disposition", f"attachment; filename={nom_piece}")
+        msg.attach(part)
+    return msg
+
+
+def signature() -> str:
+    return f"\n\nGénéré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}.\n\n— Système SODEXAM"
+
+
+def ouvrir_connexion(config: dict | None = None, delai: float = 30) -> smtplib.SMTP:
+    """Connexion SMTP prête à l'envoi (STARTTLS obligatoire, login si proposé par le serveur)."""
+    config = config or config_smtp()
+    serveur = smtplib.SMTP(config["hote"], config["port"], timeout=delai)
+    serveur.ehlo()
+    if config.get("tls", True):
+        if not serveur.has_extn("starttls"):
+            serveur.close()
+            raise smtplib.SMTPNotSupportedError(
+                f"{config['hote']}:{config['port']} ne propose pas STARTTLS (SODEXAM_SMTP_TLS=0 pour un serveur de test)")
+        serveur.starttls()
+        serveur.ehlo()
+    if serveur.has_extn("auth") and config["mot_de_passe"]:
+        serveur.login(config["utilisateur"], config["mot_de_passe"])
+    return serveur
+
+
+# ============================================================
+# POOL DE CONNEXIONS
+# ============================================================
+class PoolSMTP:
+    """Connexions SMTP authentifiées réutilisées d'un envoi à l'autre.
+
+    Une connexion inactive depuis plus de `inactivite_max` secondes, ou qui ne
+    répond plus à NOOP, est refermée et remplacée.
+    """
+
+    def __init__(self, config: dict | None = None, taille: int = 3, inactivite_max: float = 60.0):
+        self.config = config or config_smtp()
+        self.taille = taille
+        self.inactivite_max = inactivite_max
+        self._libres: queue.LifoQueue = queue.LifoQueue()
+        self._places = threading.BoundedSemaphore(taille)
+        self.ouvertures = 0
+
+    def _prendre(self) -> smtplib.SMTP:
+        while True:
+            try:
+                serveur, derniere = self._libres.get_nowait()
+            except queue.Empty:
+                self.ouvertures += 1
+                return ouvrir_connexion(self.config)
+            if time.monotonic() - derniere < self.inactivite_max:
+                try:
+                    if serveur.noop()[0] == 250:
+                        return serveur
+                except smtplib.SMTPException:
+                    pass
+            _fermer(serveur)
+
+    @contextmanager
+    def connexion(self):
+        self._places.acquire()
+        serveur = None
+        try:
+            serveur = self._prendre()
+            yield serveur
+        except (smtplib.SMTPServerDisconnected, OSError):
+            if serveur is not None:
+                _fermer(serveur)
+            serveur = None
+            raise
+        finally:
+            if serveur is not None:
+                self._libres.put((serveur, time.monotonic()))
+            self._places.release()
+
+    def fermer(self) -> None:
+        while True:
+            try:
+                serveur, _ = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            _fermer(serveur)
+
+
+def _fermer(serveur: smtplib.SMTP) -> None:
+    try:
+        serveur.quit()
+    except (smtplib.SMTPException, OSError):
+        serveur.close()
+
+
+_POOL: PoolSMTP | None = None
+_VERROU_POOL = threading.Lock()
+
+
+def pool_smtp() -> PoolSMTP:
+    """Pool du processus, recréé si la configuration SMTP a changé."""
+    global _POOL
+    with _VERROU_POOL:
+        if _POOL is None or _POOL.config != config_smtp():
+            if _POOL is not None:
+                _POOL.fermer()
+            _POOL = PoolSMTP()
+        return _POOL
+
+
+@metriques.chronometre("smtp.envoyer_message")
+def envoyer_message(msg, pool: PoolSMTP | None = None) -> None:
+    with (pool or pool_smtp()).connexion() as serveur:
+        serveur.send_message(msg)
+
+
+# ============================================================
+# DIFFUSION PAR LOT
+# ============================================================
+@dataclass
+class BilanEnvoi:
+    envoyes: int = 0
+    echecs: list = field(default_factory=list)   # [(destinataire, erreur)]
+    duree_s: float = 0.0
+
+    @property
+    def debit(self) -> float:
+        """Messages envoyés par seconde."""
+        return self.envoyes / self.duree_s if self.duree_s > 0 else 0.0
+
+    def resume(self) -> str:
+        return (f"{self.envoyes} envoyé(s), {len(self.echecs)} échec(s) en {self.duree_s:.1f} s "
+                f"({self.debit:.1f} msg/s)")
+
+
+class _Limiteur:
+    """Au plus `debit_max` envois par seconde, tous threads confondus."""
+
+    def __init__(self, debit_max: float | None):
+        self.intervalle = 1.0 / debit_max if debit_max else 0.0
+        self._verrou = threading.Lock()
+        self._prochain = time.monotonic()
+
+    def attendre(self) -> None:
+        if not self.intervalle:
+            return
+        with self._verrou:
+            maintenant = time.monotonic()
+            attente = self._prochain - maintenant
+            self._prochain = max(maintenant, self._prochain) + self.intervalle
+        if attente > 0:
+            time.sleep(attente)
+
+
+@metriques.chronometre("smtp.envoyer_lot")
+def envoyer_lot(messages, pool: PoolSMTP | None = None, debit_max: float | None = 5.0,
+                essais: int = 2) -> BilanEnvoi:
+    """Envoie des messages déjà personnalisés en parallèle sur les connexions du pool.
+
+    `debit_max` plafonne le nombre de messages par seconde (None : pas de limite).
+    Une erreur temporaire est retentée `essais` fois sur une autre connexion.
+    """
+    pool = pool or pool_smtp()
+    limiteur = _Limiteur(debit_max)
+    bilan = BilanEnvoi()
+    verrou = threading.Lock()
+
+    def envoyer(msg) -> None:
+        for essai in range(1, essais + 1):
+            limiteur.attendre()
+            try:
+                envoyer_message(msg, pool)
+                with verrou:
+                    bilan.envoyes += 1
+                return
+            except Exception as e:
+                if erreur_definitive(e) or essai == essais:
+                    with verrou:
+                        bilan.echecs.append((msg["To"], str(e)))
+                    return
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pool.taille, thread_name_prefix="smtp") as ex:
+        list(ex.map(envoyer, messages))
+    bilan.duree_s = time.perf_counter() - debut
+    metriques.compter_lignes(bilan.envoyes)
+    return bilan
+
+
+def personnaliser(destinataires: list[dict], sujet: str, modele_corps: str,
+                  piece: bytes | None = None, nom_piece: str = "", type_piece: str = "octet-stream"):
+    """Un message par destinataire ; `modele_corps` est formaté avec les champs du destinataire.
+
+    Chaque destinataire est un dict avec au moins ``email`` (par ex. identifiant,
+    ville, nb_alertes) ; un champ absent du dict est laissé tel quel dans le texte.
+    """
+    for d in destinataires:
+        corps = modele_corps.format_map(_ChampsOuVides(d))
+        yield construire_message(d["email"], sujet, corps, piece, nom_piece, type_piece)
+
+
+class _ChampsOuVides(dict):
+    def __missing__(self, cle):
+        return "{" + cle + "}"
+
+
+def erreur_definitive(e: Exception) -> bool:
+    """Erreurs SMTP inutiles à retenter (identifiants, destinataire refusé, pas de STARTTLS, code 5xx)."""
+    if isinstance(e, (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused,
+                      smtplib.SMTPNotSupportedError)):
+        return True
+    code = getattr(e, "smtp_code", None)
+    return isinstance(code, int) and 500 <= code < 600
@@ -0,0 +1,101 @@
+# === CONTENU DU FICHIER echantillonnage.py ===
+"""Réduction des séries brutes avant envoi au navigateur.
+
+Un graphique de LARGEUR_GRAPHIQUE_PX pixels n'affiche pas plus d'un point
+utile par pixel : au-delà, les relevés sont réduits par station, soit par
+min/max par colonne de pixels (les pics sont gardés à coup sûr), soit par
+LTTB (Largest-Triangle-Three-Buckets, forme de la courbe mieux respectée).
+Les graphiques de distribution reçoivent des statistiques déjà calculées
+(quartiles, classes d'histogramme) plutôt que les relevés.
+"""
+import numpy as np
+import pandas as pd
+
+LARGEUR_GRAPHIQUE_PX = 1200
+SEUIL_WEBGL = 5_000          # au-delà, traces WebGL (Scattergl)
+METHODES = {"Min / max": "minmax", "LTTB": "lttb"}
+
+
+def points_cibles(largeur_px: int = LARGEUR_GRAPHIQUE_PX, nb_series: int = 1) -> int:
+    """Points par série : deux par pixel (min et max), partagés entre les séries superposées."""
+    return max(200, 2 * largeur_px // max(1, min(nb_series, 4)))
+
+
+def minmax(y: np.ndarray, n: int) -> np.ndarray:
+    """Indices (croissants) du min et du max de chacune des n/2 tranches."""
+    taille = len(y)
+    if taille <= n:
+        return np.arange(taille)
+    tranche = np.arange(taille) * (n // 2) // taille
+    ordre = np.lexsort((y, tranche))               # par tranche, puis par valeur
+    debuts = np.flatnonzero(np.r_[True, tranche[ordre][1:] != tranche[ordre][:-1]])
+    fins = np.r_[debuts[1:], taille] - 1
+    return np.unique(np.r_[ordre[debuts], ordre[fins], 0, taille - 1])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices retenus par Largest-Triangle-Three-Buckets (premier et dernier inclus)."""
+    taille = len(y)
+    if taille <= n or n < 3:
+        return np.arange(taille)
+    x = x.astype("float64")
+    y = y.astype("float64")
+    limites = np.linspace(1, taille - 1, n - 1).astype(np.int64)
+    garde = np.empty(n, dtype=np.int64)
+    garde[0], garde[-1] = 0, taille - 1
+    a = 0
+    for i in range(n - 2):
+        debut, fin = limites[i], limites[i + 1]
+        suivant = slice(fin, limites[i + 2] if i + 2 < len(limites) else taille)
+        cx, cy = x[suivant].mean(), y[suivant].mean()
+        # Aire du triangle (point retenu, candidat, moyenne du seau suivant)
+        aires = np.abs((x[a] - cx) * (y[debut:fin] - y[a]) - (x[a] - x[debut:fin]) * (cy - y[a]))
+        a = debut + int(aires.argmax()) if fin > debut else debut
+        garde[i + 1] = a
+    return np.unique(garde)
+
+
+def reduire(df: pd.DataFrame, nb_points: int, methode: str = "minmax",
+            x: str = "Date_Heure", y: str = "Pluie (mm)") -> pd.DataFrame:
+    """Relevés réduits à `nb_points` au plus par station (df trié par date dans chaque station)."""
+    garder = []
+    for _, pos in df.groupby("Ville", observed=True, sort=False).indices.items():
+        valeurs = df[y].to_numpy()[pos]
+        if methode == "lttb":
+            sel = lttb(df[x].to_numpy()[pos].astype("int64"), valeurs, nb_points)
+        else:
+            sel = minmax(valeurs, nb_points)
+        garder.append(pos[sel])
+    if not garder:
+        return df
+    return df.take(np.sort(np.concatenate(garder)))
+
+
+def stats_boite(df: pd.DataFrame, y: str = "Pluie (mm)") -> pd.DataFrame:
+    """Quartiles et moustaches (1,5 IQR) par station, pour une boîte à moustaches pré-calculée."""
+    g = df.groupby("Ville", observed=True)[y]
+    stats = g.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ["q1", "mediane", "q3"]
+    iqr = stats["q3"] - stats["q1"]
+    villes = df["Ville"].to_numpy()
+    v = df[y].to_numpy()
+    dedans = ((v >= (stats["q1"] - 1.5 * iqr).reindex(villes).to_numpy())
+              & (v <= (stats["q3"] + 1.5 * iqr).reindex(villes).to_numpy()))
+    moustaches = df[dedans].groupby("Ville", observed=True)[y].agg(["min", "max"])
+    stats["bas"], stats["haut"] = moustaches["min"], moustaches["max"]
+    stats["moyenne"] = g.mean()
+    stats["nb"] = g.size()
+    return stats.reset_index()
+
+
+def histogramme(df: pd.DataFrame, nb_classes: int = 30, y: str = "Pluie (mm)") -> pd.DataFrame:
+    """Effectifs par station sur des classes communes : Ville, Centre, Largeur, Nb."""
+    valeurs = df[y].to_numpy(dtype="float64")
+    bords = np.histogram_bin_edges(valeurs, bins=nb_classes)
+    classe = np.clip(np.searchsorted(bords, valeurs, side="right") - 1, 0, nb_classes - 1)
+    comptes = pd.crosstab(df["Ville"].to_numpy(), classe).reindex(columns=range(nb_classes), fill_value=0)
+    res = comptes.stack().rename("Nb").reset_index()
+    res.columns = ["Ville", "Classe", "Nb"]
+    res["Centre"] = (bords[:-1] + np.diff(bords) / 2)[res["Classe"]]
+    res["Largeur"] = np.diff(bords)[res["Classe"]]
+    return res.drop(columns="Classe")
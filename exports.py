@@ -0,0 +1,301 @@
+# === CONTENU DU FICHIER exports.py ===
+"""Archives ZIP des relevés et exports de tableaux, écrits en flux.
+
+L'archive est construite dans un fichier temporaire « spoolé » (en mémoire
+jusqu'à TAILLE_MEMOIRE_MAX, puis sur disque) : rien n'est écrit dans le
+dossier de travail et deux exports simultanés ne se marchent pas dessus.
+Chaque station est écrite bloc par bloc dans son entrée ZIP (Deflate).
+Les grosses archives sont préparées par un thread de fond qui publie sa
+progression (``GestionnaireExports``).
+
+Les tableaux des pages Historique et Analyses ne sont sérialisés qu'à la
+demande (``exporter_tableau``) : CSV bloc par bloc, Excel en mémoire
+constante (xlsxwriter, sinon openpyxl en écriture seule), CSV éventuellement
+compressé (gzip ou zip). Les fichiers produits sont gardés par
+``CacheExports`` sous la clé (version des données, filtres, format).
+"""
+import gzip
+import os
+import tempfile
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import pandas as pd
+
+import metriques
+from stockage import depot
+
+TAILLE_MEMOIRE_MAX = 32 * 1024**2   # au-delà, l'archive en cours passe sur disque
+LIGNES_PAR_BLOC = 50_000
+FORMAT_DATE = "%Y-%m-%d %H:%M"
+
+
+def ecrire_csv(flux, df: pd.DataFrame, lignes_par_bloc: int = LIGNES_PAR_BLOC, progression=None) -> None:
+    """Écrit `df` en CSV dans `flux` (binaire), bloc par bloc, dates au format FORMAT_DATE.
+
+    `progression(fait, total)` est appelée après chaque bloc (en lignes).
+    """
+    dates = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
+    for debut in range(0, max(len(df), 1), lignes_par_bloc):
+        bloc = df.iloc[debut:debut + lignes_par_bloc].copy()
+        for c in dates:
+            bloc[c] = bloc[c].dt.strftime(FORMAT_DATE)
+        flux.write(bloc.to_csv(index=False, header=(debut == 0)).encode())
+        if progression:
+            progression(min(debut + lignes_par_bloc, len(df)), len(df))
+
+
+def ecrire_station_csv(flux, df: pd.DataFrame, lignes_par_bloc: int = LIGNES_PAR_BLOC) -> None:
+    """Écrit les relevés d'une station en CSV (même format que exporter_csv), bloc par bloc."""
+    ecrire_csv(flux, df.drop(columns=["id", "Ville"], errors="ignore"), lignes_par_bloc)
+
+
+def lire_releves_export(ville: str, debut: date | None = None, fin: date | None = None) -> pd.DataFrame:
+    if debut is None or fin is None:
+        return depot().lire_station(ville)
+    return depot().lire_periode([ville], debut, fin)
+
+
+def ecrire_archive(flux, villes: list[str], debut: date | None = None, fin: date | None = None,
+                   progression=None) -> int:
+    """Écrit l'archive ZIP des `villes` (filtrées sur [debut, fin]) dans `flux`.
+
+    `progression(fait, total, ville)` est appelée après chaque station.
+    Renvoie le nombre de relevés exportés.
+    """
+    total = 0
+    with zipfile.ZipFile(flux, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z:
+        for i, v in enumerate(villes):
+            df = lire_releves_export(v, debut, fin)
+            if not df.empty:
+                with z.open(f"{v}.csv", "w", force_zip64=True) as entree:
+                    ecrire_station_csv(entree, df)
+                total += len(df)
+            if progression:
+                progression(i + 1, len(villes), v)
+    return total
+
+
+def archive_en_memoire(villes: list[str], debut: date | None = None, fin: date | None = None):
+    """Archive dans un SpooledTemporaryFile rembobiné (à fermer par l'appelant)."""
+    tampon = tempfile.SpooledTemporaryFile(max_size=TAILLE_MEMOIRE_MAX)
+    ecrire_archive(tampon, villes, debut, fin)
+    tampon.seek(0)
+    return tampon
+
+
+def nom_archive(debut: date | None = None, fin: date | None = None) -> str:
+    if debut and fin:
+        return f"SODEXAM_{debut}_{fin}.zip"
+    return f"SODEXAM_{date.today()}.zip"
+
+
+# ============================================================
+# EXPORTS DE TABLEAUX (Historique, Analyses)
+# ============================================================
+FORMATS_TABLEAU = {
+    "csv":  "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+COMPRESSIONS = {"gzip": ("gz", "application/gzip"), "zip": ("zip", "application/zip")}
+LIGNES_EXCEL_MAX = 1_048_575        # lignes de données d'une feuille Excel (en-tête exclu)
+TAILLE_CACHE_EXPORTS = int(os.environ.get("SODEXAM_CACHE_EXPORTS_MO", "128")) * 1024**2
+
+
+def _lignes(bloc: pd.DataFrame):
+    """Lignes d'un bloc en tuples Python, valeurs manquantes à None (cellules vides)."""
+    bloc = bloc.astype(object)
+    return bloc.where(bloc.notna(), None).itertuples(index=False, name=None)
+
+
+def ecrire_excel(flux, df: pd.DataFrame, feuille: str = "Données",
+                 lignes_par_bloc: int = LIGNES_PAR_BLOC, progression=None) -> None:
+    """Écrit `df` dans un classeur Excel, ligne par ligne, sans le copier en entier.
+
+    xlsxwriter en mode constant_memory (chaque ligne part sur disque dès
+    qu'elle est écrite) ; à défaut, openpyxl en écriture seule.
+    """
+    if len(df) > LIGNES_EXCEL_MAX:
+        raise ValueError(f"{len(df):,} lignes : une feuille Excel en contient au plus "
+                         f"{LIGNES_EXCEL_MAX:,}, exportez en CSV.".replace(",", " "))
+    try:
+        import xlsxwriter
+    except ImportError:
+        xlsxwriter = None
+
+    colonnes = [str(c) for c in df.columns]
+    if xlsxwriter is not None:
+        classeur = xlsxwriter.Workbook(flux, {"constant_memory": True,
+                                              "default_date_format": "yyyy-mm-dd hh:mm"})
+        ws = classeur.add_worksheet(feuille)
+        ws.write_row(0, 0, colonnes)
+        ecrire_ligne = ws.write_row
+    else:
+        from openpyxl import Workbook
+        classeur = Workbook(write_only=True)
+        ws = classeur.create_sheet(feuille)
+        ws.append(colonnes)
+        ecrire_ligne = lambda _r, _c, ligne: ws.append(ligne)   # noqa: E731
+
+    for debut in range(0, len(df), lignes_par_bloc):
+        for r, ligne in enumerate(_lignes(df.iloc[debut:debut + lignes_par_bloc]), start=debut + 1):
+            ecrire_ligne(r, 0, ligne)
+        if progression:
+            progression(min(debut + lignes_par_bloc, len(df)), len(df))
+
+    if xlsxwriter is not None:
+        classeur.close()
+    else:
+        classeur.save(flux)
+
+
+def nom_export(base: str, fmt: str, compression: str | None = None) -> tuple[str, str]:
+    """(nom de fichier, type MIME) de l'export `base` au format `fmt`, compressé ou non."""
+    if compression is None:
+        return f"{base}.{fmt}", FORMATS_TABLEAU[fmt]
+    ext, mime = COMPRESSIONS[compression]
+    # gzip enveloppe le fichier (x.csv.gz), zip le range dans une archive (x.zip)
+    return (f"{base}.{fmt}.{ext}" if compression == "gzip" else f"{base}.{ext}"), mime
+
+
+@metriques.chronometre()
+def exporter_tableau(df: pd.DataFrame, fmt: str, base: str = "export",
+                     compression: str | None = None, progression=None) -> bytes:
+    """Contenu du fichier d'export de `df` (« csv » ou « xlsx »).
+
+    `compression` (« gzip » ou « zip », CSV seulement : un classeur xlsx est
+    déjà compressé) enveloppe le CSV au fil de l'écriture. Le fichier est
+    construit dans un SpooledTemporaryFile, sur disque au-delà de
+    TAILLE_MEMOIRE_MAX. `progression(fait, total)` compte les lignes écrites.
+    """
+    if fmt not in FORMATS_TABLEAU:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    if compression is not None and (fmt != "csv" or compression not in COMPRESSIONS):
+        raise ValueError(f"Compression {compression} indisponible pour le format {fmt}")
+    metriques.compter_lignes(len(df))
+    with tempfile.SpooledTemporaryFile(max_size=TAILLE_MEMOIRE_MAX) as tampon:
+        if fmt == "xlsx":
+            ecrire_excel(tampon, df, progression=progression)
+        elif compression == "gzip":
+            with gzip.GzipFile(filename=f"{base}.csv", mode="wb", fileobj=tampon, compresslevel=6) as flux:
+                ecrire_csv(flux, df, progression=progression)
+        elif compression == "zip":
+            with zipfile.ZipFile(tampon, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as z, \
+                    z.open(f"{base}.csv", "w", force_zip64=True) as flux:
+                ecrire_csv(flux, df, progression=progression)
+        else:
+            ecrire_csv(tampon, df, progression=progression)
+        tampon.seek(0)
+        return tampon.read()
+
+
+class CacheExports:
+    """Fichiers d'export en mémoire, partagés par les sessions, éviction LRU bornée en octets.
+
+    La clé contient la version des données : un export n'est jamais servi
+    périmé, les anciennes versions sortent du cache au fil des nouveaux exports.
+    """
+
+    def __init__(self, taille_max: int = TAILLE_CACHE_EXPORTS):
+        self.taille_max = taille_max
+        self._verrou = threading.Lock()
+        self._fichiers: OrderedDict[tuple, bytes] = OrderedDict()
+        self._taille = 0
+
+    def lire(self, cle: tuple) -> bytes | None:
+        with self._verrou:
+            contenu = self._fichiers.get(cle)
+            if contenu is not None:
+                self._fichiers.move_to_end(cle)
+            return contenu
+
+    def ecrire(self, cle: tuple, contenu: bytes) -> None:
+        with self._verrou:
+            if cle in self._fichiers:
+                self._taille -= len(self._fichiers.pop(cle))
+            self._fichiers[cle] = contenu
+            self._taille += len(contenu)
+            while self._taille > self.taille_max and len(self._fichiers) > 1:
+                _, ancien = self._fichiers.popitem(last=False)
+                self._taille -= len(ancien)
+
+
+# ============================================================
+# EXPORTS EN ARRIÈRE-PLAN
+# ============================================================
+@dataclass
+class TravailExport:
+    villes: list
+    debut: date | None
+    fin: date | None
+    ident: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    etat: str = "en attente"          # en attente | en cours | terminé | échec
+    fait: int = 0
+    station: str = ""
+    nb_releves: int = 0
+    erreur: str = ""
+    cree_le: datetime = field(default_factory=datetime.now)
+    tampon: object = field(default=None, repr=False)
+    _verrou: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def progression(self) -> float:
+        return self.fait / len(self.villes) if self.villes else 1.0
+
+    @property
+    def nom(self) -> str:
+        return nom_archive(self.debut, self.fin)
+
+    def contenu(self) -> bytes:
+        """Archive complète ; appelée au clic du bouton, éventuellement par plusieurs sessions."""
+        with self._verrou:
+            self.tampon.seek(0)
+            return self.tampon.read()
+
+    def executer(self) -> None:
+        self.etat = "en cours"
+        tampon = tempfile.SpooledTemporaryFile(max_size=TAILLE_MEMOIRE_MAX)
+        try:
+            self.nb_releves = ecrire_archive(tampon, self.villes, self.debut, self.fin, self._avancer)
+            self.tampon = tampon
+            self.etat = "terminé"
+        except Exception as e:
+            tampon.close()
+            self.erreur = str(e)
+            self.etat = "échec"
+
+    def _avancer(self, fait: int, total: int, ville: str) -> None:
+        self.fait, self.station = fait, ville
+
+
+class GestionnaireExports:
+    """Exports lancés dans des threads de fond ; les plus anciens terminés sont libérés."""
+
+    def __init__(self, conserver: int = 8):
+        self.conserver = conserver
+        self._verrou = threading.Lock()
+        self._travaux: dict[str, TravailExport] = {}
+
+    def lancer(self, villes: list[str], debut: date | None = None, fin: date | None = None) -> TravailExport:
+        travail = TravailExport(list(villes), debut, fin)
+        with self._verrou:
+            self._travaux[travail.ident] = travail
+            self._purger()
+        threading.Thread(target=travail.executer, name=f"export-{travail.ident}", daemon=True).start()
+        return travail
+
+    def obtenir(self, ident: str | None) -> TravailExport | None:
+        with self._verrou:
+            return self._travaux.get(ident) if ident else None
+
+    def _purger(self) -> None:
+        finis = sorted((t for t in self._travaux.values() if t.etat in ("terminé", "échec")),
+                       key=lambda t: t.cree_le)
+        for t in finis[:max(0, len(finis) - self.conserver)]:
+            if t.tampon is not None:
+                t.tampon.close()
+            del self._travaux[t.ident]
@@ -0,0 +1,243 @@
+# === CONTENU DU FICHIER graphiques.py ===
+"""Graphiques statiques (PNG) du rapport PDF des alertes.
+
+Quatre graphiques : cumul par station, série temporelle multi-stations avec
+seuils, répartition des phénomènes et nuage intensité max / moyenne.
+Les agrégats sont calculés ici (pandas, quelques centaines de lignes au plus),
+le tracé matplotlib part dans un pool de processus : il tourne pendant que
+pdf_alertes met le tableau en page.
+
+Les images sont mises en cache par (version des données, période, stations,
+seuil) : prévisualiser puis envoyer le même rapport ne retrace rien.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+import phenomenes
+from referentiel import SEUIL_VIGILANCE_MM
+
+GRAPHIQUES = ("stations", "serie", "phenomenes", "intensite")
+NB_STATIONS_SERIE = 6       # stations les plus arrosées dans la série temporelle
+NB_BARRES_MAX = 25
+TAILLE_FIGURE = (5.2, 3.6)  # pouces
+DPI = 150
+
+BLEU, ROUGE, ORANGE = "#003F8A", "#D63031", "#E17055"
+
+
+# ============================================================
+# DONNÉES DES GRAPHIQUES
+# ============================================================
+def donnees_graphiques(df: pd.DataFrame, seuil_mm: float) -> dict[str, dict]:
+    """Agrégats réduits à tracer, un dict par graphique (sérialisables vers le pool)."""
+    pluie = df["Pluie (mm)"].astype("float64")
+    par_station = pluie.groupby(df["Ville"], observed=True).agg(["sum", "max", "mean", "size"])
+    par_station = par_station.sort_values("sum", ascending=False)
+
+    tete = par_station.head(NB_BARRES_MAX)
+    stations = {"villes": tete.index.tolist(), "cumul": tete["sum"].tolist(),
+                "alerte": (tete["max"] >= seuil_mm).tolist()}
+
+    villes_serie = par_station.index[:NB_STATIONS_SERIE]
+    sel = df["Ville"].isin(villes_serie)
+    jours = (pluie[sel].groupby([df.loc[sel, "Ville"], df.loc[sel, "Date_Heure"].dt.floor("D")],
+                                observed=True).max().unstack(0))
+    serie = {"jours": jours.index.tolist(), "courbes": {v: jours[v].tolist() for v in jours.columns},
+             "seuil": seuil_mm, "vigilance": SEUIL_VIGILANCE_MM}
+
+    ph = phenomenes.compter(df["Phenomenes"]) if "Phenomenes" in df else pd.Series(dtype="int64")
+    comptes = {"noms": ph.index.tolist(), "nb": ph.tolist()}
+
+    intensite = {"villes": par_station.index.tolist(), "max": par_station["max"].tolist(),
+                 "moyenne": par_station["mean"].tolist(), "nb": par_station["size"].tolist(),
+                 "seuil": seuil_mm}
+    return {"stations": stations, "serie": serie, "phenomenes": comptes, "intensite": intensite}
+
+
+# ============================================================
+# TRACÉ (exécuté dans les processus du pool)
+# ============================================================
+def tracer(nom: str, donnees: dict) -> bytes:
+    """PNG du graphique `nom`."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=TAILLE_FIGURE, dpi=DPI)
+    try:
+        _TRACES[nom](ax, donnees)
+        ax.spines[["top", "right"]].set_visible(False)
+        fig.tight_layout()
+        tampon = io.BytesIO()
+        fig.savefig(tampon, format="png")
+        return tampon.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def _vide(ax, titre: str) -> None:
+    ax.set_title(titre, fontsize=9, color=BLEU)
+    ax.text(0.5, 0.5, "Aucune donnée", ha="center", va="center", transform=ax.transAxes, color="gray")
+    ax.set_axis_off()
+
+
+def _tracer_stations(ax, d: dict) -> None:
+    titre = "Cumul par station (mm)"
+    if not d["villes"]:
+        return _vide(ax, titre)
+    couleurs = [ROUGE if a else BLEU for a in d["alerte"]]
+    ax.barh(d["villes"][::-1], d["cumul"][::-1], color=couleurs[::-1])
+    ax.set_title(titre + " – rouge : alerte atteinte", fontsize=9, color=BLEU)
+    ax.tick_params(labelsize=7)
+
+
+def _tracer_serie(ax, d: dict) -> None:
+    titre = "Maximum journalier par station (mm)"
+    if not d["courbes"]:
+        return _vide(ax, titre)
+    for ville, valeurs in d["courbes"].items():
+        ax.plot(d["jours"], valeurs, marker=".", linewidth=1, markersize=3, label=ville)
+    ax.axhline(d["seuil"], color=ROUGE, linestyle="--", linewidth=1, label=f"Alerte {d['seuil']:g} mm")
+    ax.axhline(d["vigilance"], color=ORANGE, linestyle=":", linewidth=1, label=f"Vigilance {d['vigilance']:g} mm")
+    ax.set_title(titre, fontsize=9, color=BLEU)
+    ax.legend(fontsize=6, ncol=2, loc="upper right")
+    ax.tick_params(labelsize=7)
+    ax.figure.autofmt_xdate()
+
+
+def _tracer_phenomenes(ax, d: dict) -> None:
+    titre = "Phénomènes observés"
+    if not d["noms"]:
+        return _vide(ax, titre)
+    ax.pie(d["nb"], labels=d["noms"], autopct="%1.0f%%", textprops={"fontsize": 7})
+    ax.set_title(titre, fontsize=9, color=BLEU)
+
+
+def _tracer_intensite(ax, d: dict) -> None:
+    titre = "Intensité max / moyenne par station"
+    if not d["villes"]:
+        return _vide(ax, titre)
+    tailles = [20 + 180 * n / max(d["nb"]) for n in d["nb"]]
+    couleurs = [ROUGE if m >= d["seuil"] else BLEU for m in d["max"]]
+    ax.scatter(d["moyenne"], d["max"], s=tailles, c=couleurs, alpha=0.6)
+    for v, x, y in zip(d["villes"][:10], d["moyenne"], d["max"]):
+        ax.annotate(v, (x, y), fontsize=6, xytext=(3, 3), textcoords="offset points")
+    ax.axhline(d["seuil"], color=ROUGE, linestyle="--", linewidth=1)
+    ax.set_xlabel("Moyenne (mm)", fontsize=7)
+    ax.set_ylabel("Maximum (mm)", fontsize=7)
+    ax.set_title(titre + " (taille : nb relevés)", fontsize=9, color=BLEU)
+    ax.tick_params(labelsize=7)
+
+
+_TRACES = {"stations": _tracer_stations, "serie": _tracer_serie,
+           "phenomenes": _tracer_phenomenes, "intensite": _tracer_intensite}
+
+
+# ============================================================
+# POOL DE PROCESSUS + CACHE
+# ============================================================
+class CacheGraphiques:
+    """Images (futures) par clé, LRU, partagées par toutes les générations du processus."""
+
+    def __init__(self, taille: int = 64, nb_processus: int | None = None):
+        self.taille = taille
+        self.nb_processus = nb_processus or min(4, os.cpu_count() or 1)
+        self._verrou = threading.Lock()
+        self._entrees: OrderedDict = OrderedDict()
+        self._pool: ProcessPoolExecutor | None = None
+        self.succes = 0
+        self.echecs = 0
+
+    def _executeur(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn : pas de fork d'un processus Streamlit multi-thread
+            self._pool = ProcessPoolExecutor(self.nb_processus, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def lancer(self, cle: tuple, df: pd.DataFrame, seuil_mm: float) -> dict[str, Future]:
+        """Futures des PNG de `cle` ; rien n'est retracé si la clé est déjà en cache."""
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+                return self._entrees[cle][1]
+            self.echecs += 1
+            donnees = donnees_graphiques(df, seuil_mm)
+            try:
+                futures = {nom: self._executeur().submit(tracer, nom, donnees[nom]) for nom in GRAPHIQUES}
+            except (BrokenProcessPool, RuntimeError, OSError):
+                self._pool = None
+                futures = {nom: _future_locale(nom, donnees[nom]) for nom in GRAPHIQUES}
+            self._entrees[cle] = (donnees, futures)
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+            return futures
+
+    def images(self, cle: tuple, futures: dict[str, Future], delai: float = 120) -> dict[str, bytes]:
+        """PNG prêts. Un tracé perdu par le pool est refait dans ce thread ; un graphique
+        en erreur (ou hors délai) est omis du rapport et la clé sort du cache : la
+        prochaine demande retrace tout."""
+        images = {}
+        for nom, future in futures.items():
+            try:
+                images[nom] = future.result(timeout=delai)
+                continue
+            except BrokenProcessPool:
+                with self._verrou:
+                    self._pool = None
+                    entree = self._entrees.get(cle)
+            except Exception:
+                continue
+            if entree is not None:
+                futures[nom] = _future_locale(nom, entree[0][nom])
+                if futures[nom].exception() is None:
+                    images[nom] = futures[nom].result()
+        if len(images) < len(futures):
+            with self._verrou:
+                entree = self._entrees.get(cle)
+                if entree is not None and entree[1] is futures:
+                    del self._entrees[cle]
+        return images
+
+    def vider(self) -> None:
+        with self._verrou:
+            self._entrees.clear()
+
+
+def _future_locale(nom: str, donnees: dict) -> Future:
+    """Repli sans pool : tracé dans le thread appelant."""
+    future = Future()
+    try:
+        future.set_result(tracer(nom, donnees))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+_CACHE: CacheGraphiques | None = None
+_VERROU_CACHE = threading.Lock()
+
+
+def cache_graphiques() -> CacheGraphiques:
+    global _CACHE
+    with _VERROU_CACHE:
+        if _CACHE is None:
+            _CACHE = CacheGraphiques()
+        return _CACHE
+
+
+def cle_graphiques(df: pd.DataFrame, version, date_debut, date_fin, villes, seuil_mm: float) -> tuple:
+    """(version des données, période, stations, seuil) ; version calculée sur les relevés si absente."""
+    if version is None:
+        # Toutes les colonnes tracées, phénomènes compris
+        colonnes = [c for c in ("Ville", "Date_Heure", "Pluie (mm)", "Phenomenes") if c in df]
+        version = str(pd.util.hash_pandas_object(df[colonnes], index=False).sum())
+    villes = tuple(sorted(villes)) if villes is not None else tuple(sorted(df["Ville"].unique()))
+    return (str(version), str(date_debut), str(date_fin), villes, float(seuil_mm))
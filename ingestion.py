@@ -0,0 +1,191 @@
+# === CONTENU DU FICHIER ingestion.py ===
+"""Ingestion en masse de relevés (stations automatiques, reprises d'archives).
+
+Usage :
+    python ingestion.py releves.csv [autres.ndjson ...]
+    python ingestion.py flux_man.csv --ville Man --lot 50000 --rejets rejets.csv
+    python ingestion.py nouvelle.csv --nouvelle-station   # stations absentes du registre
+
+Fichiers CSV ou NDJSON (une ligne JSON par relevé), compressés ou non, lus
+par lots de `--lot` lignes sans jamais charger le fichier entier. Colonnes :
+Ville (ou --ville), Date_Heure, Pluie (mm) ; Temperature (C), Humidite (%),
+Vent (km/h), Phenomenes, Obs et Saisi_par sont facultatives.
+
+Une station doit figurer au registre (villes_ci.csv, voir registre.py), sauf
+avec --nouvelle-station ; un nom contenant un séparateur de chemin est
+toujours rejeté (il désigne un fichier du dépôt Parquet).
+Chaque lot est validé avec les plages du formulaire de saisie
+(BORNES_MESURES), dédoublonné sur (Ville, Date_Heure) puis écrit en une
+transaction par station : le chargeur de l'application voit un seul
+changement par station et par lot, et ne relit que les ajouts. Les relevés
+déjà présents dans le dépôt sont ignorés : l'ingestion peut être relancée.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from referentiel import BORNES_MESURES
+from registre import registre
+from stockage import COLONNES_RELEVE, depot
+
+TAILLE_LOT = 100_000
+SAISI_PAR_DEFAUT = "ingestion"
+_TEXTES = {"Ville": str, "Obs": str, "Saisi_par": str}
+
+
+@dataclass
+class BilanIngestion:
+    """Compteurs d'une ingestion ; `rejets` : nombre de lignes par motif."""
+    lus: int = 0
+    importes: int = 0
+    doublons: int = 0
+    lots: int = 0
+    duree: float = 0.0
+    rejets: Counter = field(default_factory=Counter)
+
+    @property
+    def nb_rejets(self) -> int:
+        return sum(self.rejets.values())
+
+    @property
+    def debit(self) -> float:
+        return self.lus / self.duree if self.duree else 0.0
+
+    def resume(self) -> str:
+        lignes = [f"{self.lus:,} relevés lus en {self.duree:.1f} s ({self.debit:,.0f} relevés/s, {self.lots} lot(s))",
+                  f"{self.importes:,} importés, {self.doublons:,} doublons ignorés, {self.nb_rejets:,} rejetés"]
+        lignes += [f"  - {motif} : {nb:,}" for motif, nb in self.rejets.most_common()]
+        return "\n".join(lignes)
+
+
+# ============================================================
+# LECTURE PAR LOTS
+# ============================================================
+def lire_par_lots(chemin: str, taille_lot: int = TAILLE_LOT):
+    """Lots de lignes brutes (DataFrame) d'un fichier CSV ou NDJSON."""
+    base = chemin[:-3] if chemin.endswith((".gz", ".xz")) else chemin
+    if base.endswith((".ndjson", ".jsonl", ".json")):
+        lots = pd.read_json(chemin, lines=True, chunksize=taille_lot, dtype=False, convert_dates=False)
+    else:
+        lots = pd.read_csv(chemin, chunksize=taille_lot, dtype=_TEXTES)
+    with lots:
+        yield from lots
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+def valider(brut: pd.DataFrame, ville: str | None = None,
+            stations=None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(relevés valides typés, lignes rejetées avec leur Motif).
+
+    Motifs, dans l'ordre de vérification : station manquante, nom de station
+    invalide, station inconnue (absente de `stations` ; None : pas de contrôle),
+    date illisible, pluie manquante, mesure illisible, mesure hors plage.
+    """
+    df = brut.copy()
+    if ville is not None:
+        df["Ville"] = ville
+    if "Ville" not in df:
+        df["Ville"] = np.nan
+    if "Date_Heure" not in df:
+        df["Date_Heure"] = np.nan
+    villes = df["Ville"].astype("string").str.strip()
+    df["Ville"] = villes
+    dates = pd.to_datetime(df["Date_Heure"], errors="coerce")
+
+    manquante = villes.isna() | (villes == "").fillna(True)
+    conditions = [manquante, villes.str.contains(r"[/\\\x00]").fillna(False)]
+    motifs = ["station manquante", "nom de station invalide"]
+    if stations is not None:
+        conditions.append(~manquante & ~villes.isin(list(stations)).fillna(False))
+        motifs.append("station inconnue")
+    conditions.append(dates.isna())
+    motifs.append("date illisible")
+    mesures = {}
+    for col, (mini, maxi) in BORNES_MESURES.items():
+        brut_col = df[col] if col in df else pd.Series(np.nan, index=df.index)
+        valeurs = pd.to_numeric(brut_col, errors="coerce")
+        mesures[col] = valeurs
+        if col == "Pluie (mm)":
+            conditions.append(brut_col.isna())
+            motifs.append("pluie manquante")
+        conditions.append(valeurs.isna() & brut_col.notna())
+        motifs.append(f"{col} illisible")
+        conditions.append((valeurs < mini) | (valeurs > maxi))
+        motifs.append(f"{col} hors plage [{mini:g}, {maxi:g}]")
+
+    motif = pd.Series(np.select([c.to_numpy(dtype=bool) for c in conditions], motifs, default=""),
+                      index=df.index)
+    ok = (motif == "").to_numpy()
+
+    valides = df.loc[ok].assign(Date_Heure=dates[ok], **{c: v[ok] for c, v in mesures.items()})
+    if "Saisi_par" not in valides:
+        valides["Saisi_par"] = SAISI_PAR_DEFAUT
+    for col in ("Phenomenes", "Obs"):
+        if col not in valides:
+            valides[col] = 0 if col == "Phenomenes" else ""
+    rejets = brut.loc[~ok].assign(Motif=motif[~ok])
+    return valides[["Ville"] + COLONNES_RELEVE], rejets
+
+
+# ============================================================
+# ÉCRITURE
+# ============================================================
+def ingerer(chemins, ville: str | None = None, taille_lot: int = TAILLE_LOT,
+            fichier_rejets: str | None = None, bilan: BilanIngestion | None = None,
+            verbeux: bool = True, nouvelles_stations: bool = False) -> BilanIngestion:
+    """Valide et écrit les fichiers `chemins` lot par lot ; renvoie le bilan.
+
+    Sans `nouvelles_stations`, les relevés d'une station absente du registre sont rejetés.
+    """
+    bilan = bilan or BilanIngestion()
+    cible = depot()
+    stations = None if nouvelles_stations else set(registre().noms)
+    entete_rejets = fichier_rejets is not None and not os.path.exists(fichier_rejets)
+    debut = time.perf_counter()
+    for chemin in ([chemins] if isinstance(chemins, str) else chemins):
+        for brut in lire_par_lots(chemin, taille_lot):
+            valides, rejets = valider(brut, ville, stations)
+            bilan.lus += len(brut)
+            bilan.rejets.update(rejets["Motif"].tolist())
+            if fichier_rejets is not None and not rejets.empty:
+                rejets.to_csv(fichier_rejets, mode="a", header=entete_rejets, index=False)
+                entete_rejets = False
+
+            uniques = valides.drop_duplicates(["Ville", "Date_Heure"])
+            importes = 0
+            for v, groupe in uniques.groupby("Ville", sort=False):
+                # Une transaction (SQLite) ou une réécriture (Parquet) par station et par lot
+                importes += cible.importer_releves(str(v), groupe.drop(columns="Ville"))
+            bilan.importes += importes
+            bilan.doublons += len(valides) - importes
+            bilan.lots += 1
+            bilan.duree = time.perf_counter() - debut
+            if verbeux:
+                print(f"  lot {bilan.lots:>4} : {len(brut):>8,} lus, {importes:>8,} importés, "
+                      f"{len(rejets):>6,} rejetés – {bilan.debit:,.0f} relevés/s", flush=True)
+    bilan.duree = time.perf_counter() - debut
+    return bilan
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fichiers", nargs="+", help="fichiers CSV ou NDJSON (.gz accepté)")
+    parser.add_argument("--ville", help="station de tous les relevés (fichier sans colonne Ville)")
+    parser.add_argument("--lot", type=int, default=TAILLE_LOT, help=f"lignes par lot (défaut {TAILLE_LOT:,})")
+    parser.add_argument("--rejets", metavar="CSV", help="écrire les lignes rejetées et leur motif")
+    parser.add_argument("--nouvelle-station", action="store_true",
+                        help="accepter des stations absentes du registre (villes_ci.csv)")
+    args = parser.parse_args()
+    manquants = [f for f in args.fichiers if not os.path.exists(f)]
+    if manquants:
+        sys.exit(f"Fichier introuvable : {', '.join(manquants)}")
+    print(ingerer(args.fichiers, args.ville, args.lot, args.rejets,
+                  nouvelles_stations=args.nouvelle_station).resume())
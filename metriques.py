@@ -0,0 +1,342 @@
+# === CONTENU DU FICHIER metriques.py ===
+"""Instrumentation des chemins chauds : pages, fonctions de données, caches, mémoire.
+
+Collecte en mémoire (``collecte``), une par processus (partagée entre sessions) :
+- durée murale et CPU (thread appelant) de chaque page et fonction
+  instrumentée, histogramme de latence, lignes traitées (``compter_lignes``) ;
+- appels et manques des caches st.cache_data (voir ``coeur.cache_donnees``) ;
+- mémoire résidente du processus et son pic.
+
+SODEXAM_METRIQUES règle le coût :
+- ``echantillon`` (défaut) : pages toujours chronométrées, fonctions une fois
+  sur 1/SODEXAM_METRIQUES_TAUX (0.1) ; les autres appels sont seulement comptés ;
+- ``complet`` : tout est chronométré ;
+- ``off`` : rien n'est enregistré.
+
+Lecture : texte Prometheus (``Collecte.prometheus``) ou JSON
+(``Collecte.instantane``), servis par ``demarrer_serveur`` sur /metrics et
+/metrics.json (127.0.0.1:SODEXAM_METRIQUES_PORT, 0 pour ne rien servir).
+``capturer_profil`` profile un bloc (pyinstrument s'il est installé, sinon cProfile).
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:   # Windows : pas de pic mémoire
+    resource = None
+
+MODE = os.environ.get("SODEXAM_METRIQUES", "echantillon")
+TAUX_ECHANTILLON = float(os.environ.get("SODEXAM_METRIQUES_TAUX", "0.1"))
+PORT = int(os.environ.get("SODEXAM_METRIQUES_PORT", "8503"))
+
+# Bornes (secondes) de l'histogramme de latence
+BORNES_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class _Serie:
+    appels: int = 0           # tous les appels
+    mesures: int = 0          # appels chronométrés (échantillon)
+    duree: float = 0.0
+    cpu: float = 0.0
+    duree_max: float = 0.0
+    lignes: int = 0           # sur les appels chronométrés
+    seaux: list = field(default_factory=lambda: [0] * (len(BORNES_LATENCE) + 1))
+
+
+class Collecte:
+    """Séries par (catégorie, nom) et compteurs de cache, protégés par un verrou."""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.series: dict[tuple[str, str], _Serie] = {}
+        self.caches: dict[str, list[int]] = {}   # nom → [appels, manques]
+        self.debut = time.time()
+
+    def _serie(self, cle: tuple[str, str]) -> _Serie:
+        s = self.series.get(cle)
+        if s is None:
+            s = self.series[cle] = _Serie()
+        return s
+
+    def compter(self, categorie: str, nom: str) -> None:
+        with self._verrou:
+            self._serie((categorie, nom)).appels += 1
+
+    def enregistrer(self, categorie: str, nom: str, duree: float, cpu: float, lignes: int = 0) -> None:
+        with self._verrou:
+            s = self._serie((categorie, nom))
+            s.appels += 1
+            s.mesures += 1
+            s.duree += duree
+            s.cpu += cpu
+            s.duree_max = max(s.duree_max, duree)
+            s.lignes += lignes
+            s.seaux[bisect_left(BORNES_LATENCE, duree)] += 1
+
+    def appel_cache(self, nom: str) -> None:
+        with self._verrou:
+            self.caches.setdefault(nom, [0, 0])[0] += 1
+
+    def manque_cache(self, nom: str) -> None:
+        with self._verrou:
+            self.caches.setdefault(nom, [0, 0])[1] += 1
+
+    def reinitialiser(self) -> None:
+        with self._verrou:
+            self.series.clear()
+            self.caches.clear()
+            self.debut = time.time()
+
+    # ---------- Lecture ----------
+    def instantane(self) -> dict:
+        """État courant, prêt pour json.dumps (durées en secondes)."""
+        with self._verrou:
+            series = [
+                {"categorie": c, "nom": n, "appels": s.appels, "mesures": s.mesures,
+                 "duree_moy": s.duree / s.mesures if s.mesures else None, "duree_max": s.duree_max,
+                 "cpu_moy": s.cpu / s.mesures if s.mesures else None, "duree_totale": s.duree,
+                 "lignes": s.lignes}
+                for (c, n), s in sorted(self.series.items())
+            ]
+            caches = [{"nom": n, "appels": a, "manques": m, "succes": a - m} for n, (a, m) in sorted(self.caches.items())]
+        return {"mode": MODE, "taux": TAUX_ECHANTILLON, "depuis": self.debut,
+                "memoire": memoire(), "series": series, "caches": caches}
+
+    def prometheus(self) -> str:
+        """Format texte d'exposition Prometheus (0.0.4)."""
+        lignes = []
+
+        def entete(nom, type_, aide):
+            lignes.extend([f"# HELP {nom} {aide}", f"# TYPE {nom} {type_}"])
+
+        with self._verrou:
+            series = [(c, n, s, list(s.seaux)) for (c, n), s in sorted(self.series.items())]
+            caches = sorted((n, a, m) for n, (a, m) in self.caches.items())
+
+        entete("sodexam_duree_secondes", "histogram", "Durée murale des appels chronométrés.")
+        for c, n, s, seaux in series:
+            etiq = f'categorie="{_echapper(c)}",nom="{_echapper(n)}"'
+            cumul = 0
+            for borne, nb in zip((*BORNES_LATENCE, "+Inf"), seaux):
+                cumul += nb
+                lignes.append(f'sodexam_duree_secondes_bucket{{{etiq},le="{borne}"}} {cumul}')
+            lignes.append(f"sodexam_duree_secondes_sum{{{etiq}}} {s.duree:.6f}")
+            lignes.append(f"sodexam_duree_secondes_count{{{etiq}}} {s.mesures}")
+        for nom, attribut, aide in (
+            ("sodexam_cpu_secondes_total", "cpu", "Temps CPU (thread appelant) des appels chronométrés."),
+            ("sodexam_appels_total", "appels", "Appels, chronométrés ou non."),
+            ("sodexam_lignes_total", "lignes", "Lignes traitées par les appels chronométrés."),
+        ):
+            entete(nom, "counter", aide)
+            for c, n, s, _ in series:
+                valeur = getattr(s, attribut)
+                lignes.append(f'{nom}{{categorie="{_echapper(c)}",nom="{_echapper(n)}"}} '
+                              + (f"{valeur:.6f}" if isinstance(valeur, float) else str(valeur)))
+        entete("sodexam_cache_appels_total", "counter", "Appels des fonctions en cache.")
+        lignes += [f'sodexam_cache_appels_total{{nom="{_echapper(n)}"}} {a}' for n, a, _ in caches]
+        entete("sodexam_cache_manques_total", "counter", "Appels calculés (absents du cache).")
+        lignes += [f'sodexam_cache_manques_total{{nom="{_echapper(n)}"}} {m}' for n, _, m in caches]
+        for cle, aide in (("residente", "Mémoire résidente du processus."), ("pic", "Pic de mémoire résidente.")):
+            valeur = memoire()[cle]
+            if valeur is not None:
+                entete(f"sodexam_memoire_{cle}_octets", "gauge", aide)
+                lignes.append(f"sodexam_memoire_{cle}_octets {valeur}")
+        return "\n".join(lignes) + "\n"
+
+
+def _echapper(valeur: str) -> str:
+    return valeur.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+collecte = Collecte()
+
+
+def memoire() -> dict:
+    """Mémoire résidente du processus et son pic depuis le démarrage (octets, None si inconnue)."""
+    residente = pic = None
+    try:
+        with open("/proc/self/statm") as f:
+            residente = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+        pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"residente": residente, "pic": pic}
+
+
+# ============================================================
+# MESURES
+# ============================================================
+_local = threading.local()
+
+
+def _pile() -> list:
+    pile = getattr(_local, "pile", None)
+    if pile is None:
+        pile = _local.pile = []
+    return pile
+
+
+def compter_lignes(n: int) -> None:
+    """Ajoute `n` lignes traitées à la mesure en cours dans ce thread (sans effet hors mesure)."""
+    pile = getattr(_local, "pile", None)
+    if pile:
+        pile[-1].lignes += int(n)
+
+
+class mesurer:
+    """Chronomètre un bloc ``with`` : durée murale, CPU du thread, lignes (``compter_lignes``).
+
+    Hors mode ``complet`` (et hors capture de profil), seul un appel sur
+    1/TAUX_ECHANTILLON est chronométré, sauf si `toujours`. Classe plutôt que
+    générateur : quelques microsecondes de moins par appel.
+    """
+    __slots__ = ("nom", "categorie", "toujours", "lignes", "_t0", "_c0")
+
+    def __init__(self, nom: str, categorie: str = "fonction", toujours: bool = False):
+        self.nom, self.categorie, self.toujours = nom, categorie, toujours
+        self.lignes = 0
+        self._t0 = None
+
+    def __enter__(self):
+        if MODE == "off":
+            return self
+        _pile().append(self)
+        if (self.toujours or MODE == "complet" or getattr(_local, "profil", False)
+                or random.random() < TAUX_ECHANTILLON):
+            self._t0, self._c0 = time.perf_counter(), time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        if MODE == "off":
+            return False
+        _local.pile.pop()
+        if self._t0 is not None:
+            collecte.enregistrer(self.categorie, self.nom, time.perf_counter() - self._t0,
+                                 time.thread_time() - self._c0, self.lignes)
+        else:
+            collecte.compter(self.categorie, self.nom)
+        return False
+
+
+def chronometre(nom: str | None = None, categorie: str = "fonction"):
+    """Décorateur : chaque appel de la fonction passe par ``mesurer``."""
+    def decorer(f):
+        if MODE == "off":
+            return f
+        nom_f = nom or f.__name__
+
+        @wraps(f)
+        def enveloppe(*args, **kwargs):
+            with mesurer(nom_f, categorie):
+                return f(*args, **kwargs)
+        return enveloppe
+    return decorer
+
+
+# ============================================================
+# PROFIL À LA DEMANDE
+# ============================================================
+@dataclass
+class Profil:
+    outil: str = ""
+    duree: float = 0.0
+    pic_memoire: int = 0      # octets alloués par Python au plus fort (tracemalloc, tous threads)
+    rapport: str = ""
+
+
+_verrou_profil = threading.Lock()
+
+
+@contextmanager
+def capturer_profil(nb_fonctions: int = 40):
+    """Profile le bloc (thread courant) ; le Profil produit est rempli à la sortie.
+
+    Un seul profil à la fois par processus : si un autre est en cours, le bloc
+    s'exécute sans profil et le rapport le signale.
+    """
+    if not _verrou_profil.acquire(blocking=False):
+        yield Profil(rapport="Un autre profil est en cours dans ce processus : exécution non profilée.")
+        return
+    try:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+        profil = Profil(outil="pyinstrument" if Profiler else "cProfile")
+        profileur = Profiler() if Profiler else cProfile.Profile()
+        trace_deja = tracemalloc.is_tracing()
+        if not trace_deja:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        _local.profil = True
+        t0 = time.perf_counter()
+        (profileur.start if Profiler else profileur.enable)()
+        try:
+            yield profil
+        finally:
+            (profileur.stop if Profiler else profileur.disable)()
+            profil.duree = time.perf_counter() - t0
+            profil.pic_memoire = tracemalloc.get_traced_memory()[1]
+            if not trace_deja:
+                tracemalloc.stop()
+            _local.profil = False
+            if Profiler:
+                profil.rapport = profileur.output_text(unicode=True, color=False)
+            else:
+                sortie = io.StringIO()
+                pstats.Stats(profileur, stream=sortie).sort_stats("cumulative").print_stats(nb_fonctions)
+                profil.rapport = sortie.getvalue()
+    finally:
+        _verrou_profil.release()
+
+
+# ============================================================
+# POINT D'ACCÈS HTTP
+# ============================================================
+class _Gestionnaire(BaseHTTPRequestHandler):
+    def do_GET(self):
+        chemin = self.path.split("?")[0]
+        if chemin == "/metrics":
+            corps, type_ = collecte.prometheus().encode(), "text/plain; version=0.0.4; charset=utf-8"
+        elif chemin == "/metrics.json":
+            corps, type_ = json.dumps(collecte.instantane(), ensure_ascii=False).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", type_)
+        self.send_header("Content-Length", str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, *args):
+        pass   # pas de ligne de journal à chaque lecture du collecteur
+
+
+def demarrer_serveur(port: int = PORT, hote: str = "127.0.0.1") -> ThreadingHTTPServer | None:
+    """Sert /metrics et /metrics.json dans un thread ; None si désactivé ou port déjà pris."""
+    if not port:
+        return None
+    try:
+        serveur = ThreadingHTTPServer((hote, port), _Gestionnaire)
+    except OSError:
+        return None   # un autre processus de l'application sert déjà ce port
+    threading.Thread(target=serveur.serve_forever, name="metriques", daemon=True).start()
+    return serveur
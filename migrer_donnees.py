@@ -0,0 +1,106 @@
+"""Import des anciens fichiers de Donnees_Villes (CSV ou Parquet) dans le dépôt actif.
+
+Usage :
+    python migrer_donnees.py                  # importe tous les <Ville>.csv / <Ville>.parquet
+    python migrer_donnees.py --export DOSSIER # réexporte toutes les stations en CSV
+    python migrer_donnees.py --phenomenes     # phénomènes en texte → masques de bits
+    python migrer_donnees.py --phenomenes --forcer   # idem, libellés inconnus abandonnés
+    python migrer_donnees.py --compacter      # intègre les corrections en attente (dépôt Parquet)
+
+Le dépôt cible est celui de SODEXAM_STOCKAGE (SQLite par défaut). Les relevés
+déjà présents (même station, même date et heure) sont ignorés : l'import peut
+être relancé sans risque.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from phenomenes import PhenomenesInconnus
+from stockage import DOSSIER_DONNEES, DepotParquet, depot, typer_releves
+
+
+def migrer_dossier(dossier: str = DOSSIER_DONNEES) -> None:
+    cible = depot()
+    fichiers = sorted(f for f in os.listdir(dossier) if f.endswith((".csv", ".parquet")))
+    if not fichiers:
+        print("Aucun fichier à migrer.")
+        return
+    total = 0
+    for f in fichiers:
+        ville, ext = os.path.splitext(f)
+        chemin = os.path.join(dossier, f)
+        if isinstance(cible, DepotParquet):
+            # Même dossier : seule la conversion des CSV restants est à faire
+            if ext == ".csv":
+                nb = cible.convertir_csv(ville)
+                total += nb
+                print(f"  {f:<26} {nb:>10,} relevés convertis en Parquet")
+            continue
+        brut = pd.read_parquet(chemin) if ext == ".parquet" else pd.read_csv(chemin)
+        df = typer_releves(brut.drop(columns=["id"], errors="ignore"))
+        nb = cible.importer_releves(ville, df)
+        total += nb
+        print(f"  {f:<26} {len(df):>10,} relevés lus, {nb:>10,} importés")
+    print(f"{total:,} relevé(s) importé(s) dans le dépôt {type(cible).__name__}.")
+
+
+def migrer_phenomenes(forcer: bool = False) -> None:
+    """Convertit les phénomènes stockés en texte (« Orage, Brume ») en masques de bits.
+
+    La base SQLite est convertie d'office à son ouverture ; les partitions
+    Parquet le sont à leur prochaine écriture, ou toutes d'un coup ici.
+    Un libellé inconnu arrête la conversion, sauf avec --forcer.
+    """
+    try:
+        nb = depot(forcer_migration=forcer).migrer_phenomenes(forcer)
+    except PhenomenesInconnus as e:
+        sys.exit(f"{e}\nConversion annulée : corriger ces relevés, ou relancer avec --forcer "
+                 "pour abandonner ces libellés.")
+    print(f"{nb:,} relevé(s) converti(s) en masques de phénomènes.")
+
+
+def compacter() -> None:
+    """Intègre aux partitions les corrections du journal en attente (à planifier, p. ex. chaque nuit)."""
+    nb = depot().compacter()
+    print(f"{nb:,} ligne(s) du journal des corrections intégrée(s).")
+
+
+def exporter_tout(destination: str) -> None:
+    os.makedirs(destination, exist_ok=True)
+    for ville in depot().lister_stations():
+        with open(os.path.join(destination, f"{ville}.csv"), "wb") as f:
+            f.write(depot().exporter_csv(ville))
+        print(f"  {ville}.csv")
+
+
+def mesurer() -> None:
+    """Temps de chargement et mémoire occupée par l'ensemble des relevés."""
+    t0 = time.perf_counter()
+    df = depot().creer_chargeur().charger()
+    duree = time.perf_counter() - t0
+    memoire = df.memory_usage(deep=True).sum() if not df.empty else 0
+    print(f"Chargement : {duree:.3f} s  |  Mémoire : {memoire / 1024**2:.1f} Mo  |  {len(df):,} relevés")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dossier", default=DOSSIER_DONNEES)
+    parser.add_argument("--export", metavar="DOSSIER", help="exporter les stations en CSV")
+    parser.add_argument("--phenomenes", action="store_true", help="convertir les phénomènes en masques de bits")
+    parser.add_argument("--forcer", action="store_true", help="avec --phenomenes : abandonner les libellés inconnus")
+    parser.add_argument("--compacter", action="store_true", help="intégrer les corrections en attente")
+    args = parser.parse_args()
+    if args.export:
+        exporter_tout(args.export)
+    elif args.phenomenes:
+        migrer_phenomenes(args.forcer)
+    elif args.compacter:
+        compacter()
+    elif not os.path.isdir(args.dossier):
+        sys.exit(f"Dossier introuvable : {args.dossier}")
+    else:
+        migrer_dossier(args.dossier)
+        mesurer()
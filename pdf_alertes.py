@@ -1,30 +1,290 @@
 # === CONTENU DU FICHIER pdf_alertes.py ===
+"""Rapport PDF des alertes pluviométriques, produit entièrement en mémoire.
+
+generer_rapport_alertes_pdf(...) renvoie les octets du PDF : aucun fichier
+n'est écrit, deux utilisateurs peuvent générer leur rapport en même temps.
+Le tableau est mis en forme colonne par colonne (pandas), par blocs de
+LIGNES_PAR_BLOC lignes : chaque ligne devient une chaîne alignée en Courier,
+posée d'un seul appel FPDF.text() (bien plus léger que cell()/multi_cell()).
+Un rapport de 100 000 alertes se génère ainsi en quelques secondes, sans
+copie intermédiaire du tableau entier. Les graphiques (graphiques.py) sont
+tracés dans un pool de processus pendant la mise en page du tableau.
+"""
+import io
+from datetime import date, datetime
+
+import pandas as pd
 from fpdf import FPDF
-from datetime import datetime
+
+import metriques
+import phenomenes
+from graphiques import cache_graphiques, cle_graphiques
+from referentiel import SEUIL_VIGILANCE_MM
+
+BLEU  = (0, 63, 138)     # Bleu SODEXAM
+ROUGE = (214, 48, 49)
+ORANGE = (225, 112, 85)
+GRIS  = (99, 110, 114)
+
+# (titre, nb de caractères, alignement) – tableau en Courier (chasse fixe) :
+# une ligne du tableau = une seule chaîne, posée en un appel FPDF.text().
+COLONNES_TABLEAU = [
+    ("Date / heure", 16, "g"),
+    ("Station",      22, "g"),
+    ("mm",            7, "d"),
+    ("Phénomènes",   36, "g"),
+    ("Agent",        16, "g"),
+]
+COLONNE_NIVEAU = ("Niveau", 9)   # en couleur, posée à part
+POLICE_TABLEAU = 7.5
+CHASSE_MM = 0.6 * POLICE_TABLEAU * 25.4 / 72   # largeur d'un caractère Courier
+LIGNES_PAR_BLOC = 5_000
+HAUTEUR_LIGNE = 4.6
+BAS_DE_PAGE = 280
+
+# Caractères courants hors Latin-1 (polices PDF standard)
+_REMPLACEMENTS = str.maketrans({"–": "-", "—": "-", "’": "'", "‘": "'", "“": '"', "”": '"',
+                                "…": "...", "œ": "oe", "Œ": "OE", "€": "EUR", "≥": ">="})
+
+
+def _texte(s) -> str:
+    """Chaîne affichable avec les polices standard (Latin-1), emojis retirés."""
+    return str(s).translate(_REMPLACEMENTS).encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+def _colonne_texte(serie: pd.Series, nb_max: int) -> pd.Series:
+    """Version vectorisée de _texte, tronquée à nb_max caractères."""
+    s = serie.astype("object").where(serie.notna(), "").astype(str)
+    s = s.str.translate(_REMPLACEMENTS).str.encode("latin-1", "ignore").str.decode("latin-1").str.strip()
+    trop_long = s.str.len() > nb_max
+    return s.where(~trop_long, s.str.slice(0, nb_max - 1) + ".")
+
 
 class SODEXAM_PDF(FPDF):
+    def __init__(self, titre: str = "", logo_path: str | None = None):
+        super().__init__(orientation="P", unit="mm", format="A4")
+        self.titre = _texte(titre)
+        self.logo_path = logo_path
+        self.set_auto_page_break(auto=False)
+        self.alias_nb_pages("{nb_pages}")
+        self.set_compression(True)
+
     def header(self):
-        self.set_fill_color(0, 63, 138) # Bleu SODEXAM
-        self.rect(0, 0, 210, 30, 'F')
-        self.set_font("Arial", "B", 15)
+        self.set_fill_color(*BLEU)
+        self.rect(0, 0, 210, 24, "F")
+        if self.logo_path:
+            try:
+                self.image(self.logo_path, x=8, y=3, h=18)
+            except Exception:
+                pass   # logo illisible : l'en-tête reste lisible sans lui
+        self.set_xy(10, 6)
+        self.set_font("helvetica", "B", 14)
         self.set_text_color(255, 255, 255)
-        self.cell(0, 10, "SODEXAM - RAPPORT D'ALERTE", ln=True, align="C")
-        self.ln(10)
+        self.cell(0, 7, "SODEXAM - RAPPORT D'ALERTE", align="C")
+        self.set_xy(10, 13)
+        self.set_font("helvetica", "", 9)
+        self.cell(0, 6, self.titre, align="C")
+        self.set_text_color(0, 0, 0)
+        self.set_y(30)
 
-def generer_rapport_alertes_pdf(df_alertes, seuil):
-    pdf = SODEXAM_PDF()
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 12)
-    pdf.set_text_color(200, 0, 0)
-    pdf.cell(0, 10, f"Alertes detectees au-dessus de {seuil} mm", ln=True)
-    
-    pdf.set_font("Arial", "", 10)
+    def footer(self):
+        self.set_y(-12)
+        self.set_font("helvetica", "I", 8)
+        self.set_text_color(*GRIS)
+        self.cell(0, 8, f"SODEXAM - Page {self.page_no()}/{{nb_pages}}", align="C")
+
+
+# ============================================================
+# SECTIONS
+# ============================================================
+def _titre_section(pdf: FPDF, texte: str) -> None:
+    pdf.set_font("helvetica", "B", 11)
+    pdf.set_text_color(*BLEU)
+    pdf.cell(0, 8, _texte(texte), new_x="LMARGIN", new_y="NEXT")
+    pdf.set_text_color(0, 0, 0)
+
+
+def _kpis(pdf: FPDF, valeurs: list[tuple[str, str]]) -> None:
+    largeur = 190 / len(valeurs)
+    y = pdf.get_y()
+    for i, (libelle, valeur) in enumerate(valeurs):
+        x = 10 + i * largeur
+        pdf.set_draw_color(*BLEU)
+        pdf.rect(x + 1, y, largeur - 2, 18)
+        pdf.set_xy(x + 1, y + 2)
+        pdf.set_font("helvetica", "B", 14)
+        pdf.cell(largeur - 2, 7, _texte(valeur), align="C")
+        pdf.set_xy(x + 1, y + 10)
+        pdf.set_font("helvetica", "", 7)
+        pdf.set_text_color(*GRIS)
+        pdf.cell(largeur - 2, 5, _texte(libelle).upper(), align="C")
+        pdf.set_text_color(0, 0, 0)
+    pdf.set_y(y + 22)
+
+
+def _entete_tableau(pdf: FPDF) -> float:
+    y = pdf.get_y()
+    pdf.set_fill_color(*BLEU)
+    pdf.rect(10, y, 190, HAUTEUR_LIGNE + 1.4, "F")
+    pdf.set_font("courier", "B", POLICE_TABLEAU)
+    pdf.set_text_color(255, 255, 255)
+    titres = [_texte(t).ljust(n) if al == "g" else _texte(t).rjust(n) for t, n, al in COLONNES_TABLEAU]
+    pdf.text(11, y + HAUTEUR_LIGNE, " ".join(titres) + " " + COLONNE_NIVEAU[0])
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("courier", "", POLICE_TABLEAU)
+    return y + HAUTEUR_LIGNE + 1.4 + HAUTEUR_LIGNE
+
+
+def _formater_bloc(bloc: pd.DataFrame, seuil_mm: float) -> tuple[list, list]:
+    """Lignes du tableau (chaînes alignées) et niveaux, mis en forme colonne par colonne."""
+    pluie = bloc["Pluie (mm)"].astype("float64")
+    vide = pd.Series("", index=bloc.index)
+    colonnes = [
+        bloc["Date_Heure"].dt.strftime("%d/%m/%Y %H:%M"),
+        bloc["Ville"],
+        pluie.map("{:.1f}".format),
+        bloc["Phenomenes"] if "Phenomenes" in bloc else vide,
+        bloc["Saisi_par"] if "Saisi_par" in bloc else vide,
+    ]
+    lignes = None
+    for serie, (_, nb, alignement) in zip(colonnes, COLONNES_TABLEAU):
+        serie = _colonne_texte(serie, nb)
+        serie = serie.str.ljust(nb) if alignement == "g" else serie.str.rjust(nb)
+        lignes = serie if lignes is None else lignes + " " + serie
+    niveaux = pd.Series("VIGILANCE", index=bloc.index).where(pluie < seuil_mm, "ALERTE")
+    return lignes.tolist(), niveaux.tolist()
+
+
+def _niveaux(pdf: FPDF, x: float, niveaux: list[tuple[float, str]]) -> None:
+    """Colonne Niveau d'une page, posée en deux passes (une couleur par passe)."""
+    for libelle, couleur in (("ALERTE", ROUGE), ("VIGILANCE", ORANGE)):
+        pdf.set_text_color(*couleur)
+        for y, niveau in niveaux:
+            if niveau == libelle:
+                pdf.text(x, y, niveau)
     pdf.set_text_color(0, 0, 0)
-    
-    for _, row in df_alertes.iterrows():
-        texte = f"- {row['Date_Heure']} | {row['Ville']} : {row['Pluie (mm)']} mm ({row.get('Phenomenes', 'RAS')})"
-        pdf.multi_cell(0, 10, texte)
-    
-    filename = "alerte_sodexam.pdf"
-    pdf.output(filename)
-    return filename
+    niveaux.clear()
+
+
+def _tableau(pdf: FPDF, df: pd.DataFrame, seuil_mm: float) -> None:
+    x_niveau = 11 + sum(n + 1 for _, n, _ in COLONNES_TABLEAU) * CHASSE_MM
+    en_attente: list[tuple[float, str]] = []
+    y = _entete_tableau(pdf)
+    for debut in range(0, len(df), LIGNES_PAR_BLOC):
+        lignes, niveaux = _formater_bloc(df.iloc[debut:debut + LIGNES_PAR_BLOC], seuil_mm)
+        for ligne, niveau in zip(lignes, niveaux):
+            if y > BAS_DE_PAGE:
+                _niveaux(pdf, x_niveau, en_attente)
+                pdf.add_page()
+                y = _entete_tableau(pdf)
+            pdf.text(11, y, ligne)
+            en_attente.append((y, niveau))
+            y += HAUTEUR_LIGNE
+    _niveaux(pdf, x_niveau, en_attente)
+    pdf.set_y(y)
+
+
+def _graphiques(pdf: FPDF, images: dict[str, bytes]) -> None:
+    """Les quatre graphiques sur une page, en grille 2 x 2."""
+    if not images:
+        return
+    pdf.add_page()
+    _titre_section(pdf, "Graphiques")
+    y0 = pdf.get_y()
+    largeur, hauteur = 94, 94 * 3.6 / 5.2
+    for i, nom in enumerate(("stations", "serie", "phenomenes", "intensite")):
+        if nom in images:
+            x, y = 10 + (i % 2) * (largeur + 2), y0 + (i // 2) * (hauteur + 4)
+            pdf.image(io.BytesIO(images[nom]), x=x, y=y, w=largeur, h=hauteur)
+    pdf.set_y(y0 + 2 * (hauteur + 4))
+
+
+def _note_methodo(pdf: FPDF, seuil_mm: float, seuil_vigilance: float) -> None:
+    if pdf.get_y() > 240:
+        pdf.add_page()
+    pdf.ln(4)
+    _titre_section(pdf, "Note méthodologique")
+    pdf.set_font("helvetica", "", 8.5)
+    pdf.multi_cell(0, 4.5, _texte(
+        f"Alerte : relevé ponctuel supérieur ou égal à {seuil_mm:.0f} mm. "
+        f"Vigilance : relevé compris entre {seuil_vigilance:.0f} mm et le seuil d'alerte. "
+        "Source : relevés des stations saisis dans la plateforme SODEXAM "
+        "(heures synoptiques 06h, 08h, 12h, 18h, 21h et observations spéciales)."
+    ))
+
+
+# ============================================================
+# POINT D'ENTRÉE
+# ============================================================
+@metriques.chronometre()
+def generer_rapport_alertes_pdf(df_total: pd.DataFrame, seuil_mm: float = 50.0,
+                                date_debut: date | None = None, date_fin: date | None = None,
+                                titre_rapport: str = "Rapport Alertes Pluviométriques",
+                                generateur: str = "", logo_path: str | None = None,
+                                seuil_vigilance: float = SEUIL_VIGILANCE_MM,
+                                inclure_vigilance: bool = True, graphiques: bool = True,
+                                villes: list[str] | None = None, version_donnees=None) -> bytes:
+    """Rapport PDF (octets) des alertes de `df_total` sur [date_debut, date_fin].
+
+    `version_donnees` (version du chargeur des relevés) et `villes` complètent
+    la clé du cache des graphiques ; sans version, elle est calculée sur les relevés.
+    """
+    df = df_total
+    if date_debut is not None:
+        df = df[df["Date_Heure"] >= pd.Timestamp(date_debut)]
+    if date_fin is not None:
+        df = df[df["Date_Heure"] < pd.Timestamp(date_fin) + pd.Timedelta(days=1)]
+
+    pluie = df["Pluie (mm)"]
+    masque_alerte = pluie >= seuil_mm
+    masque_vigil = (pluie >= seuil_vigilance) & ~masque_alerte
+    lignes = df[masque_alerte | masque_vigil] if inclure_vigilance else df[masque_alerte]
+    lignes = lignes.sort_values(["Pluie (mm)", "Date_Heure"], ascending=[False, True], kind="stable")
+    metriques.compter_lignes(len(lignes))
+
+    # Graphiques lancés d'abord : ils se tracent pendant la mise en page du tableau
+    if graphiques:
+        cache = cache_graphiques()
+        cle = cle_graphiques(df, version_donnees, date_debut, date_fin, villes, seuil_mm)
+        futures = cache.lancer(cle, df, seuil_mm)
+
+    pdf = SODEXAM_PDF(titre_rapport, logo_path)
+    pdf.add_page()
+
+    periode = (f"Période : {date_debut:%d/%m/%Y} au {date_fin:%d/%m/%Y}"
+               if date_debut and date_fin else "Période : toutes les données")
+    pdf.set_font("helvetica", "", 9)
+    pdf.cell(0, 5, _texte(periode), new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 5, _texte(f"Généré le {datetime.now():%d/%m/%Y à %H:%M}"
+                          + (f" par {generateur}" if generateur else "")),
+             new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(3)
+
+    _kpis(pdf, [
+        ("Alertes", f"{int(masque_alerte.sum()):,}".replace(",", " ")),
+        ("Vigilances", f"{int(masque_vigil.sum()):,}".replace(",", " ")),
+        ("Stations touchées", str(df.loc[masque_alerte, "Ville"].nunique())),
+        ("Max ponctuel", f"{pluie.max():.1f} mm" if not df.empty else "-"),
+    ])
+
+    if "Phenomenes" in df:
+        # Comptes sur les masques de bits des relevés en alerte
+        ph = phenomenes.compter(df.loc[masque_alerte, "Phenomenes"])
+        pdf.set_font("helvetica", "", 9)
+        pdf.multi_cell(0, 5, _texte("Phénomènes associés aux alertes : "
+                                    + (", ".join(f"{nom} ({nb})" for nom, nb in ph.items()) or "aucun")),
+                       new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+    _titre_section(pdf, f"Relevés au-dessus du seuil ({seuil_mm:.0f} mm"
+                        + (f", vigilance dès {seuil_vigilance:.0f} mm)" if inclure_vigilance else ")"))
+    if lignes.empty:
+        pdf.set_font("helvetica", "", 10)
+        pdf.cell(0, 8, "RAS - aucun relevé au-dessus du seuil sur la période.", new_x="LMARGIN", new_y="NEXT")
+    else:
+        _tableau(pdf, lignes, seuil_mm)
+
+    if graphiques:
+        _graphiques(pdf, cache.images(cle, futures))
+    _note_methodo(pdf, seuil_mm, seuil_vigilance)
+    return bytes(pdf.output())
@@ -0,0 +1,95 @@
+# === CONTENU DU FICHIER phenomenes.py ===
+"""Phénomènes observés codés en masque de bits (un bit par entrée de PHENOMENES_OPTIONS).
+
+Le dépôt stocke un entier (0 : aucun phénomène). En mémoire, la colonne
+Phenomenes est une catégorie dont le code *est* le masque et dont les
+libellés (« Orage, Brume ») sont précalculés pour les 2^9 combinaisons :
+affichage et exports restent en texte sans créer une chaîne par relevé,
+comptes et filtres se font par opérations sur les bits.
+"""
+import numpy as np
+import pandas as pd
+
+from referentiel import PHENOMENES_OPTIONS
+
+BITS = {nom: 1 << i for i, nom in enumerate(PHENOMENES_OPTIONS)}
+NB_MASQUES = 1 << len(PHENOMENES_OPTIONS)
+LIBELLES = [", ".join(n for n, b in BITS.items() if m & b) for m in range(NB_MASQUES)]
+DTYPE = pd.CategoricalDtype(LIBELLES)
+
+_PAR_NOM = {nom.casefold(): bit for nom, bit in BITS.items()}
+# Ligne m : bits du masque m (pour compter tous les phénomènes d'un coup)
+_MATRICE = (np.arange(NB_MASQUES)[:, None] >> np.arange(len(BITS))) & 1
+
+
+class PhenomenesInconnus(ValueError):
+    """Libellés absents de PHENOMENES_OPTIONS : ils seraient perdus dans le masque."""
+
+    def __init__(self, noms: list[str]):
+        self.noms = noms
+        super().__init__(f"Phénomène(s) inconnu(s) : {', '.join(noms)}")
+
+
+def inconnus(valeurs) -> list[str]:
+    """Libellés inconnus (triés, sans doublon) d'une colonne de textes ; masques et catégories canoniques n'en ont pas."""
+    noms = set()
+    for v in pd.Series(valeurs, dtype=object).dropna().unique():
+        if isinstance(v, str):
+            noms.update(n.strip() for n in v.split(",") if n.strip() and n.strip().casefold() not in _PAR_NOM)
+    return sorted(noms)
+
+
+def verifier(valeurs) -> None:
+    """Lève PhenomenesInconnus si la colonne contient un libellé inconnu."""
+    noms = inconnus(valeurs)
+    if noms:
+        raise PhenomenesInconnus(noms)
+
+
+def masque(valeur) -> int:
+    """Masque d'une liste de noms ou d'un texte « Orage, Vent fort » (noms inconnus ignorés, voir verifier)."""
+    if valeur is None or (isinstance(valeur, float) and np.isnan(valeur)):
+        return 0
+    if isinstance(valeur, (int, np.integer)):
+        return int(valeur) & (NB_MASQUES - 1)
+    noms = valeur.split(",") if isinstance(valeur, str) else valeur
+    m = 0
+    for nom in noms:
+        m |= _PAR_NOM.get(str(nom).strip().casefold(), 0)
+    return m
+
+
+def masques(serie: pd.Series) -> np.ndarray:
+    """Masques (uint16) d'une colonne : catégorie canonique, entiers ou textes."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        if serie.dtype == DTYPE:
+            return serie.cat.codes.to_numpy().clip(0).astype(np.uint16)
+        # Autres catégories : un calcul par libellé distinct, pas par relevé
+        table = np.array([masque(c) for c in serie.cat.categories] + [0], dtype=np.uint16)
+        return table[serie.cat.codes.to_numpy()]
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.fillna(0).to_numpy().astype(np.int64).clip(0, NB_MASQUES - 1).astype(np.uint16)
+    codes, uniques = pd.factorize(serie)
+    table = np.array([masque(u) for u in uniques] + [0], dtype=np.uint16)
+    return table[codes]
+
+
+def categoriser(serie: pd.Series) -> pd.Series:
+    """Colonne en mémoire : catégorie canonique (code = masque)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and serie.dtype == DTYPE:
+        return serie
+    return pd.Series(pd.Categorical.from_codes(masques(serie), dtype=DTYPE), index=serie.index, name=serie.name)
+
+
+def compter(serie: pd.Series) -> pd.Series:
+    """Nombre de relevés par phénomène (index : noms), décroissant, sans les zéros."""
+    par_masque = np.bincount(masques(serie), minlength=NB_MASQUES)
+    comptes = pd.Series(par_masque @ _MATRICE, index=list(BITS))
+    return comptes[comptes > 0].sort_values(ascending=False)
+
+
+def avec(serie: pd.Series, noms, tous: bool = False) -> np.ndarray:
+    """Relevés ayant l'un (ou, si `tous`, chacun) des phénomènes `noms`."""
+    m = masque(noms)
+    bits = masques(serie) & m
+    return bits == m if tous else bits != 0
@@ -0,0 +1,132 @@
+# === CONTENU DU FICHIER rapports.py ===
+"""Cache disque des rapports PDF, partagé par toutes les sessions.
+
+Un rapport est adressé par son contenu : empreinte des relevés concernés +
+paramètres qui changent le PDF (période, stations, seuil, titre, vigilance,
+logo). « Générer le PDF » puis « Générer & Envoyer », ou deux administrateurs
+demandant le même rapport mensuel, produisent donc un seul PDF : le demandeur
+n'y est pas imprimé, il est nommé dans le corps de l'e-mail.
+
+Les fichiers vivent dans SODEXAM_TACHES/rapports ; au-delà de `taille_max`
+octets, les rapports les moins récemment utilisés sont supprimés.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Paramètres de tâche qui changent le contenu du PDF (le demandeur n'y est pas imprimé)
+CHAMPS_RAPPORT = ("empreinte", "date_debut", "date_fin", "villes", "seuil_mm",
+                  "titre_rapport", "inclure_vigilance", "logo_path")
+# Colonnes des relevés reprises dans le PDF (tableau, KPIs, graphiques)
+COLONNES_RAPPORT = ("Ville", "Date_Heure", "Pluie (mm)", "Phenomenes", "Saisi_par")
+TAILLE_MAX_DEFAUT = int(os.environ.get("SODEXAM_CACHE_RAPPORTS_MO", "256")) * 1024**2
+
+
+def empreinte_releves(df: pd.DataFrame) -> str:
+    """Empreinte de toutes les colonnes rendues : une correction de phénomène ou d'agent la change."""
+    colonnes = [c for c in COLONNES_RAPPORT if c in df]
+    return str(pd.util.hash_pandas_object(df[colonnes], index=False).sum())
+
+
+def cle_rapport(params: dict) -> str:
+    contenu = {c: params.get(c) for c in CHAMPS_RAPPORT}
+    contenu["villes"] = sorted(contenu["villes"] or [])
+    return hashlib.sha256(json.dumps(contenu, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+class CacheRapports:
+    """PDF sur disque indexés par clé, éviction LRU bornée en octets."""
+
+    def __init__(self, dossier: str, taille_max: int = TAILLE_MAX_DEFAUT):
+        self.dossier = dossier
+        self.taille_max = taille_max
+        self._verrou = threading.Lock()
+        self._en_cours: dict[str, threading.Event] = {}
+        os.makedirs(dossier, exist_ok=True)
+        # Index reconstruit depuis le disque : {cle: (taille, dernier accès)}
+        self._index: dict[str, tuple[int, float]] = {}
+        for nom in os.listdir(dossier):
+            if nom.endswith(".pdf"):
+                st = os.stat(os.path.join(dossier, nom))
+                self._index[nom[:-4]] = (st.st_size, st.st_mtime)
+        self.succes = 0
+        self.echecs = 0
+
+    def chemin(self, cle: str) -> str:
+        return os.path.join(self.dossier, f"{cle}.pdf")
+
+    @property
+    def taille(self) -> int:
+        with self._verrou:
+            return sum(t for t, _ in self._index.values())
+
+    def contient(self, cle: str) -> bool:
+        with self._verrou:
+            return cle in self._index
+
+    def lire(self, cle: str) -> bytes | None:
+        with self._verrou:
+            if cle not in self._index:
+                return None
+            self._index[cle] = (self._index[cle][0], time.time())
+        try:
+            with open(self.chemin(cle), "rb") as f:
+                contenu = f.read()
+        except OSError:
+            with self._verrou:
+                self._index.pop(cle, None)
+            return None
+        os.utime(self.chemin(cle))   # l'ordre LRU survit au redémarrage
+        return contenu
+
+    def ecrire(self, cle: str, contenu: bytes) -> None:
+        tmp = self.chemin(cle) + f".{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(contenu)
+        os.replace(tmp, self.chemin(cle))
+        with self._verrou:
+            self._index[cle] = (len(contenu), time.time())
+            self._evincer(garder=cle)
+
+    def obtenir(self, cle: str, fabrique) -> bytes:
+        """PDF de `cle` ; `fabrique()` ne tourne qu'une fois même si plusieurs tâches le demandent."""
+        while True:
+            contenu = self.lire(cle)
+            if contenu is not None:
+                with self._verrou:
+                    self.succes += 1
+                return contenu
+            with self._verrou:
+                attente = self._en_cours.get(cle)
+                if attente is None:
+                    attente = self._en_cours[cle] = threading.Event()
+                    break
+            attente.wait()   # même rapport en cours ailleurs : on relira son résultat
+        try:
+            contenu = fabrique()
+            self.ecrire(cle, contenu)
+            with self._verrou:
+                self.echecs += 1
+            return contenu
+        finally:
+            with self._verrou:
+                del self._en_cours[cle]
+            attente.set()
+
+    def _evincer(self, garder: str) -> None:
+        total = sum(t for t, _ in self._index.values())
+        for cle, (taille, _) in sorted(self._index.items(), key=lambda e: e[1][1]):
+            if total <= self.taille_max:
+                break
+            if cle == garder:
+                continue
+            try:
+                os.remove(self.chemin(cle))
+            except OSError:
+                pass
+            del self._index[cle]
+            total -= taille
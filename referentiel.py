@@ -0,0 +1,20 @@
+# === CONTENU DU FICHIER referentiel.py ===
+"""Seuils et phénomènes partagés par l'application et les modules de calcul."""
+
+SEUIL_ALERTE_MM    = 50.0   # Seuil pluie forte (mm)
+SEUIL_VIGILANCE_MM = 20.0   # Seuil vigilance
+
+# Plages admises pour chaque mesure (formulaire de saisie et ingestion en masse)
+BORNES_MESURES = {
+    "Pluie (mm)":      (0.0, 999.9),
+    "Temperature (C)": (-5.0, 55.0),
+    "Humidite (%)":    (0, 100),
+    "Vent (km/h)":     (0.0, 300.0),
+}
+
+# Coordonnées des stations : voir registre.py (villes_ci.csv)
+
+PHENOMENES_OPTIONS = [
+    "Orage", "Vent Fort", "Brume", "Brouillard", "Rosée",
+    "Grêle", "Tornade", "Inondation", "Sécheresse"
+]
@@ -0,0 +1,150 @@
+# === CONTENU DU FICHIER registre.py ===
+"""Registre des stations (villes_ci.csv) avec index spatial en grille.
+
+Le fichier SODEXAM_STATIONS (``villes_ci.csv`` par défaut, colonnes Ville,
+Lat, Lon) est la seule source des coordonnées. L'index découpe le territoire
+en cellules de ``pas`` degrés : une emprise de carte ou une recherche de
+station la plus proche ne parcourt que les cellules concernées.
+"""
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+FICHIER_STATIONS = os.environ.get("SODEXAM_STATIONS", "villes_ci.csv")
+RAYON_TERRE_KM = 6371.0
+TAILLE_GRAPPE_PX = 60   # côté d'une grappe à l'écran, en pixels
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique (haversine), vectorisée sur numpy."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * RAYON_TERRE_KM * np.arcsin(np.sqrt(a))
+
+
+def taille_grappe_deg(zoom: int) -> float:
+    """Côté en degrés d'une grappe de TAILLE_GRAPPE_PX pixels au niveau de zoom donné."""
+    return TAILLE_GRAPPE_PX * 360.0 / (256 * 2 ** zoom)
+
+
+class RegistreStations:
+    """Stations et coordonnées, indexées par cellule de grille."""
+
+    def __init__(self, stations: pd.DataFrame, pas: float = 0.5):
+        stations = stations.dropna(subset=["Lat", "Lon"]).drop_duplicates("Ville", keep="last")
+        self.stations = stations[["Ville", "Lat", "Lon"]].reset_index(drop=True)
+        self.noms = self.stations["Ville"].to_numpy()
+        self.lat = self.stations["Lat"].to_numpy(dtype="float64")
+        self.lon = self.stations["Lon"].to_numpy(dtype="float64")
+        self.pas = pas
+        ci = np.floor(self.lat / pas).astype(np.int64)
+        cj = np.floor(self.lon / pas).astype(np.int64)
+        ordre = np.lexsort((cj, ci))
+        self._cellules: dict[tuple[int, int], np.ndarray] = {}
+        if len(ordre):
+            cles = np.stack([ci[ordre], cj[ordre]], axis=1)
+            coupures = np.flatnonzero((cles[1:] != cles[:-1]).any(axis=1)) + 1
+            for morceau in np.split(ordre, coupures):
+                self._cellules[(int(ci[morceau[0]]), int(cj[morceau[0]]))] = morceau
+        self._ci_min, self._ci_max = (int(ci.min()), int(ci.max())) if len(ci) else (0, -1)
+        self._cj_min, self._cj_max = (int(cj.min()), int(cj.max())) if len(cj) else (0, -1)
+
+    def __len__(self) -> int:
+        return len(self.noms)
+
+    @property
+    def coords(self) -> dict[str, list[float]]:
+        """{Ville: [lat, lon]}, dans l'ordre du fichier."""
+        return {v: [la, lo] for v, la, lo in zip(self.noms, self.lat, self.lon)}
+
+    # ---------- Emprise ----------
+    def dans_emprise(self, sud: float, ouest: float, nord: float, est: float) -> np.ndarray:
+        """Indices des stations comprises dans le rectangle (degrés)."""
+        i0, i1 = max(math.floor(sud / self.pas), self._ci_min), min(math.floor(nord / self.pas), self._ci_max)
+        j0, j1 = max(math.floor(ouest / self.pas), self._cj_min), min(math.floor(est / self.pas), self._cj_max)
+        if i0 > i1 or j0 > j1:
+            return np.array([], dtype=np.int64)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self._cellules):
+            morceaux = [self._cellules[(i, j)] for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+                        if (i, j) in self._cellules]
+        else:
+            morceaux = [idx for (i, j), idx in self._cellules.items() if i0 <= i <= i1 and j0 <= j <= j1]
+        if not morceaux:
+            return np.array([], dtype=np.int64)
+        idx = np.concatenate(morceaux)
+        dedans = ((self.lat[idx] >= sud) & (self.lat[idx] <= nord)
+                  & (self.lon[idx] >= ouest) & (self.lon[idx] <= est))
+        return np.sort(idx[dedans])
+
+    # ---------- Station la plus proche ----------
+    def _perimetre(self, ci: int, cj: int, r: int):
+        """Cellules non vides de l'anneau de rayon `r` (en cellules) autour de (ci, cj)."""
+        if r == 0:
+            cellules = [(ci, cj)]
+        else:
+            cellules = [(i, j) for i in (ci - r, ci + r) for j in range(cj - r, cj + r + 1)]
+            cellules += [(i, j) for j in (cj - r, cj + r) for i in range(ci - r + 1, ci + r)]
+        return [self._cellules[c] for c in cellules if c in self._cellules]
+
+    def plus_proche(self, lat: float, lon: float) -> tuple[str, float] | None:
+        """(Ville, distance en km) de la station la plus proche du point, None si registre vide."""
+        if not len(self):
+            return None
+        if not (self.lat.min() <= lat <= self.lat.max() and self.lon.min() <= lon <= self.lon.max()):
+            # Point hors de l'emprise du registre : toutes les stations d'un bloc
+            d = distance_km(lat, lon, self.lat, self.lon)
+            k = int(np.argmin(d))
+            return str(self.noms[k]), float(d[k])
+        ci, cj = math.floor(lat / self.pas), math.floor(lon / self.pas)
+        # Point dans l'emprise : la grille entière est atteinte dans ce rayon
+        rayon_max = max(ci - self._ci_min, self._ci_max - ci, cj - self._cj_min, self._cj_max - cj)
+        # Une cellule de longitude mesure au moins pas x 111,32 x cos(latitude extrême du registre)
+        km_par_cellule = self.pas * 111.32 * math.cos(math.radians(min(np.abs(self.lat).max(), 89.0)))
+        meilleur, d_meilleur = None, math.inf
+        for r in range(rayon_max + 1):
+            # Toute station hors des anneaux déjà vus est à plus de (r - 1) cellules
+            if meilleur is not None and max(r - 1, 0) * km_par_cellule > d_meilleur:
+                break
+            anneau = self._perimetre(ci, cj, r)
+            if not anneau:
+                continue
+            idx = np.concatenate(anneau)
+            d = distance_km(lat, lon, self.lat[idx], self.lon[idx])
+            k = int(np.argmin(d))
+            if d[k] < d_meilleur:
+                meilleur, d_meilleur = idx[k], float(d[k])
+        return str(self.noms[meilleur]), d_meilleur
+
+    # ---------- Regroupement ----------
+    def grappes(self, indices: np.ndarray, zoom: int) -> np.ndarray:
+        """Numéro de grappe de chaque station de `indices` pour le niveau de zoom donné.
+
+        Les stations tombant dans la même case de TAILLE_GRAPPE_PX pixels à l'écran
+        partagent un numéro (regroupement côté serveur, calculé d'un seul bloc).
+        """
+        taille = taille_grappe_deg(zoom)
+        gi = np.floor(self.lat[indices] / taille).astype(np.int64)
+        gj = np.floor(self.lon[indices] / taille).astype(np.int64)
+        _, groupe = np.unique(np.stack([gi, gj], axis=1), axis=0, return_inverse=True)
+        return groupe.ravel()
+
+
+def charger_registre(chemin: str = FICHIER_STATIONS) -> RegistreStations:
+    return RegistreStations(pd.read_csv(chemin))
+
+
+_REGISTRE: RegistreStations | None = None
+_VERROU = threading.Lock()
+
+
+def registre() -> RegistreStations:
+    """Registre du processus, lu une fois depuis FICHIER_STATIONS."""
+    global _REGISTRE
+    with _VERROU:
+        if _REGISTRE is None:
+            _REGISTRE = charger_registre()
+        return _REGISTRE
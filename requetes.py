@@ -0,0 +1,85 @@
+# === CONTENU DU FICHIER requetes.py ===
+"""Requêtes (stations, début, fin) sur les relevés partagés, par recherche binaire.
+
+Le DataFrame du chargeur est trié par Date_Heure : une période toutes
+stations confondues est une simple tranche (vue, sans copie). Pour chaque
+station, l'index garde ses dates (DatetimeIndex trié) et ses positions dans
+le DataFrame partagé ; une période se trouve par searchsorted et seules les
+k lignes retenues sont extraites : O(log n + k) au lieu d'un filtre
+`.dt.date` sur toutes les lignes à chaque rerun.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def bornes(debut: date | pd.Timestamp | None, fin: date | pd.Timestamp | None) -> tuple:
+    """[debut 00:00, fin + 1 jour) ; un Timestamp est pris tel quel, None laisse la borne ouverte."""
+    d0 = None if debut is None else pd.Timestamp(debut)
+    if fin is None:
+        d1 = None
+    elif isinstance(fin, pd.Timestamp):
+        d1 = fin
+    else:
+        d1 = pd.Timestamp(fin) + pd.Timedelta(days=1)
+    return d0, d1
+
+
+class IndexReleves:
+    """Index par station d'un DataFrame de relevés trié par Date_Heure (non modifié)."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        if df.empty:
+            self.dates = pd.DatetimeIndex([])
+            self._stations: dict[str, tuple[pd.DatetimeIndex, np.ndarray]] = {}
+            return
+        self.dates = pd.DatetimeIndex(df["Date_Heure"])
+        # Positions croissantes : les dates de chaque station restent triées
+        self._stations = {
+            str(v): (self.dates[pos], pos)
+            for v, pos in df.groupby("Ville", observed=True, sort=False).indices.items()
+        }
+
+    @property
+    def villes(self) -> list[str]:
+        return sorted(self._stations)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _tranche(self, dates: pd.DatetimeIndex, d0, d1) -> slice:
+        i = 0 if d0 is None else dates.searchsorted(d0, side="left")
+        j = len(dates) if d1 is None else dates.searchsorted(d1, side="left")
+        return slice(i, max(i, j))
+
+    def periode(self, debut=None, fin=None) -> pd.DataFrame:
+        """Toutes stations sur la période : tranche du DataFrame partagé (ne pas modifier)."""
+        return self.df.iloc[self._tranche(self.dates, *bornes(debut, fin))]
+
+    def positions(self, villes, debut=None, fin=None) -> np.ndarray:
+        """Positions (dans le DataFrame partagé) des relevés des `villes` sur la période."""
+        d0, d1 = bornes(debut, fin)
+        morceaux = []
+        for v in villes:
+            if v in self._stations:
+                dates, pos = self._stations[v]
+                morceaux.append(pos[self._tranche(dates, d0, d1)])
+        return np.concatenate(morceaux) if morceaux else np.empty(0, dtype=np.intp)
+
+    def requete(self, villes=None, debut=None, fin=None) -> pd.DataFrame:
+        """Relevés des `villes` (None : toutes) sur [debut, fin].
+
+        Toutes stations : tranche triée par date, sans copie. Sinon : copie des
+        seules lignes retenues, triées par station puis par date.
+        """
+        if villes is None or set(villes) >= self._stations.keys():
+            return self.periode(debut, fin)
+        return self.df.take(self.positions(villes, debut, fin))
+
+    def nb_releves(self, villes=None, debut=None, fin=None) -> int:
+        if villes is None:
+            t = self._tranche(self.dates, *bornes(debut, fin))
+            return t.stop - t.start
+        return len(self.positions(villes, debut, fin))
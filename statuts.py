@@ -0,0 +1,79 @@
+# === CONTENU DU FICHIER statuts.py ===
+"""État courant des stations pour la carte : un seul passage groupé sur les relevés.
+
+Le tableau renvoyé (une ligne par station) alimente les marqueurs, la carte
+de chaleur et le résumé 24 h de la page Carte Interactive.
+"""
+import numpy as np
+import pandas as pd
+
+from referentiel import SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM
+
+COLONNES_STATUT = ["Derniere_Date", "Pluie (mm)", "Cumul (mm)", "Phenomene", "Couleur", "Cumul 24h (mm)"]
+
+
+def _debut_fenetre(dates: pd.Series, seuil: pd.Timestamp) -> int:
+    """Position du premier relevé postérieur à `seuil` (relevés triés par Date_Heure)."""
+    return int(dates.searchsorted(seuil, side="left"))
+
+
+def statuts_stations(df: pd.DataFrame, stations, nb_jours: int,
+                     maintenant: pd.Timestamp | None = None) -> pd.DataFrame:
+    """Dernier relevé, cumul sur `nb_jours`, phénomène et couleur d'alerte par station.
+
+    `df` est le DataFrame partagé du chargeur, trié par Date_Heure : les fenêtres
+    de temps sont trouvées par recherche dichotomique, sans masque sur tout
+    l'historique. Le tableau est indexé par Ville et couvre `stations` plus
+    toute station ayant des relevés dans la fenêtre ; une station sans relevé
+    récent a la couleur « gray » et des valeurs manquantes.
+    """
+    maintenant = pd.Timestamp.now() if maintenant is None else maintenant
+    index = pd.Index(list(stations), name="Ville")
+    if df.empty:
+        statut = pd.DataFrame(index=index, columns=COLONNES_STATUT)
+        statut["Couleur"] = "gray"
+        return statut
+
+    dates = df["Date_Heure"]
+    fenetre = df.iloc[_debut_fenetre(dates, maintenant - pd.Timedelta(days=nb_jours)):]
+    g = fenetre.groupby("Ville", sort=False)
+    derniers = g.tail(1).set_index("Ville")
+    statut = pd.DataFrame({
+        "Derniere_Date": derniers["Date_Heure"],
+        # float32 → float64 arrondi : 12.3 s'affiche 12.3 et non 12.300000190734863
+        "Pluie (mm)":    derniers["Pluie (mm)"].astype("float64").round(6),
+        "Cumul (mm)":    g["Pluie (mm)"].sum().astype("float64"),
+        "Phenomene":     derniers["Phenomenes"].astype("object") if "Phenomenes" in derniers else np.nan,
+    })
+
+    jour = df.iloc[_debut_fenetre(dates, maintenant - pd.Timedelta(hours=24)):]
+    statut = statut.reindex(index.union(statut.index, sort=False))
+    statut["Cumul 24h (mm)"] = jour.groupby("Ville")["Pluie (mm)"].sum().astype("float64")
+
+    phenomene = statut["Phenomene"]
+    statut["Phenomene"] = phenomene.where(phenomene.notna() & (phenomene.astype(str) != ""), "RAS")
+    pluie = statut["Pluie (mm)"]
+    statut["Couleur"] = np.select(
+        [pluie.isna(), pluie >= SEUIL_ALERTE_MM, pluie >= SEUIL_VIGILANCE_MM, pluie > 0],
+        ["gray", "red", "orange", "blue"],
+        default="green",
+    )
+    statut.index.name = "Ville"
+    return statut[COLONNES_STATUT]
+
+
+def appliquer_alertes(statut: pd.DataFrame, niveaux: pd.Series) -> pd.DataFrame:
+    """Couleur relevée au niveau des alertes actives (cumuls glissants compris) et colonne Alerte.
+
+    `niveaux` : niveau le plus fort par station (MoteurAlertes.niveaux). Une
+    station sans relevé dans la fenêtre de la carte reste grise.
+    """
+    niveau = niveaux.reindex(statut.index)
+    couleur = statut["Couleur"]
+    actif = couleur != "gray"
+    return statut.assign(
+        Couleur=np.select(
+            [actif & (niveau == "alerte"), actif & (niveau == "vigilance") & (couleur != "red")],
+            ["red", "orange"], default=couleur),
+        Alerte=niveau.map({"alerte": "🚨 ALERTE", "vigilance": "⚠️ Vigilance"}).fillna(""),
+    )
@@ -0,0 +1,1102 @@
+# === CONTENU DU FICHIER stockage.py ===
+"""Accès aux relevés des stations et aux comptes utilisateurs.
+
+Deux dépôts interchangeables, choisis par la variable SODEXAM_STOCKAGE :
+- ``sqlite`` (défaut) : base SQLite en mode WAL (SODEXAM_BASE, ``sodexam.db``),
+  relevés et comptes dans le même fichier, index unique (Ville, Date_Heure) ;
+- ``parquet`` : une partition Parquet typée par station dans Donnees_Villes/.
+Les corrections (Historique & Corrections) sont inscrites dans un journal en
+ajout seul, signé et horodaté, d'où l'on peut reconstituer toute version
+passée d'une station (``historique``, ``reconstituer``).
+Le CSV ne sert qu'à l'import (anciens fichiers, ``migrer_donnees.py`` ; flux et archives,
+``ingestion.py``) et à l'export.
+"""
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import phenomenes
+from agregats import Agregats
+from alertes import MoteurAlertes
+
+DOSSIER_DONNEES = "Donnees_Villes"
+FICHIER_UTILISATEURS = "utilisateurs.csv"
+BASE_SQLITE = os.environ.get("SODEXAM_BASE", "sodexam.db")
+
+COLONNES_MESURES = ["Pluie (mm)", "Temperature (C)", "Humidite (%)", "Vent (km/h)"]
+COLONNES_CATEGORIES = ["Phenomenes", "Saisi_par"]
+COLONNES_RELEVE = ["Date_Heure"] + COLONNES_MESURES + ["Phenomenes", "Obs", "Saisi_par"]
+COLONNES_UTILISATEUR = ["identifiant", "mot_de_passe", "ville", "role", "email"]
+
+# Nombre d'octets relus juste avant la fin connue d'un fichier pour vérifier
+# qu'il a seulement été complété (ajout) et non réécrit (correction).
+_TAILLE_TEMOIN = 64
+
+# Dates telles qu'écrites dans SQLite et dans le journal des corrections
+_FORMAT_SQL = "%Y-%m-%d %H:%M:%S"
+
+
+class DoublonReleve(ValueError):
+    """Un relevé existe déjà pour cette station à cette date et heure."""
+
+
+def hash_password(pwd: str) -> str:
+    return hashlib.sha256(pwd.encode()).hexdigest()
+
+
+def normaliser_releves(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertit Date_Heure et Pluie (mm) et écarte les dates illisibles."""
+    df["Date_Heure"] = pd.to_datetime(df["Date_Heure"], errors="coerce")
+    df = df.dropna(subset=["Date_Heure"])
+    df["Pluie (mm)"] = pd.to_numeric(df.get("Pluie (mm)", 0), errors="coerce").fillna(0)
+    return df
+
+
+def typer_releves(df: pd.DataFrame) -> pd.DataFrame:
+    """Applique le schéma de stockage : datetime64, mesures float32, textes répétés en catégories.
+
+    Phenomenes (texte, masque entier ou catégorie) devient la catégorie
+    canonique de phenomenes.py, dont le code est le masque de bits.
+    """
+    df = normaliser_releves(df)
+    for col in COLONNES_MESURES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    for col in COLONNES_CATEGORIES:
+        if col == "Phenomenes" and col in df.columns:
+            df[col] = phenomenes.categoriser(df[col])
+        elif col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _phenomenes_en_masques(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie prête à stocker : Phenomenes en entier (masque de bits)."""
+    if "Phenomenes" not in df.columns:
+        return df
+    return df.assign(Phenomenes=phenomenes.masques(df["Phenomenes"]))
+
+
+def _lire_parquet(chemin: str) -> pd.DataFrame:
+    """Partition Parquet ; masques (ou textes des anciennes partitions) en catégorie canonique."""
+    df = pd.read_parquet(chemin)
+    if "Phenomenes" in df.columns:
+        df["Phenomenes"] = phenomenes.categoriser(df["Phenomenes"])
+    return df
+
+
+def calculer_diff(avant: pd.DataFrame, apres: pd.DataFrame):
+    """Compare deux états d'un même lot de relevés (colonne ``id``).
+
+    Renvoie (ajouts, modifications, ids supprimés) : les lignes sans id sont
+    des ajouts, les ids disparus des suppressions, les lignes dont au moins
+    une colonne a changé des modifications. Lève PhenomenesInconnus si un
+    phénomène saisi n'est pas dans PHENOMENES_OPTIONS.
+    """
+    if "Phenomenes" in apres.columns:
+        phenomenes.verifier(apres["Phenomenes"])   # un libellé mal saisi serait perdu en silence
+    apres = typer_releves(apres.drop(columns=["Ville"], errors="ignore").copy())
+    ajouts = apres[apres["id"].isna()].drop(columns=["id"])
+    gardes = apres[apres["id"].notna()].astype({"id": "int64"}).set_index("id")
+    ids_avant = avant["id"].astype("int64")
+    supprimes = sorted(set(ids_avant) - set(gardes.index))
+
+    ref = avant.set_index(ids_avant).reindex(gardes.index)
+    change = pd.Series(False, index=gardes.index)
+    for c in gardes.columns:
+        if c in ref.columns:
+            a, b = ref[c].astype(object), gardes[c].astype(object)
+            change |= ~(a.eq(b) | (a.isna() & b.isna()))
+    modifs = gardes[change].reset_index()
+    return ajouts, modifs, supprimes
+
+
+def _en_enregistrements(df: pd.DataFrame) -> list[dict]:
+    """Relevés au format stocké : dates en texte ISO, phénomènes en masque, mesures arrondies, NaN en None."""
+    df = _phenomenes_en_masques(df.reindex(columns=COLONNES_RELEVE))
+    df["Date_Heure"] = pd.to_datetime(df["Date_Heure"]).dt.strftime(_FORMAT_SQL)
+    # float32 → float64 arrondi : 25.3 et non 25.299999237060547
+    df[COLONNES_MESURES] = df[COLONNES_MESURES].astype("float64").round(4)
+    df = df.astype(object)
+    return df.where(df.notna(), None).to_dict("records")
+
+
+# ============================================================
+# JOURNAL DES CORRECTIONS
+# ============================================================
+# Une ligne par relevé touché : {"lot", "horodatage", "utilisateur", "plafond",
+# "operation", "id", "avant", "apres"}. Un lot regroupe les lignes d'une même
+# sauvegarde ; « plafond » est le plus grand id de la station avant le lot.
+# avant/apres : relevé entier (suppr : avant, ajout : apres) ou seules les
+# colonnes changées (modif).
+def _entrees_journal(avant: pd.DataFrame, modifs: pd.DataFrame, supprimes: list[int]) -> list[dict]:
+    """Lignes du journal des suppressions et modifications d'une correction (ajouts : voir _entrees_ajouts)."""
+    ref = avant.set_index(avant["id"].astype("int64"))
+    entrees = [{"operation": "suppr", "id": int(i), "avant": r, "apres": None}
+               for i, r in zip(supprimes, _en_enregistrements(ref.loc[supprimes]))]
+    ids = modifs["id"].astype("int64").tolist()
+    for i, a, b in zip(ids, _en_enregistrements(ref.loc[ids]), _en_enregistrements(modifs)):
+        colonnes = [c for c in COLONNES_RELEVE if a[c] != b[c]]
+        if colonnes:
+            entrees.append({"operation": "modif", "id": i,
+                            "avant": {c: a[c] for c in colonnes}, "apres": {c: b[c] for c in colonnes}})
+    return entrees
+
+
+def _json(valeur) -> str | None:
+    return None if valeur is None else json.dumps(valeur, ensure_ascii=False, separators=(",", ":"))
+
+
+def _depuis_json(texte: str | None):
+    return None if texte is None else json.loads(texte)
+
+
+def _entrees_ajouts(ids, ajouts: pd.DataFrame) -> list[dict]:
+    return [{"operation": "ajout", "id": int(i), "avant": None, "apres": r}
+            for i, r in zip(ids, _en_enregistrements(ajouts))]
+
+
+def _appliquer_journal(df: pd.DataFrame, entrees: list[dict], annuler: bool = False) -> pd.DataFrame:
+    """Rejoue des lignes du journal sur les relevés d'une station (ou les annule, de la plus récente à la plus ancienne).
+
+    Seuls les relevés touchés passent par des dictionnaires ; le reste de la
+    station est recopié tel quel.
+    """
+    if not entrees:
+        return df
+    base = df.set_index("id") if not df.empty else pd.DataFrame(columns=COLONNES_RELEVE)
+    touches: dict[int, dict | None] = {}
+    for e in (reversed(entrees) if annuler else entrees):
+        i = int(e["id"])
+        if i not in touches:
+            touches[i] = _en_enregistrements(base.loc[[i]])[0] if i in base.index else None
+        entier = "ajout" if annuler else "suppr"
+        if e["operation"] == "modif":
+            if touches[i] is not None:
+                touches[i] = {**touches[i], **(e["avant"] if annuler else e["apres"])}
+        elif e["operation"] == entier:
+            touches[i] = None
+        else:
+            touches[i] = dict(e["avant"] if annuler else e["apres"])
+    restes = df[~df["id"].isin(list(touches))] if not df.empty else df
+    nouveaux = pd.DataFrame([{"id": i, **r} for i, r in touches.items() if r is not None])
+    if nouveaux.empty:
+        return restes.reset_index(drop=True)
+    nouveaux = typer_releves(nouveaux.astype({"Date_Heure": "datetime64[ns]"}))
+    a_plat = {c: object for c in COLONNES_CATEGORIES}
+    df = pd.concat([restes.astype({c: t for c, t in a_plat.items() if c in restes}), nouveaux.astype(a_plat)],
+                   ignore_index=True)
+    return typer_releves(df).sort_values("id", ignore_index=True)
+
+
+def _resumer_journal(entrees: list[dict]) -> pd.DataFrame:
+    """Une ligne par lot : date, auteur et nombre de relevés ajoutés, modifiés, supprimés."""
+    colonnes = ["lot", "horodatage", "utilisateur", "ajout", "modif", "suppr"]
+    if not entrees:
+        return pd.DataFrame(columns=colonnes)
+    j = pd.DataFrame(entrees)
+    resume = (j.pivot_table(index=["lot", "horodatage", "utilisateur"], columns="operation",
+                            values="id", aggfunc="count", fill_value=0)
+              .reindex(columns=["ajout", "modif", "suppr"], fill_value=0).reset_index())
+    return resume[colonnes].sort_values("lot", ascending=False, ignore_index=True)
+
+
+def _bornes_periode(debut: date, fin: date) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """Période [debut, fin] en jours entiers, fin incluse."""
+    return pd.Timestamp(debut), pd.Timestamp(fin) + pd.Timedelta(days=1)
+
+
+def _assembler(morceaux: list[pd.DataFrame]) -> pd.DataFrame:
+    morceaux = [m for m in morceaux if not m.empty]
+    if not morceaux:
+        return pd.DataFrame()
+    df = pd.concat(morceaux, ignore_index=True)
+    # concat() repasse en objets les catégories qui diffèrent d'une station à l'autre
+    for col in COLONNES_CATEGORIES:
+        if all(col in m.columns for m in morceaux):
+            try:
+                df[col] = union_categoricals([m[col].astype("category") for m in morceaux])
+            except TypeError:
+                pass  # catégories de types différents : on garde la colonne telle quelle
+    return df.sort_values("Date_Heure", kind="stable", ignore_index=True)
+
+
+# ============================================================
+# INTERFACE COMMUNE
+# ============================================================
+class Depot:
+    """Opérations communes aux deux dépôts (voir DepotSQLite et DepotParquet)."""
+
+    def modifier_releves(self, ville: str, avant: pd.DataFrame, apres: pd.DataFrame,
+                         utilisateur: str = "") -> int:
+        """Applique les seules lignes ajoutées, modifiées ou supprimées ; renvoie leur nombre.
+
+        La correction est inscrite au journal (un lot, signé `utilisateur`) ;
+        un phénomène inconnu la refuse en entier (PhenomenesInconnus).
+        """
+        ajouts, modifs, supprimes = calculer_diff(avant, apres)
+        entrees = _entrees_journal(avant, modifs, supprimes)
+        if ajouts.empty and not entrees:
+            return 0
+        self._appliquer(ville, ajouts, modifs, supprimes, entrees, utilisateur)
+        return len(ajouts) + len(entrees)
+
+    def historique(self, ville: str) -> pd.DataFrame:
+        """Lots de corrections de la station, du plus récent au plus ancien."""
+        return _resumer_journal(self._lire_journal(ville))
+
+    def reconstituer(self, ville: str, lot: int) -> pd.DataFrame:
+        """Relevés de la station tels qu'ils étaient juste avant le lot de corrections `lot`.
+
+        Les corrections des lots suivants sont annulées et les relevés saisis
+        depuis (id au-delà du plafond du lot) écartés.
+        """
+        entrees = [e for e in self._lire_journal(ville) if e["lot"] >= lot]
+        df = self.lire_station(ville)
+        if not entrees:
+            return df
+        df = _appliquer_journal(df, entrees, annuler=True)
+        if not df.empty:
+            df = df[df["id"] <= entrees[0]["plafond"]]
+        return df.sort_values(["Date_Heure", "id"], ignore_index=True)
+
+    def compacter(self, ville: str | None = None) -> int:
+        """Intègre au stockage de base les corrections encore en attente ; renvoie leur nombre."""
+        return 0
+
+    def exporter_csv(self, ville: str) -> bytes:
+        df = self.lire_station(ville).drop(columns=["id"], errors="ignore")
+        df["Date_Heure"] = df["Date_Heure"].dt.strftime("%Y-%m-%d %H:%M")
+        return df.to_csv(index=False).encode()
+
+    def _utilisateurs_initiaux(self) -> pd.DataFrame:
+        if os.path.exists(FICHIER_UTILISATEURS):
+            return pd.read_csv(FICHIER_UTILISATEURS)
+        return pd.DataFrame({
+            "identifiant":  ["admin"],
+            "mot_de_passe": [hash_password("admin123")],
+            "ville":        ["Abidjan"],
+            "role":         ["admin"],
+            "email":        ["admin@sodexam.ci"],
+        })
+
+
+_depot: Depot | None = None
+_verrou_depot = threading.Lock()
+
+
+def depot(forcer_migration: bool = False) -> Depot:
+    """Dépôt actif du processus (créé au premier appel).
+
+    `forcer_migration` (migrer_donnees.py --forcer) : une ancienne base SQLite
+    est convertie à l'ouverture même si des phénomènes inconnus s'y trouvent.
+    """
+    global _depot
+    with _verrou_depot:
+        if _depot is None:
+            if os.environ.get("SODEXAM_STOCKAGE", "sqlite") == "parquet":
+                _depot = DepotParquet()
+            else:
+                _depot = DepotSQLite(forcer_migration=forcer_migration)
+        return _depot
+
+
+# ============================================================
+# DÉPÔT SQLITE
+# ============================================================
+_TABLE_RELEVES = """
+CREATE TABLE IF NOT EXISTS releves (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,   -- jamais réutilisé (voir _plafond)
+    Ville             TEXT NOT NULL,
+    Date_Heure        TEXT NOT NULL,          -- 'AAAA-MM-JJ HH:MM:SS'
+    "Pluie (mm)"      REAL NOT NULL DEFAULT 0,
+    "Temperature (C)" REAL,
+    "Humidite (%)"    REAL,
+    "Vent (km/h)"     REAL,
+    Phenomenes        INTEGER NOT NULL DEFAULT 0,   -- masque de bits (phenomenes.py)
+    Obs               TEXT,
+    Saisi_par         TEXT
+)"""
+# Index des requêtes par station et période, et garde-fou contre les doublons
+_INDEX_RELEVES = "CREATE UNIQUE INDEX IF NOT EXISTS idx_releves_ville_date ON releves (Ville, Date_Heure)"
+
+_SCHEMA_SQLITE = f"""{_TABLE_RELEVES};
+{_INDEX_RELEVES};
+
+CREATE TABLE IF NOT EXISTS stations (
+    Ville   TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,      -- incrémentée à chaque écriture
+    modifs  INTEGER NOT NULL DEFAULT 0       -- incrémentée par les corrections/suppressions
+);
+
+-- Journal des corrections, en ajout seul (voir _entrees_journal) ; avant/apres en JSON
+CREATE TABLE IF NOT EXISTS corrections (
+    n           INTEGER PRIMARY KEY,
+    Ville       TEXT NOT NULL,
+    lot         INTEGER NOT NULL,
+    horodatage  TEXT NOT NULL,
+    utilisateur TEXT NOT NULL DEFAULT '',
+    plafond     INTEGER NOT NULL,
+    operation   TEXT NOT NULL,                -- 'ajout', 'modif' ou 'suppr'
+    id          INTEGER NOT NULL,
+    avant       TEXT,
+    apres       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_corrections_ville_lot ON corrections (Ville, lot);
+
+CREATE TABLE IF NOT EXISTS utilisateurs (
+    identifiant  TEXT PRIMARY KEY,
+    mot_de_passe TEXT NOT NULL,
+    ville        TEXT,
+    role         TEXT NOT NULL DEFAULT 'agent',
+    email        TEXT
+);
+"""
+
+_COLS_SQL = ", ".join(f'"{c}"' for c in COLONNES_RELEVE)
+_INSERT_SQL = (f"INTO releves (Ville, {_COLS_SQL}) "
+               f"VALUES (?, {', '.join('?' * len(COLONNES_RELEVE))})")
+
+
+def _valeurs_sql(ville: str, df: pd.DataFrame) -> list[tuple]:
+    """Lignes prêtes pour executemany : (Ville, colonnes…), dates en texte ISO, NaN en NULL."""
+    return [(ville, *r.values()) for r in _en_enregistrements(df)]
+
+
+class DepotSQLite(Depot):
+    """Relevés et comptes dans une base SQLite (WAL, une connexion par thread)."""
+
+    def __init__(self, chemin: str = BASE_SQLITE, forcer_migration: bool = False):
+        self.chemin = chemin
+        self._local = threading.local()
+        self.migrer_phenomenes(forcer_migration)
+        if self._cx().execute("SELECT COUNT(*) FROM utilisateurs").fetchone()[0] == 0:
+            for _, u in self._utilisateurs_initiaux().iterrows():
+                self.enregistrer_utilisateur(**{c: u.get(c, "") for c in COLONNES_UTILISATEUR})
+
+    def _cx(self) -> sqlite3.Connection:
+        cx = getattr(self._local, "cx", None)
+        if cx is None:
+            cx = sqlite3.connect(self.chemin, timeout=10, isolation_level=None)
+            cx.execute("PRAGMA journal_mode=WAL")
+            cx.execute("PRAGMA synchronous=NORMAL")
+            cx.executescript(_SCHEMA_SQLITE)
+            self._local.cx = cx
+        return cx
+
+    def migrer_phenomenes(self, forcer: bool = False) -> int:
+        """Ancienne base : table des relevés recopiée avec le schéma courant.
+
+        Phenomenes en texte est converti en masque de bits (renvoie le nombre de
+        relevés convertis) ; une table sans AUTOINCREMENT est recopiée telle quelle,
+        ids compris. Des libellés inconnus annulent la conversion (PhenomenesInconnus)
+        sauf si `forcer` : ils sont alors abandonnés.
+        """
+        cx = self._cx()
+        types = {col: typ for _, col, typ, *_ in cx.execute("PRAGMA table_info(releves)")}
+        texte = types.get("Phenomenes", "").upper() != "INTEGER"
+        schema = cx.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'releves'").fetchone()[0]
+        if not texte and "AUTOINCREMENT" in schema.upper():
+            return 0
+        if texte and not forcer:
+            phenomenes.verifier([v for v, in cx.execute('SELECT DISTINCT "Phenomenes" FROM releves')])
+        cx.create_function("masque_phenomenes", 1, phenomenes.masque, deterministic=True)
+        colonnes = ", ".join(f'"{c}"' for c in ["id", "Ville"] + COLONNES_RELEVE)
+        selection = colonnes.replace('"Phenomenes"', 'masque_phenomenes("Phenomenes")') if texte else colonnes
+        with self._transaction() as cx:
+            cx.execute("ALTER TABLE releves RENAME TO releves_texte")
+            cx.execute(_TABLE_RELEVES)
+            cx.execute(f"INSERT INTO releves ({colonnes}) SELECT {selection} FROM releves_texte")
+            nb = cx.execute("SELECT changes()").fetchone()[0]
+            cx.execute("DROP TABLE releves_texte")
+            cx.execute(_INDEX_RELEVES)
+            # Les chargeurs en mémoire relisent toutes les stations
+            cx.execute("UPDATE stations SET version = version + 1, modifs = modifs + 1")
+        return nb if texte else 0
+
+    @contextmanager
+    def _transaction(self):
+        cx = self._cx()
+        # IMMEDIATE : le verrou d'écriture est pris d'emblée, pas de conflit en cours de route
+        cx.execute("BEGIN IMMEDIATE")
+        try:
+            yield cx
+        except BaseException:
+            cx.execute("ROLLBACK")
+            raise
+        cx.execute("COMMIT")
+
+    def _requete(self, where: str, params: tuple) -> pd.DataFrame:
+        df = pd.read_sql_query(
+            f"SELECT id, Ville, {_COLS_SQL} FROM releves WHERE {where} ORDER BY Date_Heure, id",
+            self._cx(), params=params,
+        )
+        df["Date_Heure"] = pd.to_datetime(df["Date_Heure"], format=_FORMAT_SQL)
+        return typer_releves(df)
+
+    @staticmethod
+    def _marquer(cx: sqlite3.Connection, ville: str, correction: bool) -> None:
+        cx.execute(
+            "INSERT INTO stations (Ville, version, modifs) VALUES (?, 1, ?) "
+            "ON CONFLICT(Ville) DO UPDATE SET version = version + 1, modifs = modifs + excluded.modifs",
+            (ville, int(correction)),
+        )
+
+    # ---------- Lecture ----------
+    def lister_stations(self) -> list[str]:
+        return [r[0] for r in self._cx().execute("SELECT Ville FROM stations ORDER BY Ville")]
+
+    def station_existe(self, ville: str) -> bool:
+        return self._cx().execute(
+            "SELECT 1 FROM releves WHERE Ville = ? LIMIT 1", (ville,)).fetchone() is not None
+
+    def lire_station(self, ville: str) -> pd.DataFrame:
+        return self._requete("Ville = ?", (ville,)).drop(columns=["Ville"])
+
+    def lire_periode(self, villes: list[str], debut: date, fin: date) -> pd.DataFrame:
+        d0, d1 = _bornes_periode(debut, fin)
+        marques = ", ".join("?" * len(villes))
+        return self._requete(
+            f"Ville IN ({marques}) AND Date_Heure >= ? AND Date_Heure < ?",
+            (*villes, d0.strftime(_FORMAT_SQL), d1.strftime(_FORMAT_SQL)),
+        )
+
+    def bornes_station(self, ville: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        mini, maxi = self._cx().execute(
+            "SELECT MIN(Date_Heure), MAX(Date_Heure) FROM releves WHERE Ville = ?", (ville,)
+        ).fetchone()
+        return (pd.Timestamp(mini), pd.Timestamp(maxi)) if mini else None
+
+    # ---------- Écriture ----------
+    def ajouter_releves(self, ville: str, df: pd.DataFrame) -> None:
+        try:
+            with self._transaction() as cx:
+                cx.executemany("INSERT " + _INSERT_SQL, _valeurs_sql(ville, typer_releves(df.copy())))
+                self._marquer(cx, ville, correction=False)
+        except sqlite3.IntegrityError as e:
+            raise DoublonReleve(f"Un relevé existe déjà pour {ville} à cette date et heure.") from e
+
+    def importer_releves(self, ville: str, df: pd.DataFrame) -> int:
+        """Ajout en masse ; les relevés déjà présents (Ville, Date_Heure) sont ignorés."""
+        with self._transaction() as cx:
+            avant = cx.total_changes
+            cx.executemany("INSERT OR IGNORE " + _INSERT_SQL,
+                           _valeurs_sql(ville, typer_releves(df.copy())))
+            nb = cx.total_changes - avant
+            if nb:
+                self._marquer(cx, ville, correction=False)
+        return nb
+
+    def _appliquer(self, ville, ajouts, modifs, supprimes, entrees, utilisateur) -> None:
+        affectation = ", ".join(f'"{c}" = ?' for c in COLONNES_RELEVE)
+        try:
+            with self._transaction() as cx:
+                plafond = self._plafond(cx, ville)
+                cx.executemany("DELETE FROM releves WHERE Ville = ? AND id = ?",
+                               [(ville, int(i)) for i in supprimes])
+                cx.executemany(
+                    f"UPDATE releves SET {affectation} WHERE Ville = ? AND id = ?",
+                    [(*l[1:], ville, int(i)) for l, i in zip(_valeurs_sql(ville, modifs), modifs["id"])],
+                )
+                # Un INSERT par ajout : son id (lastrowid) est inscrit au journal
+                ids = [cx.execute("INSERT " + _INSERT_SQL, l).lastrowid for l in _valeurs_sql(ville, ajouts)]
+                self._journaliser(cx, ville, plafond, entrees + _entrees_ajouts(ids, ajouts), utilisateur)
+                self._marquer(cx, ville, correction=True)
+        except sqlite3.IntegrityError as e:
+            raise DoublonReleve(f"Deux relevés de {ville} auraient la même date et heure.") from e
+
+    def supprimer_station(self, ville: str, utilisateur: str = "") -> None:
+        """Vide la station ; ses relevés restent au journal (lot de suppressions)."""
+        with self._transaction() as cx:
+            df = self._requete("Ville = ?", (ville,))
+            entrees = [{"operation": "suppr", "id": int(i), "avant": r, "apres": None}
+                       for i, r in zip(df["id"], _en_enregistrements(df))]
+            self._journaliser(cx, ville, self._plafond(cx, ville), entrees, utilisateur)
+            cx.execute("DELETE FROM releves WHERE Ville = ?", (ville,))
+            cx.execute("DELETE FROM stations WHERE Ville = ?", (ville,))
+
+    @staticmethod
+    def _plafond(cx: sqlite3.Connection, ville: str) -> int:
+        # Ids communs à toutes les stations : le plus grand id de la table (lu sur la clé
+        # primaire) borne aussi ceux de `ville`, et tout relevé saisi ensuite le dépasse
+        # (AUTOINCREMENT : l'id d'un relevé supprimé n'est jamais réattribué)
+        return cx.execute("SELECT COALESCE(MAX(id), 0) FROM releves").fetchone()[0]
+
+    @staticmethod
+    def _journaliser(cx: sqlite3.Connection, ville: str, plafond: int, entrees: list[dict],
+                     utilisateur: str) -> None:
+        if not entrees:
+            return
+        lot = cx.execute("SELECT COALESCE(MAX(lot), 0) + 1 FROM corrections WHERE Ville = ?",
+                         (ville,)).fetchone()[0]
+        horodatage = pd.Timestamp.now().strftime(_FORMAT_SQL)
+        cx.executemany(
+            "INSERT INTO corrections (Ville, lot, horodatage, utilisateur, plafond, operation, id, avant, apres) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(ville, lot, horodatage, utilisateur or "", plafond, e["operation"], e["id"],
+              _json(e["avant"]), _json(e["apres"])) for e in entrees],
+        )
+
+    def _lire_journal(self, ville: str) -> list[dict]:
+        curseur = self._cx().execute(
+            "SELECT lot, horodatage, utilisateur, plafond, operation, id, avant, apres "
+            "FROM corrections WHERE Ville = ? ORDER BY n", (ville,))
+        noms = [d[0] for d in curseur.description]
+        return [{**dict(zip(noms, l)), "avant": _depuis_json(l[6]), "apres": _depuis_json(l[7])}
+                for l in curseur]
+
+    # ---------- Comptes ----------
+    def trouver_utilisateur(self, identifiant: str) -> dict | None:
+        ligne = self._cx().execute(
+            f"SELECT {', '.join(COLONNES_UTILISATEUR)} FROM utilisateurs WHERE identifiant = ?",
+            (identifiant,),
+        ).fetchone()
+        return dict(zip(COLONNES_UTILISATEUR, ligne)) if ligne else None
+
+    def lister_utilisateurs(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            f"SELECT {', '.join(COLONNES_UTILISATEUR)} FROM utilisateurs ORDER BY rowid", self._cx())
+
+    def enregistrer_utilisateur(self, identifiant, mot_de_passe, ville, role, email) -> None:
+        with self._transaction() as cx:
+            cx.execute(
+                "INSERT INTO utilisateurs VALUES (?, ?, ?, ?, ?) ON CONFLICT(identifiant) DO UPDATE SET "
+                "mot_de_passe = excluded.mot_de_passe, ville = excluded.ville, "
+                "role = excluded.role, email = excluded.email",
+                (str(identifiant), str(mot_de_passe), ville, role or "agent",
+                 None if pd.isna(email) else email),
+            )
+
+    def supprimer_utilisateur(self, identifiant: str) -> None:
+        with self._transaction() as cx:
+            cx.execute("DELETE FROM utilisateurs WHERE identifiant = ?", (identifiant,))
+
+    def creer_chargeur(self) -> "ChargeurSQLite":
+        return ChargeurSQLite(self)
+
+
+@dataclass
+class _EtatStation:
+    version: int
+    modifs: int
+    dernier_id: int
+    df: pd.DataFrame = field(repr=False)
+
+
+class ChargeurSQLite:
+    """Relevés de toutes les stations, tenus en mémoire et mis à jour au fil de l'eau.
+
+    Chaque station est suivie par ses compteurs de la table ``stations`` : une
+    station inchangée n'est pas relue, une station qui n'a reçu que des ajouts
+    n'est lue qu'au-delà de son dernier id connu, une station corrigée est
+    relue entièrement (par l'index Ville, Date_Heure).
+    Les cumuls de ``agregats`` et le moteur ``alertes`` suivent le même chemin :
+    ajouts intégrés (évalués relevé par relevé), station corrigée recalculée.
+    Le DataFrame renvoyé est partagé : ne pas le modifier en place.
+    """
+
+    def __init__(self, depot_sqlite: DepotSQLite):
+        self.depot = depot_sqlite
+        self.version = 0
+        self.agregats = Agregats()
+        self.alertes = MoteurAlertes()
+        self._verrou = threading.Lock()
+        self._stations: dict[str, _EtatStation] = {}
+        self._df = pd.DataFrame()
+
+    def charger(self) -> pd.DataFrame:
+        with self._verrou:
+            if self._rafraichir():
+                self._df = _assembler([e.df for e in self._stations.values()])
+                self.version += 1
+            return self._df
+
+    def invalider(self, ville: str | None = None) -> None:
+        """Force la relecture complète d'une station (ou de toutes)."""
+        with self._verrou:
+            for v in (list(self._stations) if ville is None else [ville]):
+                self._stations.pop(v, None)
+                self.agregats.retirer(v)
+                self.alertes.retirer(v)
+            self._rafraichir()
+            self._df = _assembler([e.df for e in self._stations.values()])
+            self.version += 1
+
+    def _rafraichir(self) -> bool:
+        compteurs = {
+            v: (version, modifs) for v, version, modifs
+            in self.depot._cx().execute("SELECT Ville, version, modifs FROM stations")
+        }
+        change = False
+        for ville, (version, modifs) in compteurs.items():
+            etat = self._stations.get(ville)
+            if etat and etat.version == version:
+                continue
+            if etat and etat.modifs == modifs:
+                nouveaux = self.depot._requete("Ville = ? AND id > ?", (ville, etat.dernier_id))
+                etat.df = pd.concat([etat.df, nouveaux], ignore_index=True)
+                self.agregats.integrer(ville, nouveaux)
+                self.alertes.integrer(ville, nouveaux)
+            else:
+                etat = self._stations[ville] = _EtatStation(
+                    version, modifs, 0, self.depot._requete("Ville = ?", (ville,)))
+                self.agregats.recalculer(ville, etat.df)
+                self.alertes.recalculer(ville, etat.df)
+            etat.version, etat.modifs = version, modifs
+            etat.dernier_id = int(etat.df["id"].max()) if not etat.df.empty else 0
+            change = True
+        for ville in set(self._stations) - set(compteurs):
+            del self._stations[ville]
+            self.agregats.retirer(ville)
+            self.alertes.retirer(ville)
+            change = True
+        return change
+
+
+# ============================================================
+# DÉPÔT PARQUET (une partition par station)
+# ============================================================
+_SUFFIXE_ATTENTE = ".journal.ndjson"       # corrections pas encore intégrées à la partition
+_SUFFIXE_HISTORIQUE = ".historique.ndjson"  # corrections intégrées, conservées pour l'historique
+# Nombre de lignes en attente au-delà duquel une correction déclenche le compactage
+SEUIL_COMPACTAGE = int(os.environ.get("SODEXAM_SEUIL_COMPACTAGE", "5000"))
+
+
+def _lire_ndjson(chemin: str) -> list[dict]:
+    if not os.path.exists(chemin):
+        return []
+    with open(chemin, encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+
+def _dernier_lot(chemin: str) -> int:
+    """Numéro de lot de la dernière ligne complète d'un journal (lecture de la fin du fichier)."""
+    if not os.path.exists(chemin):
+        return 0
+    with open(chemin, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        taille = f.tell()
+        f.seek(max(0, taille - 65536))
+        lignes = [l for l in f.read().splitlines() if l.strip()]
+    for l in reversed(lignes):
+        try:
+            return json.loads(l)["lot"]
+        except ValueError:
+            continue   # ligne tronquée (début de la fenêtre lue, ou écriture interrompue)
+    return 0
+
+
+class DepotParquet(Depot):
+    """Une partition Parquet typée par station ; comptes dans utilisateurs.csv.
+
+    Les corrections ne réécrivent pas la partition : elles sont ajoutées au
+    journal en attente de la station (<Ville>.journal.ndjson), rejoué à la
+    lecture. Le compactage intègre ce journal à la partition et le verse dans
+    l'historique (<Ville>.historique.ndjson).
+    """
+
+    def __init__(self, dossier: str = DOSSIER_DONNEES):
+        self.dossier = dossier
+        self._verrou = threading.RLock()
+
+    def chemin_station(self, ville: str, ext: str = ".parquet") -> str:
+        return os.path.join(self.dossier, f"{ville}{ext}")
+
+    # ---------- Lecture ----------
+    def lister_stations(self) -> list[str]:
+        return sorted({
+            os.path.splitext(f)[0] for f in os.listdir(self.dossier)
+            if f.endswith((".parquet", ".csv"))
+        })
+
+    def station_existe(self, ville: str) -> bool:
+        return (os.path.exists(self.chemin_station(ville))
+                or os.path.exists(self.chemin_station(ville, ".csv")))
+
+    def lire_station(self, ville: str) -> pd.DataFrame:
+        """Relevés typés d'une station (sans colonne Ville), dans l'ordre de saisie."""
+        chemin = self.chemin_station(ville)
+        if os.path.exists(chemin):
+            df = _lire_parquet(chemin)
+        elif os.path.exists(self.chemin_station(ville, ".csv")):
+            df = typer_releves(pd.read_csv(self.chemin_station(ville, ".csv")))
+        else:
+            return pd.DataFrame()
+        if "id" not in df.columns:
+            df.insert(0, "id", range(1, len(df) + 1))
+        return _appliquer_journal(df.reset_index(drop=True), _lire_ndjson(self.chemin_station(ville, _SUFFIXE_ATTENTE)))
+
+    def lire_periode(self, villes: list[str], debut: date, fin: date) -> pd.DataFrame:
+        d0, d1 = _bornes_periode(debut, fin)
+        morceaux = []
+        for v in villes:
+            df = self.lire_station(v)
+            if not df.empty:
+                df["Ville"] = v
+                morceaux.append(df[(df["Date_Heure"] >= d0) & (df["Date_Heure"] < d1)])
+        return _assembler(morceaux)
+
+    def bornes_station(self, ville: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        df = self.lire_station(ville)
+        return (df["Date_Heure"].min(), df["Date_Heure"].max()) if not df.empty else None
+
+    # ---------- Écriture ----------
+    def _ecrire(self, ville: str, df: pd.DataFrame) -> None:
+        """Réécrit la partition d'une station (écriture atomique)."""
+        df = typer_releves(df.drop(columns=["Ville"], errors="ignore").copy())
+        if df["Date_Heure"].duplicated().any():
+            raise DoublonReleve(f"Deux relevés de {ville} auraient la même date et heure.")
+        chemin = self.chemin_station(ville)
+        _phenomenes_en_masques(df).to_parquet(chemin + ".tmp", index=False)
+        os.replace(chemin + ".tmp", chemin)
+        # L'ancien CSV est conservé à part une fois son contenu repris
+        chemin_csv = self.chemin_station(ville, ".csv")
+        if os.path.exists(chemin_csv):
+            os.replace(chemin_csv, chemin_csv + ".migre")
+        # `df` vient de lire_station() : les corrections en attente y sont intégrées
+        self._archiver(ville)
+
+    def _archiver(self, ville: str) -> int:
+        """Verse le journal en attente dans l'historique ; renvoie le nombre de lignes versées.
+
+        Une interruption entre les deux étapes laisse au pire des lignes en
+        double, écartées à la lecture ; les rejouer sur la partition ne change rien.
+        """
+        attente = self.chemin_station(ville, _SUFFIXE_ATTENTE)
+        if not os.path.exists(attente):
+            return 0
+        with open(attente, "rb") as f:
+            contenu = f.read()
+        with open(self.chemin_station(ville, _SUFFIXE_HISTORIQUE), "ab") as f:
+            f.write(contenu)
+        os.remove(attente)
+        return contenu.count(b"\n")
+
+    def _fusionner(self, existant: pd.DataFrame, nouveaux: pd.DataFrame) -> pd.DataFrame:
+        """Ajoute des relevés à une station en leur attribuant les ids suivants."""
+        dernier = int(existant["id"].max()) if not existant.empty else 0
+        nouveaux = typer_releves(nouveaux.drop(columns=["id"], errors="ignore").copy())
+        nouveaux.insert(0, "id", range(dernier + 1, dernier + 1 + len(nouveaux)))
+        if existant.empty:
+            return nouveaux
+        # Catégories repassées en objets pour que concat() accepte de nouvelles valeurs
+        a_plat = {c: object for c in COLONNES_CATEGORIES}
+        return pd.concat([existant.astype({c: t for c, t in a_plat.items() if c in existant}),
+                          nouveaux.astype({c: t for c, t in a_plat.items() if c in nouveaux})],
+                         ignore_index=True)
+
+    def ajouter_releves(self, ville: str, df: pd.DataFrame) -> None:
+        with self._verrou:
+            existant = self.lire_station(ville)
+            if not existant.empty and typer_releves(df.copy())["Date_Heure"].isin(existant["Date_Heure"]).any():
+                raise DoublonReleve(f"Un relevé existe déjà pour {ville} à cette date et heure.")
+            self._ecrire(ville, self._fusionner(existant, df))
+
+    def importer_releves(self, ville: str, df: pd.DataFrame) -> int:
+        """Ajout en masse ; les relevés déjà présents (Ville, Date_Heure) sont ignorés."""
+        with self._verrou:
+            existant = self.lire_station(ville)
+            df = typer_releves(df.copy()).drop_duplicates("Date_Heure")
+            if not existant.empty:
+                df = df[~df["Date_Heure"].isin(existant["Date_Heure"])]
+            if not df.empty:
+                self._ecrire(ville, self._fusionner(existant, df))
+            return len(df)
+
+    def _cles(self, ville: str) -> pd.DataFrame:
+        """(id, Date_Heure) de la station, corrections en attente comprises, sans lire les mesures."""
+        chemin = self.chemin_station(ville)
+        if not os.path.exists(chemin):
+            return self.lire_station(ville).reindex(columns=["id", "Date_Heure"])
+        df = pd.read_parquet(chemin, columns=["id", "Date_Heure"])
+        df = _appliquer_journal(df, _lire_ndjson(self.chemin_station(ville, _SUFFIXE_ATTENTE)))
+        return df[["id", "Date_Heure"]]
+
+    def _appliquer(self, ville, ajouts, modifs, supprimes, entrees, utilisateur) -> None:
+        """Vérifie les dates puis ajoute la correction au journal en attente (coût : lignes touchées)."""
+        with self._verrou:
+            if not os.path.exists(self.chemin_station(ville)) and self.station_existe(ville):
+                self.convertir_csv(ville)   # le journal se rejoue sur une partition Parquet
+            cles = self._cles(ville)
+            dates = cles.set_index("id")["Date_Heure"].drop(supprimes, errors="ignore")
+            if not modifs.empty:
+                m = modifs.set_index("id")["Date_Heure"]
+                dates.loc[m.index.intersection(dates.index)] = m
+            if pd.concat([dates, ajouts["Date_Heure"]]).duplicated().any():
+                raise DoublonReleve(f"Deux relevés de {ville} auraient la même date et heure.")
+            plafond = int(cles["id"].max()) if not cles.empty else 0
+            ids = range(plafond + 1, plafond + 1 + len(ajouts))
+            entrees = entrees + _entrees_ajouts(ids, ajouts)
+            attente = self.chemin_station(ville, _SUFFIXE_ATTENTE)
+            lot = max(_dernier_lot(attente), _dernier_lot(self.chemin_station(ville, _SUFFIXE_HISTORIQUE))) + 1
+            entete = {"lot": lot, "horodatage": pd.Timestamp.now().strftime(_FORMAT_SQL),
+                      "utilisateur": utilisateur or "", "plafond": plafond}
+            with open(attente, "a", encoding="utf-8") as f:
+                f.writelines(_json({**entete, **e}) + "\n" for e in entrees)
+            if self._nb_en_attente(ville) > SEUIL_COMPACTAGE:
+                self.compacter(ville)
+
+    def _nb_en_attente(self, ville: str) -> int:
+        chemin = self.chemin_station(ville, _SUFFIXE_ATTENTE)
+        if not os.path.exists(chemin):
+            return 0
+        with open(chemin, "rb") as f:
+            return sum(1 for _ in f)
+
+    def compacter(self, ville: str | None = None) -> int:
+        """Réécrit les partitions qui ont des corrections en attente ; renvoie le nombre de lignes intégrées."""
+        total = 0
+        for v in (self.lister_stations() if ville is None else [ville]):
+            with self._verrou:
+                nb = self._nb_en_attente(v)
+                if nb:
+                    self._ecrire(v, self.lire_station(v))   # _ecrire() archive le journal intégré
+                    total += nb
+        return total
+
+    def _lire_journal(self, ville: str) -> list[dict]:
+        entrees = (_lire_ndjson(self.chemin_station(ville, _SUFFIXE_HISTORIQUE))
+                   + _lire_ndjson(self.chemin_station(ville, _SUFFIXE_ATTENTE)))
+        vus, uniques = set(), []
+        for e in entrees:
+            cle = (e["lot"], e["id"], e["operation"])
+            if cle not in vus:
+                vus.add(cle)
+                uniques.append(e)
+        return uniques
+
+    def migrer_phenomenes(self, forcer: bool = False) -> int:
+        """Réécrit les partitions dont Phenomenes est encore en texte ; renvoie le nombre de relevés.
+
+        Des libellés inconnus annulent la migration avant toute réécriture
+        (PhenomenesInconnus) sauf si `forcer` : ils sont alors abandonnés.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        a_migrer = []
+        for ville in self.lister_stations():
+            chemin = self.chemin_station(ville)
+            if not os.path.exists(chemin):
+                continue   # ancien CSV : converti (avec ses phénomènes) par convertir_csv
+            schema = pq.read_schema(chemin)
+            if "Phenomenes" in schema.names and pa.types.is_integer(schema.field("Phenomenes").type):
+                continue
+            a_migrer.append(ville)
+        if not forcer:
+            noms = set()
+            for ville in a_migrer:
+                if "Phenomenes" in pq.read_schema(self.chemin_station(ville)).names:
+                    colonne = pq.read_table(self.chemin_station(ville), columns=["Phenomenes"]).column(0)
+                    noms.update(phenomenes.inconnus(colonne.unique().to_pylist()))
+            if noms:
+                raise phenomenes.PhenomenesInconnus(sorted(noms))
+        total = 0
+        for ville in a_migrer:
+            with self._verrou:
+                df = self.lire_station(ville)
+                self._ecrire(ville, df)
+            total += len(df)
+        return total
+
+    def convertir_csv(self, ville: str) -> int:
+        """Réécrit en Parquet une station encore au format CSV."""
+        with self._verrou:
+            df = self.lire_station(ville)
+            self._ecrire(ville, df)
+            return len(df)
+
+    def supprimer_station(self, ville: str, utilisateur: str = "") -> None:
+        """Vide la station ; ses relevés restent dans l'historique (lot de suppressions)."""
+        with self._verrou:
+            df = self.lire_station(ville)
+            if not df.empty:
+                entrees = [{"operation": "suppr", "id": int(i), "avant": r, "apres": None}
+                           for i, r in zip(df["id"], _en_enregistrements(df))]
+                self._appliquer(ville, df.iloc[:0], df.iloc[:0], [], entrees, utilisateur)
+                self._archiver(ville)
+            for ext in (".parquet", ".csv"):
+                if os.path.exists(self.chemin_station(ville, ext)):
+                    os.remove(self.chemin_station(ville, ext))
+
+    # ---------- Comptes ----------
+    def lister_utilisateurs(self) -> pd.DataFrame:
+        if not os.path.exists(FICHIER_UTILISATEURS):
+            self._utilisateurs_initiaux().to_csv(FICHIER_UTILISATEURS, index=False)
+        return pd.read_csv(FICHIER_UTILISATEURS)
+
+    def trouver_utilisateur(self, identifiant: str) -> dict | None:
+        u_df = self.lister_utilisateurs()
+        ligne = u_df[u_df["identifiant"].astype(str) == identifiant]
+        return ligne.iloc[0].to_dict() if not ligne.empty else None
+
+    def enregistrer_utilisateur(self, identifiant, mot_de_passe, ville, role, email) -> None:
+        u_df = self.lister_utilisateurs()
+        new_row = pd.DataFrame({"identifiant": [identifiant], "mot_de_passe": [mot_de_passe],
+                                "ville": [ville], "role": [role], "email": [email]})
+        u_df = pd.concat([u_df[u_df["identifiant"] != identifiant], new_row], ignore_index=True)
+        u_df.to_csv(FICHIER_UTILISATEURS, index=False)
+
+    def supprimer_utilisateur(self, identifiant: str) -> None:
+        u_df = self.lister_utilisateurs()
+        u_df[u_df["identifiant"] != identifiant].to_csv(FICHIER_UTILISATEURS, index=False)
+
+    def creer_chargeur(self) -> "ChargeurIncremental":
+        return ChargeurIncremental(self.dossier)
+
+
+# ============================================================
+# CHARGEUR PARTAGÉ (dépôt Parquet)
+# ============================================================
+@dataclass
+class _EtatPartition:
+    chemin: str
+    taille: int
+    mtime_ns: int
+    df: pd.DataFrame = field(repr=False)
+    journal: int = 0             # taille du journal de corrections en attente rejoué sur `df`
+    # Suivi de lecture des anciens CSV, complétés par ajout en fin de fichier
+    position: int = 0            # octets déjà analysés (toujours en fin de ligne)
+    temoin: bytes = b""          # derniers octets avant `position`
+    colonnes: list = field(default_factory=list)
+
+
+class ChargeurIncremental:
+    """Relevés de toutes les stations, tenus en mémoire et mis à jour au fil de l'eau.
+
+    Chaque partition est suivie par sa taille et sa date de modification, et
+    par la taille de son journal de corrections en attente : une
+    partition inchangée n'est pas relue, une partition Parquet modifiée est
+    relue seule, un ancien CSV complété n'est lu qu'à partir des octets ajoutés.
+    Les cumuls de ``agregats`` et les fenêtres de ``alertes`` sont recalculés
+    pour la seule station relue ; les lignes ajoutées à un CSV y sont intégrées.
+    Le DataFrame renvoyé est partagé : ne pas le modifier en place.
+    """
+
+    def __init__(self, dossier: str = DOSSIER_DONNEES):
+        self.dossier = dossier
+        self.version = 0
+        self.agregats = Agregats()
+        self.alertes = MoteurAlertes()
+        self._verrou = threading.Lock()
+        self._partitions: dict[str, _EtatPartition] = {}
+        self._df = pd.DataFrame()
+
+    def charger(self) -> pd.DataFrame:
+        with self._verrou:
+            if self._rafraichir():
+                self._df = _assembler([e.df for e in self._partitions.values()])
+                self.version += 1
+            return self._df
+
+    def invalider(self, ville: str | None = None) -> None:
+        """Force la relecture complète d'une station (ou de toutes)."""
+        with self._verrou:
+            for v in (list(self._partitions) if ville is None else [ville]):
+                self._partitions.pop(v, None)
+                self.agregats.retirer(v)
+                self.alertes.retirer(v)
+            self._rafraichir()
+            self._df = _assembler([e.df for e in self._partitions.values()])
+            self.version += 1
+
+    # ------------------------------------------------------------
+    def _fichiers(self) -> tuple[dict[str, os.DirEntry], dict[str, int]]:
+        """(partition de chaque station, taille de son journal en attente)."""
+        fichiers, journaux = {}, {}
+        for entree in os.scandir(self.dossier):
+            if entree.name.endswith(_SUFFIXE_ATTENTE):
+                journaux[entree.name[:-len(_SUFFIXE_ATTENTE)]] = entree.stat().st_size
+                continue
+            ville, ext = os.path.splitext(entree.name)
+            # Une partition Parquet remplace toujours l'ancien CSV de la même station
+            if ext == ".parquet" or (ext == ".csv" and ville not in fichiers):
+                fichiers[ville] = entree
+        return fichiers, journaux
+
+    def _rafraichir(self) -> bool:
+        change = False
+        fichiers, journaux = self._fichiers()
+        for ville, entree in fichiers.items():
+            st = entree.stat()
+            etat = self._partitions.get(ville)
+            journal = journaux.get(ville, 0)
+            if (etat and etat.chemin == entree.path and etat.journal == journal
+                    and etat.taille == st.st_size and etat.mtime_ns == st.st_mtime_ns):
+                continue
+            try:
+                if (etat and etat.chemin == entree.path and entree.name.endswith(".csv")
+                        and etat.journal == journal
+                        and st.st_size > etat.taille and self._lire_ajout_csv(ville, etat)):
+                    etat.taille, etat.mtime_ns = st.st_size, st.st_mtime_ns
+                else:
+                    self._partitions[ville] = self._lire_complet(ville, entree.path, st, journal)
+                    self.agregats.recalculer(ville, self._partitions[ville].df)
+                    self.alertes.recalculer(ville, self._partitions[ville].df)
+            except Exception:
+                self._partitions.pop(ville, None)
+                self.agregats.retirer(ville)
+                self.alertes.retirer(ville)
+            change = True
+        for ville in set(self._partitions) - set(fichiers):
+            del self._partitions[ville]
+            self.agregats.retirer(ville)
+            self.alertes.retirer(ville)
+            change = True
+        return change
+
+    def _lire_complet(self, ville: str, chemin: str, st, journal: int = 0) -> _EtatPartition:
+        if chemin.endswith(".parquet"):
+            df = _lire_parquet(chemin)
+            if journal:
+                df = _appliquer_journal(df, _lire_ndjson(os.path.join(self.dossier, ville + _SUFFIXE_ATTENTE)))
+            df["Ville"] = ville
+            return _EtatPartition(chemin=chemin, taille=st.st_size, mtime_ns=st.st_mtime_ns, df=df,
+                                  journal=journal)
+        with open(chemin, "rb") as f:
+            brut = f.read()
+        # Lecture complète : tout le fichier, dernière ligne comprise même sans saut de
+        # ligne final (CSV édité à la main ou exporté d'Excel) ; seule la lecture des
+        # ajouts attend la fin d'une ligne en cours d'écriture
+        fin = len(brut)
+        df = pd.read_csv(io.BytesIO(brut))
+        colonnes = list(df.columns)
+        if "id" not in colonnes:
+            # Mêmes ids que DepotParquet.lire_station : rang de la ligne dans le fichier
+            df.insert(0, "id", range(1, len(df) + 1))
+        df["Ville"] = ville
+        return _EtatPartition(
+            chemin=chemin, taille=st.st_size, mtime_ns=st.st_mtime_ns, df=typer_releves(df),
+            position=fin, temoin=brut[max(0, fin - _TAILLE_TEMOIN):fin], colonnes=colonnes,
+        )
+
+    def _lire_ajout_csv(self, ville: str, etat: _EtatPartition) -> bool:
+        """Lit les lignes ajoutées depuis la dernière lecture ; False si le fichier a été réécrit."""
+        with open(etat.chemin, "rb") as f:
+            f.seek(etat.position - len(etat.temoin))
+            if f.read(len(etat.temoin)) != etat.temoin:
+                return False
+            ajout = f.read()
+        fin = ajout.rfind(b"\n") + 1
+        if fin == 0:
+            return True   # ligne en cours d'écriture : on attend la suite
+        nouveau = pd.read_csv(io.BytesIO(ajout[:fin]), header=None, names=etat.colonnes)
+        if "id" not in etat.colonnes:
+            nouveau.insert(0, "id", range(len(etat.df) + 1, len(etat.df) + 1 + len(nouveau)))
+        nouveau["Ville"] = ville
+        nouveau = typer_releves(nouveau)
+        etat.df = pd.concat([etat.df, nouveau], ignore_index=True)
+        self.agregats.integrer(ville, nouveau)
+        self.alertes.integrer(ville, nouveau)
+        etat.temoin = (etat.temoin + ajout[:fin])[-_TAILLE_TEMOIN:]
+        etat.position += fin
+        return True
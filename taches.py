@@ -0,0 +1,262 @@
+# === CONTENU DU FICHIER taches.py ===
+"""File de tâches locale : rapports PDF, archives ZIP et envoi par e-mail.
+
+Les tâches tournent dans un pool de threads, hors du script Streamlit ;
+la page interroge leur état sans attendre. L'état est persisté dans
+SODEXAM_TACHES/etat.json (``Taches`` par défaut) et les PDF dans le cache
+partagé des rapports (rapports.py) : une tâche interrompue par un redémarrage
+est relancée au démarrage suivant, et un PDF déjà produit avec les mêmes
+données et paramètres est repris tel quel, y compris pour l'envoi.
+
+Une tâche est identifiée par l'empreinte de ses paramètres : redemander le
+même rapport sur les mêmes données renvoie la tâche existante. Les envois
+SMTP en échec sont retentés avec un délai croissant (sauf erreur définitive).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import pandas as pd
+
+import courriel
+from exports import archive_en_memoire
+from rapports import CacheRapports, cle_rapport
+from stockage import depot
+
+DOSSIER_TACHES = os.environ.get("SODEXAM_TACHES", "Taches")
+EMAIL_DIRECTION = os.environ.get("SODEXAM_DIRECTION", "direction@sodexam.ci")
+
+EN_ATTENTE, EN_COURS, NOUVEL_ESSAI, TERMINEE, ECHEC = (
+    "en attente", "en cours", "nouvel essai", "terminée", "échec")
+ETATS_ACTIFS = (EN_ATTENTE, EN_COURS, NOUVEL_ESSAI)
+
+
+def identifiant_tache(type_tache: str, params: dict) -> str:
+    cle = json.dumps({"type": type_tache, **params}, sort_keys=True, default=str)
+    return hashlib.sha1(cle.encode()).hexdigest()[:16]
+
+
+def _lire_releves(params: dict) -> pd.DataFrame:
+    """Relevés de la période et des stations de la tâche, relus depuis le dépôt."""
+    debut, fin = date.fromisoformat(params["date_debut"]), date.fromisoformat(params["date_fin"])
+    villes = params.get("villes") or depot().lister_stations()
+    return depot().lire_periode(villes, debut, fin).drop(columns=["id"], errors="ignore")
+
+
+def _generer_pdf(params: dict) -> bytes:
+    """Rapport PDF des alertes avec les paramètres de la tâche."""
+    from pdf_alertes import generer_rapport_alertes_pdf
+
+    return generer_rapport_alertes_pdf(
+        df_total=_lire_releves(params),
+        seuil_mm=params["seuil_mm"],
+        date_debut=date.fromisoformat(params["date_debut"]),
+        date_fin=date.fromisoformat(params["date_fin"]),
+        titre_rapport=params["titre_rapport"],
+        logo_path=params.get("logo_path"),
+        inclure_vigilance=params.get("inclure_vigilance", True),
+        villes=params.get("villes") or None,
+        version_donnees=params.get("version"),
+    )
+
+
+def _generer_archive(params: dict) -> bytes:
+    """Archive ZIP des relevés de la tâche (toutes dates si la période est vide)."""
+    debut = date.fromisoformat(params["date_debut"]) if params.get("date_debut") else None
+    fin = date.fromisoformat(params["date_fin"]) if params.get("date_fin") else None
+    with archive_en_memoire(params["villes"], debut, fin) as tampon:
+        return tampon.read()
+
+
+def _corps(params: dict) -> str:
+    """Message accompagnateur, nom du demandeur (absent du PDF partagé) et signature."""
+    demandeur = params.get("generateur")
+    return (params.get("note", "")
+            + (f"\n\nRapport demandé par {demandeur}." if demandeur else "")
+            + courriel.signature())
+
+
+def destinataires_alertes(params: dict) -> list[dict]:
+    """Comptes ayant un e-mail (stations du rapport) + la direction, avec leurs chiffres d'alerte."""
+    df = _lire_releves(params)
+    alertes = df[df["Pluie (mm)"] >= params["seuil_mm"]]
+    nb_par_ville = alertes.groupby("Ville").size()
+    max_par_ville = df.groupby("Ville")["Pluie (mm)"].max()
+    villes = set(params.get("villes") or depot().lister_stations())
+    comptes = depot().lister_utilisateurs()
+    comptes = comptes[comptes["email"].notna() & (comptes["email"].astype(str).str.contains("@"))]
+    destinataires = [
+        {"email": c.email, "identifiant": c.identifiant, "ville": c.ville,
+         "nb_alertes": int(nb_par_ville.get(c.ville, 0)),
+         "max_mm": f"{float(max_par_ville.get(c.ville, 0)):.1f}"}
+        for c in comptes.itertuples() if c.ville in villes
+    ]
+    destinataires.append({
+        "email": EMAIL_DIRECTION, "identifiant": "Direction", "ville": "toutes stations",
+        "nb_alertes": len(alertes), "max_mm": f"{float(df['Pluie (mm)'].max()) if not df.empty else 0:.1f}",
+    })
+    # Une seule copie par adresse
+    return list({d["email"]: d for d in destinataires}.values())
+
+
+class FileTaches:
+    """Pool de threads + état persistant des tâches PDF, archive et e-mail."""
+
+    def __init__(self, dossier: str = DOSSIER_TACHES, nb_workers: int = 2,
+                 essais_max: int = 4, delai_initial: float = 5.0, facteur: float = 3.0):
+        self.dossier = dossier
+        self.essais_max = essais_max
+        self.delai_initial = delai_initial
+        self.facteur = facteur
+        self._verrou = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix="tache")
+        os.makedirs(dossier, exist_ok=True)
+        self._chemin_etat = os.path.join(dossier, "etat.json")
+        self.rapports = CacheRapports(os.path.join(dossier, "rapports"))
+        self._taches: dict[str, dict] = self._lire_etat()
+        # Reprise des tâches interrompues ; la version du chargeur ne vaut que
+        # dans le processus qui l'a donnée : les graphiques seront indexés sur les relevés
+        for t in self._taches.values():
+            if t["etat"] in ETATS_ACTIFS:
+                t["etat"] = EN_ATTENTE
+                t["params"].pop("version", None)
+                self._pool.submit(self._executer, t["id"])
+        self._sauver()
+
+    # ---------- Persistance ----------
+    def _lire_etat(self) -> dict:
+        if not os.path.exists(self._chemin_etat):
+            return {}
+        try:
+            with open(self._chemin_etat, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _sauver(self) -> None:
+        with self._verrou:
+            tmp = self._chemin_etat + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._taches, f, ensure_ascii=False, indent=1, default=str)
+            os.replace(tmp, self._chemin_etat)
+
+    def _maj(self, ident: str, **champs) -> None:
+        with self._verrou:
+            self._taches[ident].update(champs, maj=datetime.now().isoformat(timespec="seconds"))
+            self._sauver()
+
+    # ---------- API ----------
+    def soumettre(self, type_tache: str, params: dict) -> str:
+        """Ajoute une tâche ("pdf", "pdf_email", "pdf_diffusion" ou "zip_email") ; renvoie l'id de la tâche identique existante s'il y en a une."""
+        ident = identifiant_tache(type_tache, params)
+        with self._verrou:
+            existante = self._taches.get(ident)
+            if existante and (existante["etat"] in ETATS_ACTIFS or
+                              (existante["etat"] == TERMINEE and type_tache == "pdf"
+                               and self.rapports.contient(cle_rapport(params)))):
+                return ident
+            maintenant = datetime.now().isoformat(timespec="seconds")
+            self._taches[ident] = {
+                "id": ident, "type": type_tache, "params": params, "etat": EN_ATTENTE,
+                "essais": 0, "erreur": "", "cree": maintenant, "maj": maintenant,
+            }
+            self._sauver()
+        self._pool.submit(self._executer, ident)
+        return ident
+
+    def etat(self, ident: str) -> dict | None:
+        with self._verrou:
+            t = self._taches.get(ident)
+            return dict(t) if t else None
+
+    def lister(self, idents=None) -> list[dict]:
+        with self._verrou:
+            taches = [dict(t) for i, t in self._taches.items() if idents is None or i in idents]
+        return sorted(taches, key=lambda t: t["cree"], reverse=True)
+
+    def pdf(self, ident: str) -> bytes | None:
+        """PDF de la tâche, None s'il a été évincé du cache (à régénérer)."""
+        t = self.etat(ident)
+        return self.rapports.lire(cle_rapport(t["params"])) if t else None
+
+    def attendre(self, ident: str, delai: float = 60.0) -> dict | None:
+        """Attend la fin d'une tâche (scripts et essais hors Streamlit)."""
+        limite = time.monotonic() + delai
+        while time.monotonic() < limite:
+            t = self.etat(ident)
+            if t is None or t["etat"] in (TERMINEE, ECHEC):
+                return t
+            time.sleep(0.05)
+        return self.etat(ident)
+
+    # ---------- Exécution ----------
+    def _executer(self, ident: str) -> None:
+        t = self.etat(ident)
+        if t is None:
+            return
+        params = t["params"]
+        self._maj(ident, etat=EN_COURS)
+        try:
+            if t["type"] == "zip_email":
+                # Archive refaite à chaque essai : rien de volumineux n'est gardé entre deux
+                piece = _generer_archive(params)
+            else:
+                piece = self.rapports.obtenir(cle_rapport(params), lambda: _generer_pdf(params))
+        except Exception as e:
+            self._maj(ident, etat=ECHEC, erreur=f"Génération : {e}")
+            return
+        if t["type"] == "zip_email":
+            self._envoyer(ident, params, piece, "zip")
+        elif t["type"] == "pdf_email":
+            self._envoyer(ident, params, piece)
+        elif t["type"] == "pdf_diffusion":
+            self._diffuser(ident, params, piece)
+        else:
+            self._maj(ident, etat=TERMINEE, erreur="")
+
+    def _envoyer(self, ident: str, params: dict, piece: bytes, type_piece: str = "pdf") -> None:
+        """Un essai d'envoi ; en cas d'échec temporaire, la tâche est reprogrammée.
+
+        L'attente (delai_initial, puis x facteur à chaque essai) se fait dans un
+        minuteur, hors du pool : un serveur SMTP en panne n'occupe pas de worker.
+        """
+        msg = courriel.construire_message(
+            params["destinataire"], params["titre_rapport"], _corps(params),
+            piece, params.get("nom_fichier", f"{ident}.{type_piece}"), type_piece,
+        )
+        essai = self.etat(ident)["essais"] + 1
+        try:
+            courriel.envoyer_message(msg)
+        except Exception as e:
+            if courriel.erreur_definitive(e) or essai >= self.essais_max:
+                self._maj(ident, etat=ECHEC, essais=essai, erreur=f"Envoi : {e}")
+                return
+            delai = self.delai_initial * self.facteur ** (essai - 1)
+            self._maj(ident, etat=NOUVEL_ESSAI, essais=essai,
+                      erreur=f"Envoi : {e} – nouvel essai dans {delai:g} s")
+            minuteur = threading.Timer(delai, self._pool.submit, args=(self._executer, ident))
+            minuteur.daemon = True
+            minuteur.start()
+            return
+        self._maj(ident, etat=TERMINEE, essais=essai, erreur="")
+
+    def _diffuser(self, ident: str, params: dict, pdf: bytes) -> None:
+        """Envoi personnalisé à toutes les stations concernées et à la direction."""
+        try:
+            destinataires = destinataires_alertes(params)
+            messages = courriel.personnaliser(
+                destinataires, params["titre_rapport"], _corps(params),
+                pdf, params.get("nom_fichier", f"{ident}.pdf"), "pdf",
+            )
+            bilan = courriel.envoyer_lot(messages, debit_max=params.get("debit_max", 5.0))
+        except Exception as e:
+            self._maj(ident, etat=ECHEC, erreur=f"Diffusion : {e}")
+            return
+        self._maj(ident, etat=TERMINEE if not bilan.echecs else ECHEC, essais=1,
+                  erreur="; ".join(f"{dest} : {err}" for dest, err in bilan.echecs[:5]),
+                  bilan={"resume": bilan.resume(), "envoyes": bilan.envoyes, "echecs": bilan.echecs,
+                         "duree_s": round(bilan.duree_s, 3), "debit": round(bilan.debit, 2)})
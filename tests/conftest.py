@@ -0,0 +1,6 @@
+# === CONTENU DU FICHIER tests/conftest.py ===
+"""Les modules de l'application sont à la racine du dépôt, à côté de mon_code.py."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,105 @@
+# === CONTENU DU FICHIER tests/test_alertes.py ===
+"""Moteur d'alertes : franchissement des seuils, rejeu des fenêtres et éviction."""
+import pandas as pd
+import pytest
+
+from alertes import MoteurAlertes, Regle
+
+# Une règle courte, aux seuils ronds : les scénarios tiennent dans l'heure écoulée
+CUMUL_1H = Regle("Cumul 1 h", pd.Timedelta(hours=1), seuil_alerte=50.0, seuil_vigilance=20.0)
+PONCTUEL = Regle("Relevé ponctuel", pd.Timedelta(hours=1), 50.0, 20.0, cumul=False)
+
+
+def releves(*lignes) -> pd.DataFrame:
+    """Relevés (minutes avant maintenant, mm) de la station Man."""
+    maintenant = pd.Timestamp.now().floor("min")
+    return pd.DataFrame({
+        "Ville": "Man",
+        "Date_Heure": [maintenant - pd.Timedelta(minutes=m) for m, _ in lignes],
+        "Pluie (mm)": [float(mm) for _, mm in lignes],
+    })
+
+
+def alerte(moteur: MoteurAlertes, regle: Regle = CUMUL_1H) -> dict | None:
+    actives = moteur.actives("Man")
+    ligne = actives[actives["Règle"] == regle.nom]
+    return ligne.iloc[0].to_dict() if not ligne.empty else None
+
+
+@pytest.fixture
+def moteur() -> MoteurAlertes:
+    return MoteurAlertes(regles=(CUMUL_1H,))
+
+
+def test_depuis_est_le_releve_qui_franchit_chaque_seuil(moteur):
+    df = releves((50, 10), (40, 15), (30, 30))
+    for i in range(len(df)):
+        moteur.integrer("Man", df.iloc[[i]])
+        if i == 0:
+            assert alerte(moteur) is None
+
+    a = alerte(moteur)
+    assert a["Niveau"] == "alerte"
+    assert a["Valeur (mm)"] == 55.0
+    # Le relevé de 30 mm a fait passer le cumul de 25 à 55 mm
+    assert a["Depuis"] == df["Date_Heure"].iloc[2]
+    assert a["Dernier relevé"] == df["Date_Heure"].iloc[2]
+
+
+def test_recalculer_retrouve_le_meme_debut(moteur):
+    df = releves((50, 10), (40, 15), (30, 30), (20, 0))
+    moteur.integrer("Man", df.iloc[:2])
+    moteur.integrer("Man", df.iloc[2:])
+    incremental = alerte(moteur)
+
+    relu = MoteurAlertes(regles=(CUMUL_1H,))
+    relu.recalculer("Man", df)
+    assert alerte(relu) == incremental
+    assert incremental["Depuis"] == df["Date_Heure"].iloc[2]
+
+
+def test_retour_sous_le_seuil_puis_nouveau_franchissement(moteur):
+    # 60 mm il y a 1 h 40 (hors de la fenêtre aujourd'hui), 5 mm isolés, puis 50 mm
+    df = releves((110, 30), (100, 30), (40, 5), (30, 50))
+    moteur.recalculer("Man", df)
+
+    a = alerte(moteur)
+    assert a["Valeur (mm)"] == 55.0
+    # Les 60 mm sont sortis de la fenêtre au rejeu : le dépassement date du dernier relevé
+    assert a["Depuis"] == df["Date_Heure"].iloc[3]
+
+
+def test_fenetre_videe_fait_tomber_l_alerte(moteur):
+    moteur.recalculer("Man", releves((90, 60), (80, 10)))
+    assert alerte(moteur) is None
+    assert moteur.actives().empty
+
+
+def test_vigilance_puis_alerte_gardent_leurs_debuts():
+    moteur = MoteurAlertes(regles=(CUMUL_1H,))
+    df = releves((45, 25), (15, 30))
+    moteur.integrer("Man", df.iloc[[0]])
+    vigilance = alerte(moteur)
+    assert (vigilance["Niveau"], vigilance["Depuis"]) == ("vigilance", df["Date_Heure"].iloc[0])
+
+    moteur.integrer("Man", df.iloc[[1]])
+    a = alerte(moteur)
+    assert (a["Niveau"], a["Depuis"]) == ("alerte", df["Date_Heure"].iloc[1])
+
+
+def test_releve_saisi_en_retard():
+    moteur = MoteurAlertes(regles=(CUMUL_1H, PONCTUEL))
+    df = releves((10, 20), (30, 35))
+    moteur.integrer("Man", df.iloc[[0]])
+    moteur.integrer("Man", df.iloc[[1]])   # plus ancien que le relevé déjà intégré
+
+    assert alerte(moteur)["Valeur (mm)"] == 55.0
+    ponctuel = alerte(moteur, PONCTUEL)
+    assert (ponctuel["Niveau"], ponctuel["Valeur (mm)"]) == ("vigilance", 35.0)
+
+
+def test_retirer_oublie_la_station(moteur):
+    moteur.recalculer("Man", releves((10, 60)))
+    assert alerte(moteur) is not None
+    moteur.retirer("Man")
+    assert moteur.actives().empty
@@ -0,0 +1,126 @@
+# === CONTENU DU FICHIER tests/test_stockage.py ===
+"""Journal des corrections : enregistrement par lignes, reconstitution d'un lot, ids jamais réattribués."""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import stockage
+from stockage import DepotParquet, DepotSQLite
+
+
+def releves(n: int, debut: str = "2024-03-01 06:00") -> pd.DataFrame:
+    """`n` relevés horaires complets de la station (sans colonne Ville)."""
+    return pd.DataFrame({
+        "Date_Heure":      pd.date_range(debut, periods=n, freq="h"),
+        "Pluie (mm)":      [0.0, 12.5, 3.2, 61.0, 7.7, 0.4][:n] + [1.0] * max(0, n - 6),
+        "Temperature (C)": 26.5,
+        "Humidite (%)":    80.0,
+        "Vent (km/h)":     12.0,
+        "Phenomenes":      (["", "Orage", "Orage, Brume", "", "Vent Fort", ""] * n)[:n],
+        "Obs":             [f"obs {i}" for i in range(n)],
+        "Saisi_par":       "agent_man",
+    })
+
+
+def trie(df: pd.DataFrame) -> pd.DataFrame:
+    # Dates relues du journal en ns, de la base en µs selon la version de pandas : mêmes instants
+    return df.astype({"Date_Heure": "datetime64[ns]"}).sort_values(["Date_Heure", "id"], ignore_index=True)
+
+
+@pytest.fixture(params=["sqlite", "parquet"])
+def depot(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # utilisateurs.csv éventuel : dans le dossier de l'essai
+    if request.param == "sqlite":
+        return DepotSQLite(str(tmp_path / "essai.db"))
+    (tmp_path / "Donnees_Villes").mkdir()
+    return DepotParquet(str(tmp_path / "Donnees_Villes"))
+
+
+def corriger(depot, utilisateur: str = "admin") -> tuple[pd.DataFrame, int]:
+    """Une correction de chaque sorte (modif, phénomène, suppression, ajout) ; (état avant, n° du lot)."""
+    avant = depot.lire_station("Man")
+    apres = avant.astype({"Phenomenes": object})
+    apres.loc[1, "Pluie (mm)"] = 14.0
+    apres.loc[2, "Phenomenes"] = "Brume"
+    apres = apres.drop(index=3)
+    ajout = releves(1, "2024-03-02 00:00").assign(id=None)
+    apres = pd.concat([apres, ajout], ignore_index=True)
+    assert depot.modifier_releves("Man", avant, apres, utilisateur) == 4
+    return avant, int(depot.historique("Man")["lot"].iloc[0])
+
+
+def test_modifier_releves_n_ecrit_que_les_lignes_touchees(depot):
+    depot.importer_releves("Man", releves(6))
+    corriger(depot)
+
+    apres = depot.lire_station("Man")
+    assert len(apres) == 6
+    assert apres.loc[apres["Date_Heure"] == pd.Timestamp("2024-03-01 07:00"), "Pluie (mm)"].item() == 14.0
+    assert pd.Timestamp("2024-03-01 09:00") not in set(apres["Date_Heure"])
+    lot = depot.historique("Man").iloc[0]
+    assert (lot["ajout"], lot["modif"], lot["suppr"], lot["utilisateur"]) == (1, 2, 1, "admin")
+
+
+def test_reconstituer_rend_les_lignes_exactes_d_avant_le_lot(depot):
+    depot.importer_releves("Man", releves(6))
+    avant, lot = corriger(depot)
+    # Saisies postérieures au lot : absentes de la version reconstituée
+    depot.importer_releves("Man", releves(2, "2024-03-03 00:00"))
+
+    pd.testing.assert_frame_equal(trie(depot.reconstituer("Man", lot)), trie(avant))
+
+
+def test_reconstituer_annule_aussi_les_lots_suivants(depot):
+    depot.importer_releves("Man", releves(6))
+    avant, premier = corriger(depot, "admin")
+    intermediaire = depot.lire_station("Man")
+    suite = intermediaire.copy()
+    suite.loc[0, "Obs"] = "corrigé"
+    depot.modifier_releves("Man", intermediaire, suite, "direction")
+    second = int(depot.historique("Man")["lot"].iloc[0])
+
+    assert second > premier
+    pd.testing.assert_frame_equal(trie(depot.reconstituer("Man", premier)), trie(avant))
+    pd.testing.assert_frame_equal(trie(depot.reconstituer("Man", second)), trie(intermediaire))
+
+
+def test_compactage_garde_l_historique(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Donnees_Villes").mkdir()
+    depot = DepotParquet(str(tmp_path / "Donnees_Villes"))
+    depot.importer_releves("Man", releves(6))
+    avant, lot = corriger(depot)
+    corrige = depot.lire_station("Man")
+
+    assert depot.compacter("Man") == 4
+    pd.testing.assert_frame_equal(trie(depot.lire_station("Man")), trie(corrige))
+    pd.testing.assert_frame_equal(trie(depot.reconstituer("Man", lot)), trie(avant))
+
+
+def test_ids_croissants_apres_migration_autoincrement(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    chemin = str(tmp_path / "ancienne.db")
+    # Ancienne base : clé primaire sans AUTOINCREMENT, le plus grand id pouvait être réattribué
+    cx = sqlite3.connect(chemin)
+    cx.executescript(stockage._SCHEMA_SQLITE.replace(" AUTOINCREMENT", ""))
+    cx.executemany("INSERT " + stockage._INSERT_SQL, stockage._valeurs_sql("Man", releves(4)))
+    cx.execute("INSERT INTO stations (Ville, version) VALUES ('Man', 1)")
+    cx.commit()
+    cx.close()
+
+    depot = DepotSQLite(chemin)
+    schema = depot._cx().execute("SELECT sql FROM sqlite_master WHERE name = 'releves'").fetchone()[0]
+    assert "AUTOINCREMENT" in schema.upper()
+    avant = depot.lire_station("Man")
+    assert avant["id"].tolist() == [1, 2, 3, 4]
+
+    # Suppression du plus grand id, puis nouvelle saisie : l'id 4 n'est pas réattribué
+    depot.modifier_releves("Man", avant, avant[avant["id"] != 4], "admin")
+    lot = int(depot.historique("Man")["lot"].iloc[0])
+    depot.importer_releves("Man", releves(1, "2024-03-05 00:00"))
+    depot.importer_releves("Ouragahio", releves(1))
+    assert depot.lire_station("Man")["id"].tolist() == [1, 2, 3, 5]
+    assert depot.lire_station("Ouragahio")["id"].tolist() == [6]
+
+    pd.testing.assert_frame_equal(trie(depot.reconstituer("Man", lot)), trie(avant))
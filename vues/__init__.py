@@ -0,0 +1,27 @@
+# === CONTENU DU FICHIER vues/__init__.py ===
+"""Pages de l'application, importées à leur première ouverture.
+
+Chaque module expose ``afficher(ville, role)``. Un module n'est importé
+qu'une fois par processus (puis repris de sys.modules) : folium, plotly,
+l'envoi d'e-mails ou les archives ZIP ne sont chargés que si une page qui
+en a besoin est ouverte, et jamais pour la page de connexion.
+"""
+import importlib
+
+import metriques
+
+PAGES = {
+    "🌍 Carte Interactive":       "carte_interactive",
+    "📊 Dashboard Admin":         "dashboard",
+    "📝 Saisie Relevé":           "saisie",
+    "📚 Historique & Corrections": "historique",
+    "📈 Analyses Graphiques":     "analyses",
+    "🔴 Rapport PDF Alertes":     "rapport_pdf",
+    "⚙️ Gestion des Comptes":     "comptes",
+}
+
+
+def afficher(page: str, ville: str, role: str) -> None:
+    # Latence de chaque rerun de page (toujours chronométrée, import compris à la 1re visite)
+    with metriques.mesurer(page, "page", toujours=True):
+        importlib.import_module(f"{__name__}.{PAGES[page]}").afficher(ville, role)
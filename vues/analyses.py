@@ -0,0 +1,183 @@
+# === CONTENU DU FICHIER vues/analyses.py ===
+"""Page 📈 Analyses Graphiques : évolution, cumuls, distribution et tableau des relevés."""
+from datetime import date
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from agregats import FREQUENCES
+from coeur import (charger_agregats, charger_toutes_donnees, export_a_la_demande, index_releves,
+                   version_donnees)
+from echantillonnage import METHODES, SEUIL_WEBGL, histogramme, points_cibles, reduire, stats_boite
+from referentiel import SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM
+
+LIGNES_TABLEAU_MAX = 10_000   # au-delà, st.dataframe n'affiche que les derniers relevés
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">📈 Analyses et Graphiques des Précipitations</div>',
+                unsafe_allow_html=True)
+
+    df_t = charger_toutes_donnees()
+    if df_t.empty:
+        st.info("ℹ️ Aucune donnée disponible pour les graphiques.")
+        st.stop()
+
+    # Contrôles globaux
+    all_villes = sorted(df_t["Ville"].unique())
+    col_f1, col_f2, col_f3 = st.columns(3)
+    v_plot = col_f1.multiselect("🏙️ Stations", all_villes, default=all_villes[:3])
+    agg_mode = col_f2.selectbox("📅 Agrégation", ["Brut", "Journalière", "Hebdomadaire", "Mensuelle"])
+    col_f3.markdown("<br>", unsafe_allow_html=True)  # spacer
+
+    date_min = df_t["Date_Heure"].min().date()
+    date_max = df_t["Date_Heure"].max().date()
+
+    # ── Garde : min < max obligatoire pour st.slider ──────
+    if date_min >= date_max:
+        # Une seule journée de données → on utilise deux date_input
+        st.info(
+            f"📅 Une seule journée de données disponible : **{date_min}**. "
+            "Ajoutez des relevés sur d'autres dates pour activer le filtre de période."
+        )
+        d_range = (date_min, date_max)
+    else:
+        d_range = st.slider(
+            "🗓️ Période",
+            min_value=date_min,
+            max_value=date_max,
+            value=(date_min, date_max),
+        )
+
+    if not v_plot:
+        st.warning("⚠️ Sélectionnez au moins une station.")
+        st.stop()
+
+    # Agrégation : lue dans les cumuls pré-calculés, pas recalculée sur les relevés
+    agregats = charger_agregats()
+    if agg_mode != "Brut":
+        df_p = agregats.tableau(FREQUENCES[agg_mode], v_plot, d_range[0], d_range[1])
+    else:
+        df_p = index_releves().requete(v_plot, d_range[0], d_range[1])
+
+    if df_p.empty:
+        st.warning("Aucune donnée pour la sélection.")
+        st.stop()
+
+    tabs = st.tabs(["📉 Évolution", "📊 Cumuls", "🕯️ Distribution", "📋 Tableau"])
+
+    # Onglet 1 – Évolution temporelle
+    with tabs[0]:
+        df_ev = df_p
+        if agg_mode == "Brut":
+            # Zoom (sélection rectangle) : la fenêtre est relue en pleine résolution
+            cle_zoom = (tuple(v_plot), d_range)
+            zoom = st.session_state.get("zoom_analyse")
+            if zoom and zoom[0] == cle_zoom:
+                df_ev = index_releves().requete(v_plot, zoom[1], zoom[2])
+                if st.button("↩️ Vue complète", key="zoom_reset"):
+                    st.session_state.pop("zoom_analyse", None)
+                    st.rerun()
+            methode = st.radio("Réduction", list(METHODES), horizontal=True, key="methode_reduction",
+                               help="Min / max garde tous les pics ; LTTB suit mieux la forme de la courbe")
+            n_source = len(df_ev)
+            df_ev = reduire(df_ev, points_cibles(nb_series=len(v_plot)), METHODES[methode])
+            if len(df_ev) < n_source:
+                st.caption(f"{len(df_ev):,} points affichés sur {n_source:,} relevés. "
+                           "Sélectionnez une zone (outil rectangle) pour l'afficher en pleine résolution."
+                           .replace(",", " "))
+        fig_ev = px.line(
+            df_ev, x="Date_Heure", y="Pluie (mm)", color="Ville",
+            markers=(agg_mode != "Brut"),
+            title=f"Évolution des précipitations ({agg_mode})",
+            line_shape="linear" if agg_mode == "Brut" else "spline",
+            render_mode="webgl" if len(df_ev) > SEUIL_WEBGL else "auto",
+            color_discrete_sequence=px.colors.qualitative.Bold,
+        )
+        # Ligne seuil
+        fig_ev.add_hline(y=SEUIL_ALERTE_MM, line_dash="dot",
+                         line_color="red", annotation_text="Seuil alerte")
+        fig_ev.add_hline(y=SEUIL_VIGILANCE_MM, line_dash="dash",
+                         line_color="orange", annotation_text="Vigilance")
+        fig_ev.update_layout(plot_bgcolor="white", paper_bgcolor="white", hovermode="x unified")
+        if agg_mode == "Brut":
+            evenement = st.plotly_chart(fig_ev, use_container_width=True, key="graph_evolution",
+                                        on_select="rerun", selection_mode="box")
+            boites = (evenement or {}).get("selection", {}).get("box") or []
+            if boites and len(boites[0].get("x", [])) == 2:
+                x0, x1 = sorted(pd.to_datetime(boites[0]["x"]))
+                st.session_state["zoom_analyse"] = ((tuple(v_plot), d_range), x0, x1)
+                st.rerun()
+        else:
+            st.plotly_chart(fig_ev, use_container_width=True)
+
+    # Onglet 2 – Cumuls
+    with tabs[1]:
+        cg1, cg2 = st.columns(2)
+        cumul_total = df_p.groupby("Ville")["Pluie (mm)"].sum().reset_index()
+        fig_bar = px.bar(
+            cumul_total, x="Ville", y="Pluie (mm)", color="Ville",
+            title="Cumul total par station",
+            color_discrete_sequence=px.colors.qualitative.Prism,
+        )
+        fig_bar.update_layout(showlegend=False, plot_bgcolor="white", paper_bgcolor="white")
+        cg1.plotly_chart(fig_bar, use_container_width=True)
+
+        if agg_mode == "Mensuelle" or agg_mode == "Brut":
+            cumul_mois = agregats.tableau("ME", v_plot, d_range[0], d_range[1])
+            cumul_mois["Mois"] = cumul_mois["Date_Heure"].dt.to_period("M").astype(str)
+            fig_mbar = px.bar(
+                cumul_mois, x="Mois", y="Pluie (mm)", color="Ville",
+                barmode="group", title="Cumul mensuel par station",
+            )
+            fig_mbar.update_layout(plot_bgcolor="white", paper_bgcolor="white")
+            cg2.plotly_chart(fig_mbar, use_container_width=True)
+
+    # Onglet 3 – Distribution
+    with tabs[2]:
+        if len(df_p) > SEUIL_WEBGL:
+            # Statistiques calculées ici : le navigateur ne reçoit pas les relevés
+            boites = stats_boite(df_p)
+            fig_box = go.Figure([
+                go.Box(name=str(b.Ville), q1=[b.q1], median=[b.mediane], q3=[b.q3],
+                       lowerfence=[b.bas], upperfence=[b.haut], mean=[b.moyenne])
+                for b in boites.itertuples()
+            ])
+            fig_box.update_layout(title="Distribution des précipitations", yaxis_title="Pluie (mm)")
+            hist = histogramme(df_p)
+            fig_hist = px.bar(hist, x="Centre", y="Nb", color="Ville", barmode="overlay",
+                              opacity=0.7, title="Histogramme des relevés",
+                              labels={"Centre": "Pluie (mm)", "Nb": "count"})
+            fig_hist.update_traces(width=hist["Largeur"].iloc[0] if not hist.empty else None)
+        else:
+            fig_box = px.box(
+                df_p, x="Ville", y="Pluie (mm)", color="Ville",
+                points="outliers", title="Distribution des précipitations",
+            )
+            fig_hist = px.histogram(
+                df_p, x="Pluie (mm)", color="Ville",
+                nbins=30, barmode="overlay", opacity=0.7,
+                title="Histogramme des relevés",
+            )
+        fig_box.update_layout(showlegend=False, plot_bgcolor="white", paper_bgcolor="white")
+        st.plotly_chart(fig_box, use_container_width=True)
+        fig_hist.update_layout(plot_bgcolor="white", paper_bgcolor="white")
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    # Onglet 4 – Tableau
+    with tabs[3]:
+        if len(df_p) > LIGNES_TABLEAU_MAX:
+            st.caption(f"{LIGNES_TABLEAU_MAX:,} derniers relevés affichés sur {len(df_p):,} ; "
+                       "les téléchargements contiennent tout.".replace(",", " "))
+        # Relevés les plus récents, quel que soit l'ordre de df_p (trié par station puis date)
+        st.dataframe(df_p.nlargest(LIGNES_TABLEAU_MAX, "Date_Heure").sort_values("Date_Heure", kind="stable"),
+                     use_container_width=True, hide_index=True)
+        # Fichiers produits à la demande, par (version des données, filtres, format)
+        cle_export = (version_donnees(), tuple(v_plot), agg_mode, d_range)
+        ce1, ce2 = st.columns(2)
+        with ce1:
+            export_a_la_demande(cle_export, "csv", "l'export CSV", f"analyse_{date.today()}", lambda: df_p, len(df_p))
+        with ce2:
+            export_a_la_demande(cle_export, "xlsx", "l'export Excel", f"analyse_{date.today()}", lambda: df_p, len(df_p))
@@ -0,0 +1,84 @@
+# === CONTENU DU FICHIER vues/carte_interactive.py ===
+"""Page 🌍 Carte Interactive : carte Folium des stations, résumé 24 h, station la plus proche."""
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit_folium import st_folium
+
+from carte import (CacheCartes, MAX_MARQUEURS, carte_de_base, construire_carte, couche_stations,
+                   emprise_vue, empreinte_statuts)
+from coeur import cache_donnees, charger_toutes_donnees, moteur_alertes, version_donnees
+from registre import registre
+from statuts import appliquer_alertes, statuts_stations
+
+
+@st.cache_resource
+def cache_cartes() -> CacheCartes:
+    # HTML des cartes rendues, partagé entre sessions (LRU)
+    return CacheCartes(taille=32)
+
+@cache_donnees(max_entries=64, show_spinner=False)
+def statuts_carte(_df: pd.DataFrame, version: int, nb_jours: int, heure: pd.Timestamp) -> pd.DataFrame:
+    # Mémoïsé par (version des données, nb_jours, heure) : les fenêtres de temps glissent
+    # d'heure en heure (relevés aux heures synoptiques), recalcul seulement si les
+    # relevés changent ou qu'une heure est passée, pour toutes les sessions à la fois
+    return statuts_stations(_df, registre().noms, nb_jours, heure)
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">🌍 État Pluviométrique National – Temps Réel</div>',
+                unsafe_allow_html=True)
+
+    df_total = charger_toutes_donnees()
+
+    # Filtres rapides
+    fc1, fc2, fc3, fc4 = st.columns(4)
+    afficher_heatmap = fc1.toggle("🌡️ Carte de chaleur", value=False)
+    afficher_clusters = fc2.toggle("🔵 Regrouper marqueurs", value=False)
+    mode_leger = fc3.toggle("⚡ Mise à jour légère", value=len(registre()) > MAX_MARQUEURS,
+                            help="Garde le fond de carte et n'envoie que les stations visibles")
+    nb_jours_carte = fc4.slider("Derniers N jours", 1, 30, 7)
+
+    statuts = statuts_carte(df_total, version_donnees(), nb_jours_carte,
+                            pd.Timestamp.now().floor("h"))
+    # Couleurs relevées par les alertes actives (cumuls 24 h / 72 h / 7 j compris)
+    statuts = appliquer_alertes(statuts, moteur_alertes().niveaux())
+
+    # Construction de la carte Folium
+    if mode_leger:
+        # Fond de carte identique à chaque rerun : seule la couche des stations change
+        # (emprise et zoom du dernier déplacement : seules les stations visibles partent)
+        emprise, zoom = emprise_vue(st.session_state.get("carte_stations"))
+        st_folium(
+            carte_de_base(), key="carte_stations", width="100%", height=560,
+            feature_group_to_add=couche_stations(statuts, nb_jours_carte, afficher_heatmap,
+                                                 afficher_clusters, registre(), emprise, zoom),
+            returned_objects=["bounds", "zoom"],
+        )
+    else:
+        cle = (version_donnees(), afficher_heatmap, afficher_clusters,
+               nb_jours_carte, empreinte_statuts(statuts))
+        html_carte = cache_cartes().obtenir(cle, lambda: construire_carte(
+            statuts, nb_jours_carte, afficher_heatmap, afficher_clusters, registre()).get_root().render())
+        components.html(html_carte, height=560)
+
+    # Tableau récapitulatif rapide
+    if not df_total.empty:
+        st.markdown("##### 📋 Résumé des dernières 24 h")
+        resumé = (
+            statuts.loc[statuts["Cumul 24h (mm)"].notna(), ["Cumul 24h (mm)", "Alerte"]]
+            .reset_index()
+            .sort_values("Cumul 24h (mm)", ascending=False)
+            .rename(columns={"Alerte": "Statut"})
+        )
+        resumé["Statut"] = resumé["Statut"].replace("", "✅ Normal")
+        st.dataframe(resumé, use_container_width=True, hide_index=True)
+
+    # Recherche de la station la plus proche (index spatial du registre)
+    with st.expander("📍 Station la plus proche d'un point"):
+        cp1, cp2 = st.columns(2)
+        lat_pt = cp1.number_input("Latitude", min_value=-90.0, max_value=90.0, value=7.5, format="%.4f")
+        lon_pt = cp2.number_input("Longitude", min_value=-180.0, max_value=180.0, value=-5.5, format="%.4f")
+        proche = registre().plus_proche(lat_pt, lon_pt)
+        if proche:
+            st.info(f"🏙️ **{proche[0]}** à {proche[1]:.1f} km")
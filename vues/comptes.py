@@ -0,0 +1,49 @@
+# === CONTENU DU FICHIER vues/comptes.py ===
+"""Page ⚙️ Gestion des Comptes (admin) : liste, suppression et création des comptes."""
+import streamlit as st
+
+from registre import registre
+from stockage import depot, hash_password
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">⚙️ Gestion des Utilisateurs</div>',
+                unsafe_allow_html=True)
+
+    u_df = depot().lister_utilisateurs()
+
+    # Tableau interactif des comptes
+    st.subheader("👥 Comptes existants")
+    for i, r in u_df.iterrows():
+        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+        col1.write(f"👤 **{r['identifiant']}**")
+        col2.write(f"📍 {r['ville']}")
+        col3.write(f"🏷️ {r.get('role','agent').upper()}")
+        if r["identifiant"] != "admin":
+            if col4.button("🗑️", key=f"del_{i}", help="Supprimer ce compte"):
+                depot().supprimer_utilisateur(r["identifiant"])
+                st.success("Compte supprimé.")
+                st.rerun()
+
+    st.divider()
+    st.subheader("➕ Ajouter / Modifier un compte")
+    with st.form("form_add_user"):
+        fc1, fc2 = st.columns(2)
+        ni  = fc1.text_input("Identifiant")
+        np  = fc1.text_input("Mot de passe", type="password")
+        nv  = fc2.selectbox("Station", sorted(registre().noms))
+        nr  = fc2.selectbox("Rôle", ["agent", "superviseur", "admin"])
+        ne  = st.text_input("Email (optionnel)")
+        if st.form_submit_button("💾 Enregistrer le compte", type="primary"):
+            if ni and np:
+                depot().enregistrer_utilisateur(
+                    identifiant=ni,
+                    mot_de_passe=hash_password(np),
+                    ville=nv,
+                    role=nr,
+                    email=ne,
+                )
+                st.success(f"✅ Compte **{ni}** enregistré !")
+                st.rerun()
+            else:
+                st.warning("Identifiant et mot de passe obligatoires.")
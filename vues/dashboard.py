@@ -0,0 +1,215 @@
+# === CONTENU DU FICHIER vues/dashboard.py ===
+"""Page 📊 Dashboard Admin : indicateurs, alertes en cours, graphiques, archive ZIP et envoi."""
+from datetime import date, timedelta
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import metriques
+import phenomenes
+from coeur import (cache_donnees, charger_agregats, charger_toutes_donnees, file_taches, index_releves,
+                   moteur_alertes, version_donnees)
+from exports import GestionnaireExports, nom_archive
+from referentiel import PHENOMENES_OPTIONS, SEUIL_ALERTE_MM
+from stockage import depot
+
+
+@cache_donnees(max_entries=2, show_spinner=False)
+def releves_en_alerte(_df: pd.DataFrame, version: int) -> pd.DataFrame:
+    # Historique des relevés ≥ seuil : filtré une fois par version des données
+    return _df.loc[_df["Pluie (mm)"] >= SEUIL_ALERTE_MM, ["Date_Heure", "Ville", "Pluie (mm)", "Phenomenes"]]
+
+def envoyer_email_archive(destinataire: str, villes: list[str], debut: date | None, fin: date | None) -> str:
+    # Archive construite et envoyée par la file de tâches (voir taches.py) ; renvoie l'id de la tâche
+    periode_str = f"{debut} → {fin}" if debut else str(date.today())
+    return file_taches().soumettre("zip_email", {
+        "villes": sorted(villes),
+        "date_debut": debut.isoformat() if debut else None,
+        "date_fin": fin.isoformat() if fin else None,
+        "destinataire": destinataire,
+        "titre_rapport": f"Archive données : {periode_str}",
+        "note": f"Bonjour,\n\nVeuillez trouver ci-joint l'archive des données pluviométriques ({periode_str}).",
+        "nom_fichier": nom_archive(debut, fin),
+    })
+
+@st.cache_resource
+def gestionnaire_exports() -> GestionnaireExports:
+    return GestionnaireExports()
+
+@st.fragment(run_every=1)
+def suivi_export_zip():
+    # Relancé seul chaque seconde : la page n'est pas bloquée pendant la préparation
+    travail = gestionnaire_exports().obtenir(st.session_state.get("export_zip"))
+    if travail is None or travail.etat not in ("en attente", "en cours"):
+        st.rerun()   # terminé : la page affiche le résultat et le suivi s'arrête
+    st.progress(travail.progression,
+                text=f"📦 {travail.fait}/{len(travail.villes)} station(s) – {travail.station}")
+
+@st.fragment(run_every=2)
+def suivi_envois_zip():
+    # Envois d'archives de la session, suivis sans bloquer la page
+    for t in file_taches().lister(st.session_state.get("envois_zip", []))[:5]:
+        icone = {"terminée": "✅", "échec": "❌", "nouvel essai": "🔁"}.get(t["etat"], "⏳")
+        st.caption(f"{icone} ZIP → {t['params']['destinataire']} – {t['etat']} {t['erreur']}")
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">📊 Dashboard Administrateur</div>',
+                unsafe_allow_html=True)
+
+    df_all = charger_toutes_donnees()
+    agregats = charger_agregats()
+
+    # KPIs globaux
+    if not df_all.empty:
+        with metriques.mesurer("dashboard.indicateurs"):
+            jours_all    = agregats.journalier()
+            nb_stations  = jours_all["Ville"].nunique()
+            cumul_global = jours_all["somme"].sum()
+            cutoff24     = pd.Timestamp.now() - pd.Timedelta(hours=24)
+            cumul_24h    = index_releves().periode(cutoff24)["Pluie (mm)"].sum()
+            alertes      = releves_en_alerte(df_all, version_donnees())
+            actives      = moteur_alertes().actives()
+            metriques.compter_lignes(len(jours_all))
+
+        k1, k2, k3, k4 = st.columns(4)
+        k1.markdown(f'<div class="kpi-card"><p>Stations actives</p><h3>{nb_stations}</h3></div>', unsafe_allow_html=True)
+        k2.markdown(f'<div class="kpi-card vert"><p>Cumul global (mm)</p><h3>{cumul_global:.0f}</h3></div>', unsafe_allow_html=True)
+        k3.markdown(f'<div class="kpi-card orange"><p>Cumul 24 h (mm)</p><h3>{cumul_24h:.1f}</h3></div>', unsafe_allow_html=True)
+        k4.markdown(f'<div class="kpi-card alerte"><p>Alertes en cours</p><h3>{(actives["Niveau"] == "alerte").sum()}</h3></div>', unsafe_allow_html=True)
+
+        if not actives.empty:
+            st.markdown("##### 🚨 Alertes en cours (relevés ponctuels et cumuls glissants)")
+            st.dataframe(actives, use_container_width=True, hide_index=True)
+
+        st.divider()
+
+        # Graphique cumul par station
+        col_g1, col_g2 = st.columns(2)
+        with col_g1:
+            with metriques.mesurer("dashboard.cumul_par_station"):
+                cumul_villes = agregats.cumul_par_station().sort_values("Pluie (mm)", ascending=False)
+            fig_bar = px.bar(
+                cumul_villes, x="Ville", y="Pluie (mm)", color="Pluie (mm)",
+                color_continuous_scale="Blues",
+                title="☔ Cumul total par station",
+                labels={"Pluie (mm)": "mm"},
+            )
+            fig_bar.update_layout(showlegend=False, plot_bgcolor="white", paper_bgcolor="white")
+            st.plotly_chart(fig_bar, use_container_width=True)
+
+        with col_g2:
+            # Répartition des phénomènes (comptée sur les masques de bits)
+            with metriques.mesurer("dashboard.phenomenes"):
+                ph_count = phenomenes.compter(df_all["Phenomenes"]).rename_axis("Phénomène").reset_index(name="Nb")
+                metriques.compter_lignes(len(df_all))
+            if not ph_count.empty:
+                fig_pie = px.pie(ph_count, names="Phénomène", values="Nb",
+                                 title="🌪️ Répartition des phénomènes",
+                                 color_discrete_sequence=px.colors.qualitative.Set2)
+                st.plotly_chart(fig_pie, use_container_width=True)
+            else:
+                st.info("Aucun phénomène enregistré.")
+
+        # Évolution temporelle globale
+        df_daily_grp = jours_all.rename(columns={"somme": "Pluie (mm)"}).sort_values(["Jour", "Ville"])
+        fig_line = px.line(
+            df_daily_grp, x="Jour", y="Pluie (mm)", color="Ville",
+            markers=True, title="📈 Évolution journalière des précipitations",
+            line_shape="spline",
+        )
+        fig_line.update_layout(plot_bgcolor="white", paper_bgcolor="white")
+        st.plotly_chart(fig_line, use_container_width=True)
+
+        # Alertes
+        if not alertes.empty:
+            st.warning(f"🚨 {len(alertes)} enregistrement(s) dépassant {SEUIL_ALERTE_MM} mm !")
+            filtre_ph = st.multiselect("⚡ Alertes avec le(s) phénomène(s)", PHENOMENES_OPTIONS,
+                                       key="filtre_alertes_ph")
+            if filtre_ph:
+                alertes = alertes[phenomenes.avec(alertes["Phenomenes"], filtre_ph)]
+            st.dataframe(
+                alertes.sort_values("Pluie (mm)", ascending=False),
+                use_container_width=True, hide_index=True
+            )
+
+    else:
+        st.info("ℹ️ Aucune donnée disponible.")
+
+    st.divider()
+    st.subheader("📤 Exportation & Envoi")
+
+    # Filtres de l'archive
+    stations_export = depot().lister_stations()
+    cx1, cx2 = st.columns(2)
+    villes_export = cx1.multiselect("🏙️ Stations exportées", stations_export, default=stations_export)
+    filtrer_dates = cx2.checkbox("🗓️ Limiter à une période", value=False)
+    debut_export = fin_export = None
+    if filtrer_dates:
+        periode_export = cx2.date_input("Période", value=(date.today() - timedelta(days=30), date.today()))
+        if isinstance(periode_export, (tuple, list)) and len(periode_export) == 2:
+            debut_export, fin_export = periode_export
+
+    col_e1, col_e2 = st.columns(2)
+
+    # Archive ZIP préparée en arrière-plan (compressée, hors du dossier de travail)
+    if col_e1.button("📦 Préparer l'archive ZIP", use_container_width=True, disabled=not villes_export):
+        travail = gestionnaire_exports().lancer(villes_export, debut_export, fin_export)
+        st.session_state.export_zip = travail.ident
+
+    with col_e1:
+        travail = gestionnaire_exports().obtenir(st.session_state.get("export_zip"))
+        if travail is None:
+            pass
+        elif travail.etat == "terminé":
+            st.download_button(
+                f"⬇️ Télécharger le ZIP ({travail.nb_releves:,} relevés)",
+                data=travail.contenu,   # lu au clic seulement, pas à chaque rerun
+                file_name=travail.nom,
+                mime="application/zip",
+                use_container_width=True,
+            )
+        elif travail.etat == "échec":
+            st.error(f"❌ Échec de l'export : {travail.erreur}")
+        else:
+            suivi_export_zip()
+
+    with col_e2.form("form_email"):
+        email_dest = st.text_input("📧 Destinataire", "direction@sodexam.ci")
+        envoi_zip = st.form_submit_button("📨 Envoyer par e-mail", use_container_width=True,
+                                          disabled=not villes_export)
+    if envoi_zip:
+        ident = envoyer_email_archive(email_dest, villes_export, debut_export, fin_export)
+        st.session_state.setdefault("envois_zip", []).append(ident)
+        col_e2.info("📨 Envoi programmé : l'archive est préparée en arrière-plan.")
+    if st.session_state.get("envois_zip"):
+        with col_e2:
+            suivi_envois_zip()
+
+    performances()
+
+
+def performances():
+    """Métriques du processus (voir metriques.py) : pages, fonctions, caches, mémoire."""
+    with st.expander("⏱️ Performances de l'application (ce processus)"):
+        etat = metriques.collecte.instantane()
+        mem = etat["memoire"]
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Mémoire résidente", f"{mem['residente'] / 1024**2:.0f} Mo" if mem["residente"] else "—")
+        m2.metric("Pic mémoire", f"{mem['pic'] / 1024**2:.0f} Mo" if mem["pic"] else "—")
+        m3.metric("Mode de mesure", etat["mode"] + (f" ({etat['taux']:.0%})" if etat["mode"] == "echantillon" else ""))
+        series = pd.DataFrame(etat["series"])
+        if not series.empty:
+            for col in ("duree_moy", "duree_max", "cpu_moy"):
+                series[col] = (series[col].astype(float) * 1000).round(1)
+            st.dataframe(
+                series.drop(columns=["duree_totale"]).sort_values(["categorie", "duree_moy"], ascending=[False, False]),
+                use_container_width=True, hide_index=True,
+                column_config={"duree_moy": "moy. (ms)", "duree_max": "max (ms)", "cpu_moy": "CPU moy. (ms)"},
+            )
+        if etat["caches"]:
+            st.dataframe(pd.DataFrame(etat["caches"]), use_container_width=True, hide_index=True)
+        if metriques.PORT:
+            st.caption(f"Collecteur local : http://127.0.0.1:{metriques.PORT}/metrics (Prometheus) "
+                       f"ou /metrics.json")
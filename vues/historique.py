@@ -0,0 +1,111 @@
+# === CONTENU DU FICHIER vues/historique.py ===
+"""Page 📚 Historique & Corrections : consultation d'une station, édition (admin), exports."""
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from coeur import export_a_la_demande, index_releves, version_donnees
+from phenomenes import PhenomenesInconnus
+from referentiel import PHENOMENES_OPTIONS
+from stockage import COLONNES_CATEGORIES, DoublonReleve, depot
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">📚 Historique & Gestion des Données</div>',
+                unsafe_allow_html=True)
+
+    # Sélection de la station
+    stations_dispo = depot().lister_stations()
+    if role == "admin":
+        v_sel = st.selectbox("🏙️ Station", stations_dispo if stations_dispo else [ville])
+    else:
+        v_sel = ville
+        st.info(f"📍 Station : **{ville}**")
+
+    bornes = depot().bornes_station(v_sel)
+    if bornes:
+        # Filtres temporels (requête sur l'index Ville, Date_Heure)
+        fc1, fc2 = st.columns(2)
+        min_date, max_date = bornes[0].date(), bornes[1].date()
+        date_debut = fc1.date_input("📅 Du", value=min_date, min_value=min_date, max_value=max_date)
+        date_fin   = fc2.date_input("📅 Au", value=max_date, min_value=min_date, max_value=max_date)
+        df_filtre = (index_releves().requete([v_sel], date_debut, date_fin)
+                     .drop(columns=["Ville"]).astype({"id": "int64"}).reset_index(drop=True))
+
+        st.markdown(f"**{len(df_filtre)} enregistrement(s) trouvé(s)**")
+        # Fichiers produits à la demande, par (version des données, filtres, format)
+        cle_export = (version_donnees(), v_sel, date_debut, date_fin)
+
+        # Statistiques rapides
+        if not df_filtre.empty and "Pluie (mm)" in df_filtre.columns:
+            pluie_col = pd.to_numeric(df_filtre["Pluie (mm)"], errors="coerce").fillna(0)
+            s1, s2, s3, s4 = st.columns(4)
+            s1.metric("🌧️ Cumul total", f"{pluie_col.sum():.1f} mm")
+            s2.metric("📈 Max ponctuel", f"{pluie_col.max():.1f} mm")
+            s3.metric("📉 Moy. par relevé", f"{pluie_col.mean():.1f} mm")
+            s4.metric("📊 Nb relevés", len(df_filtre))
+
+        if role == "admin":
+            st.subheader("🛠️ Zone Admin – Édition des données")
+            # Colonnes catégorielles repassées en texte libre pour l'édition ;
+            # l'id (masqué) identifie chaque relevé pour n'enregistrer que les lignes touchées
+            df_edite = st.data_editor(
+                df_filtre.astype({c: object for c in COLONNES_CATEGORIES if c in df_filtre.columns}),
+                num_rows="dynamic", use_container_width=True,
+                column_config={"id": None},
+            )
+            ca, cb, cc = st.columns(3)
+            if ca.button("💾 Sauvegarder", type="primary"):
+                try:
+                    nb = depot().modifier_releves(v_sel, df_filtre, df_edite, st.session_state.username)
+                except DoublonReleve as e:
+                    st.error(f"❌ {e}")
+                except PhenomenesInconnus as e:
+                    st.error(f"❌ {e} – phénomènes admis : {', '.join(PHENOMENES_OPTIONS)}")
+                else:
+                    st.success(f"✅ Données mises à jour ({nb} ligne(s)) !")
+                    st.rerun()
+
+            with cb:
+                # Classeur produit seulement à la demande, puis repris du cache
+                export_a_la_demande(cle_export, "xlsx", "l'export Excel", f"{v_sel}_{date.today()}",
+                                    lambda: df_filtre.drop(columns=["id"]), len(df_filtre))
+
+            if cc.button("🗑️ Vider la station", type="secondary"):
+                depot().supprimer_station(v_sel, st.session_state.username)
+                st.warning("⚠️ Toutes les données de cette station ont été supprimées.")
+                st.rerun()
+            journal_corrections(v_sel)
+        else:
+            st.dataframe(df_filtre.drop(columns=["id"]), use_container_width=True, hide_index=True)
+            export_a_la_demande(cle_export, "csv", "mes données (CSV)", f"{v_sel}_{date.today()}",
+                                lambda: df_filtre.drop(columns=["id"]), len(df_filtre))
+    else:
+        st.info("ℹ️ Aucun historique pour cette station.")
+        if role == "admin":
+            journal_corrections(v_sel)
+
+
+def journal_corrections(v_sel: str):
+    """Lots de corrections de la station et reconstitution de l'état avant l'un d'eux."""
+    lots = depot().historique(v_sel)
+    with st.expander(f"🕓 Journal des corrections ({len(lots)} lot(s))"):
+        if lots.empty:
+            st.caption("Aucune correction enregistrée pour cette station.")
+            return
+        st.dataframe(lots.rename(columns={"lot": "Lot", "horodatage": "Date", "utilisateur": "Par",
+                                          "ajout": "Ajouts", "modif": "Modifications", "suppr": "Suppressions"}),
+                     use_container_width=True, hide_index=True)
+        lot = st.selectbox("Afficher la station telle qu'elle était avant le lot", lots["lot"].tolist(),
+                           format_func=lambda n: f"n°{n} – " + lots.loc[lots["lot"] == n, "horodatage"].iloc[0])
+        if st.button("🔎 Reconstituer"):
+            version = depot().reconstituer(v_sel, lot).drop(columns=["id"])
+            st.markdown(f"**{len(version)} relevé(s) avant le lot n°{lot}**")
+            st.dataframe(version, use_container_width=True, hide_index=True)
+            st.download_button(
+                "📥 Télécharger cette version (CSV)",
+                data=version.to_csv(index=False).encode(),
+                file_name=f"{v_sel}_avant_lot_{lot}.csv",
+                mime="text/csv",
+            )
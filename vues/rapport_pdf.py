@@ -0,0 +1,241 @@
+# === CONTENU DU FICHIER vues/rapport_pdf.py ===
+"""Page 🔴 Rapport PDF Alertes : paramètres, aperçu, génération et envoi en arrière-plan."""
+import os
+from datetime import date, timedelta
+
+import streamlit as st
+
+from coeur import (cache_donnees, charger_toutes_donnees, file_taches, index_releves, moteur_alertes,
+                   version_donnees)
+from rapports import empreinte_releves
+from referentiel import SEUIL_ALERTE_MM, SEUIL_VIGILANCE_MM
+from requetes import IndexReleves
+
+# Module PDF (doit être dans le même dossier que l'app)
+try:
+    from pdf_alertes import generer_rapport_alertes_pdf
+    PDF_DISPONIBLE = True
+except ImportError:
+    PDF_DISPONIBLE = False
+
+
+@cache_donnees(max_entries=32, show_spinner=False)
+def apercu_rapport(_index: IndexReleves, version: int, debut: date, fin: date,
+                   villes: tuple, seuil: float) -> dict:
+    # Filtre et empreinte du rapport, calculés une fois par (version, paramètres)
+    df = _index.requete(villes or None, debut, fin)
+    pluie = df["Pluie (mm)"]
+    alertes = df[pluie >= seuil]
+    return {
+        "nb_alertes":    len(alertes),
+        "nb_vigilances": int(((pluie >= SEUIL_VIGILANCE_MM) & (pluie < seuil)).sum()),
+        "nb_stations":   alertes["Ville"].nunique(),
+        "max":           float(pluie.max()) if not df.empty else None,
+        "alertes":       alertes[["Date_Heure", "Ville", "Pluie (mm)", "Phenomenes"]].nlargest(10, "Pluie (mm)"),
+        # Empreinte des relevés concernés : clé du cache partagé des rapports
+        "empreinte":     empreinte_releves(df),
+    }
+
+@st.fragment(run_every=2)
+def suivi_taches_pdf():
+    taches = file_taches().lister(st.session_state.get("taches_pdf", []))
+    for t in taches[:5]:
+        icone = {"terminée": "✅", "échec": "❌", "nouvel essai": "🔁"}.get(t["etat"], "⏳")
+        libelle = {"pdf": "PDF", "pdf_diffusion": "PDF → diffusion stations + direction"}.get(
+            t["type"], f"PDF → {t['params'].get('destinataire')}")
+        bilan = t.get("bilan", {}).get("resume", "")
+        st.caption(f"{icone} {libelle} – {t['etat']} {bilan} {t['erreur']}")
+    if any(t["id"] == st.session_state.get("pdf_tache") and t["etat"] == "terminée" for t in taches) \
+            and "pdf_cache" not in st.session_state:
+        st.rerun()   # PDF prêt : la page affiche le bouton de téléchargement
+
+
+def afficher(ville: str, role: str):
+    st.markdown('<div class="section-header">🔴 Génération du Rapport PDF d\'Alertes</div>',
+                unsafe_allow_html=True)
+
+    if not PDF_DISPONIBLE:
+        st.error(
+            "❌ Module `pdf_alertes.py` introuvable. "
+            "Placez-le dans le même dossier que `sodexam_app.py`."
+        )
+        st.stop()
+
+    df_all = charger_toutes_donnees()
+
+    if df_all.empty:
+        st.info("ℹ️ Aucune donnée disponible pour générer un rapport.")
+        st.stop()
+
+    # ── Panneau de configuration ──────────────────────────
+    with st.container(border=True):
+        st.markdown("#### ⚙️ Paramètres du rapport")
+        pc1, pc2 = st.columns(2)
+
+        date_min_g = df_all["Date_Heure"].min().date()
+        date_max_g = df_all["Date_Heure"].max().date()
+        # Garde : éviter date_max_g < date_min_g si une seule journée
+        if date_min_g >= date_max_g:
+            date_max_g = date_min_g + timedelta(days=1)
+
+        debut_defaut = max(date_min_g, date_max_g - timedelta(days=30))
+        pdf_date_debut = pc1.date_input(
+            "📅 Période — Du",
+            value=debut_defaut,
+            min_value=date_min_g, max_value=date_max_g,
+            key="pdf_deb",
+        )
+        pdf_date_fin = pc2.date_input(
+            "📅 Période — Au",
+            value=date_max_g,
+            min_value=date_min_g, max_value=date_max_g,
+            key="pdf_fin",
+        )
+
+        ps1, ps2 = st.columns(2)
+        pdf_seuil = ps1.number_input(
+            "🚨 Seuil d'alerte (mm)",
+            min_value=1.0, max_value=500.0,
+            value=float(SEUIL_ALERTE_MM), step=5.0,
+        )
+        pdf_titre = ps2.text_input(
+            "📄 Titre du rapport",
+            value=f"Rapport Alertes Pluviométriques – {date.today().strftime('%B %Y')}",
+        )
+
+        # Filtres optionnels
+        all_villes_pdf = sorted(df_all["Ville"].unique())
+        villes_pdf = st.multiselect(
+            "📍 Filtrer par station(s) (vide = toutes)",
+            all_villes_pdf,
+            default=[],
+            key="pdf_villes",
+        )
+
+        incl_vigilance = st.toggle(
+            "⚠️ Inclure les événements de vigilance dans le tableau",
+            value=True,
+        )
+
+    # ── Prévisualisation des alertes ──────────────────────
+    apercu = apercu_rapport(index_releves(), version_donnees(), pdf_date_debut, pdf_date_fin,
+                            tuple(sorted(villes_pdf)), float(pdf_seuil))
+    df_alertes_prev = apercu["alertes"]
+
+    # KPI prévisualisation
+    pv1, pv2, pv3, pv4 = st.columns(4)
+    pv1.metric("🚨 Alertes détectées",  apercu["nb_alertes"])
+    pv2.metric("⚠️ Vigilances",          apercu["nb_vigilances"])
+    pv3.metric("📍 Stations concernées", apercu["nb_stations"])
+    pv4.metric("💧 Max ponctuel",
+               f"{apercu['max']:.1f} mm" if apercu["max"] is not None else "—")
+
+    actives_pdf = moteur_alertes().actives()
+    if villes_pdf:
+        actives_pdf = actives_pdf[actives_pdf["Ville"].isin(villes_pdf)]
+    if not actives_pdf.empty:
+        with st.expander(f"🚨 {len(actives_pdf)} alerte(s) en cours sur les stations sélectionnées"):
+            st.dataframe(actives_pdf, use_container_width=True, hide_index=True)
+
+    if not df_alertes_prev.empty:
+        st.markdown("##### 📋 Aperçu des alertes qui seront dans le PDF")
+        st.dataframe(df_alertes_prev, use_container_width=True, hide_index=True)
+    else:
+        st.info("ℹ️ Aucune alerte sur la période sélectionnée. Le rapport contiendra une mention 'RAS'.")
+
+    st.divider()
+
+    # ── Paramètres des tâches (relues depuis le dépôt par le worker) ──
+    params_pdf = {
+        "date_debut":    pdf_date_debut.isoformat(),
+        "date_fin":      pdf_date_fin.isoformat(),
+        "villes":        sorted(villes_pdf),
+        "seuil_mm":      float(pdf_seuil),
+        "titre_rapport": pdf_titre,
+        "generateur":    st.session_state.username,
+        "inclure_vigilance": incl_vigilance,
+        "logo_path":     next((p for p in ["logo.png", "logo.jpg", "LOGO.PNG"] if os.path.exists(p)), None),
+        # Empreinte des relevés concernés : un rapport identique sur les mêmes données n'est pas refait
+        "empreinte":     apercu["empreinte"],
+        # Version du chargeur : clé du cache des graphiques (en mémoire, propre au processus)
+        "version":       version_donnees(),
+    }
+    nom_pdf = (f"SODEXAM_Alertes_{pdf_date_debut.strftime('%Y%m%d')}_"
+               f"{pdf_date_fin.strftime('%Y%m%d')}.pdf")
+
+    # ── Bouton de génération ──────────────────────────────
+    col_gen, col_email_pdf = st.columns([1, 1])
+
+    with col_gen:
+        st.markdown("##### 📥 Téléchargement direct")
+        if st.button("🔄 Générer le PDF", type="primary", use_container_width=True, key="btn_gen_pdf"):
+            st.session_state["pdf_tache"] = file_taches().soumettre("pdf", params_pdf)
+            st.session_state.setdefault("taches_pdf", []).append(st.session_state["pdf_tache"])
+            st.session_state.pop("pdf_cache", None)
+            st.info("⏳ Génération lancée en arrière-plan…")
+
+        tache_pdf = file_taches().etat(st.session_state.get("pdf_tache", ""))
+        if tache_pdf and tache_pdf["etat"] == "terminée":
+            st.session_state["pdf_cache"] = file_taches().pdf(tache_pdf["id"])
+            st.session_state["pdf_nom_fichier"] = nom_pdf
+        elif tache_pdf and tache_pdf["etat"] == "échec":
+            st.error(f"❌ Erreur lors de la génération : {tache_pdf['erreur']}")
+
+        if st.session_state.get("pdf_cache"):
+            st.success(f"✅ PDF prêt — {len(st.session_state['pdf_cache'])/1024:.0f} Ko")
+            st.download_button(
+                label="⬇️ Télécharger le PDF",
+                data=st.session_state["pdf_cache"],
+                file_name=st.session_state["pdf_nom_fichier"],
+                mime="application/pdf",
+                use_container_width=True,
+            )
+
+    with col_email_pdf:
+        st.markdown("##### 📨 Envoi par e-mail")
+        with st.form("form_pdf_email"):
+            diffusion = st.toggle("📣 Toutes les stations + direction", value=False,
+                                  help="Un message personnalisé par compte ayant un e-mail")
+            dest_pdf = st.text_input("Destinataire", "direction@sodexam.ci")
+            note_pdf = st.text_area(
+                "Message accompagnateur (optionnel)",
+                value="Veuillez trouver ci-joint le rapport d'alertes pluviométriques.",
+                height=80,
+            )
+            envoi_pdf = st.form_submit_button(
+                "📨 Générer & Envoyer", use_container_width=True
+            )
+        if envoi_pdf:
+            if diffusion:
+                ident = file_taches().soumettre("pdf_diffusion", {
+                    **params_pdf, "nom_fichier": nom_pdf,
+                    "note": ("Bonjour {identifiant},\n\n"
+                             + note_pdf.replace("{", "{{").replace("}", "}}") +
+                             "\n\nStation {ville} : {nb_alertes} alerte(s) sur la période, "
+                             "maximum {max_mm} mm."),
+                })
+            else:
+                ident = file_taches().soumettre("pdf_email", {
+                    **params_pdf, "destinataire": dest_pdf, "note": note_pdf, "nom_fichier": nom_pdf,
+                })
+            st.session_state.setdefault("taches_pdf", []).append(ident)
+            st.info("📨 Envoi programmé : suivez son état ci-dessous.")
+
+    # Suivi des tâches de la session (rafraîchi sans bloquer la page)
+    if st.session_state.get("taches_pdf"):
+        suivi_taches_pdf()
+
+    # ── Guide d'utilisation ───────────────────────────────
+    with st.expander("ℹ️ Contenu du rapport PDF"):
+        st.markdown("""
+| Section | Contenu |
+|---|---|
+| **En-tête** | Logo SODEXAM, titre, pied de page numéroté |
+| **KPIs** | Nb alertes · Nb vigilances · Stations touchées · Max ponctuel |
+| **Tableau alertes** | Date, Station, mm, Niveau (🚨/⚠️), Phénomènes, Agent |
+| **Graphique 1** | Barres horizontales : cumul par station (rouge = alerte) |
+| **Graphique 2** | Courbe temporelle multi-stations + lignes de seuils |
+| **Graphique 3** | Camembert des phénomènes observés |
+| **Graphique 4** | Scatter intensité max vs moyenne (taille = nb relevés) |
+| **Note méthodo** | Définition des seuils, sources des données |
+        """)
@@ -0,0 +1,71 @@
+# === CONTENU DU FICHIER vues/saisie.py ===
+"""Page 📝 Saisie Relevé : formulaire de l'agent, alertes évaluées dès l'enregistrement."""
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+import phenomenes
+from coeur import moteur_alertes
+from referentiel import BORNES_MESURES, PHENOMENES_OPTIONS
+from stockage import DoublonReleve, depot
+
+
+def afficher(ville: str, role: str):
+    st.markdown(
+        f'<div class="section-header">📝 Saisie – Station de {ville}</div>',
+        unsafe_allow_html=True,
+    )
+
+    with st.form("form_saisie", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        d  = c1.date_input("📅 Date", value=date.today())
+        h  = c1.selectbox("🕐 Heure d'observation", ["06:00", "08:00", "12:00", "18:00", "21:00", "Spécial"])
+        h_spec = c1.text_input("Heure spéciale (HH:MM)", value="", disabled=(h != "Spécial"))
+
+        p   = c2.number_input("🌧️ Pluie (mm)", *BORNES_MESURES["Pluie (mm)"], step=0.1)
+        tmp = c2.number_input("🌡️ Température (°C)", *BORNES_MESURES["Temperature (C)"], step=0.1, value=28.0)
+        hum = c2.number_input("💧 Humidité (%)", *BORNES_MESURES["Humidite (%)"], step=1, value=70)
+        vent = c2.number_input("🌬️ Vent (km/h)", *BORNES_MESURES["Vent (km/h)"], step=0.5, value=0.0)
+
+        ph  = st.multiselect("⚡ Phénomènes observés", PHENOMENES_OPTIONS)
+        obs = st.text_area("📝 Observations libres", placeholder="Notes complémentaires…")
+
+        soumis = st.form_submit_button("💾 Enregistrer le relevé", use_container_width=True, type="primary")
+
+    if soumis:
+        heure_finale = h_spec if h == "Spécial" and h_spec else h
+        # Validation minimale
+        if h == "Spécial" and not h_spec:
+            st.warning("⚠️ Veuillez renseigner l'heure spéciale.")
+        else:
+            df_new = pd.DataFrame({
+                "Date_Heure":     [f"{d} {heure_finale}"],
+                "Pluie (mm)":     [p],
+                "Temperature (C)": [tmp],
+                "Humidite (%)":   [hum],
+                "Vent (km/h)":    [vent],
+                "Phenomenes":     [phenomenes.masque(ph)],
+                "Obs":            [obs],
+                "Saisi_par":      [st.session_state.username],
+            })
+            try:
+                depot().ajouter_releves(ville, df_new)
+            except DoublonReleve:
+                st.error(f"❌ Un relevé existe déjà pour **{ville}** le {d} à {heure_finale}.")
+            else:
+                st.success(f"✅ Relevé enregistré avec succès pour **{ville}** ({d} {heure_finale}) !")
+
+                # Relevé évalué par le moteur d'alertes (ponctuel et cumuls glissants)
+                for _, a in moteur_alertes().actives(ville).iterrows():
+                    message = f"**{a['Règle']}** : {a['Valeur (mm)']} mm à {ville} (seuil {a['Seuil (mm)']:g} mm)"
+                    if a["Niveau"] == "alerte":
+                        st.error(f"🚨 ALERTE ROUGE – {message} !")
+                    else:
+                        st.warning(f"⚠️ Vigilance – {message}.")
+
+    # Aperçu des dernières saisies
+    if depot().station_existe(ville):
+        st.markdown("##### 🕒 5 dernières saisies")
+        preview = depot().lire_station(ville).drop(columns=["id"]).tail(5).iloc[::-1]
+        st.dataframe(preview, use_container_width=True, hide_index=True)